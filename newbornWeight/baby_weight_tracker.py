@@ -1,43 +1,33 @@
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from datetime import datetime, timedelta
-from scipy.interpolate import make_interp_spline
-import io
-import requests
+from datetime import datetime
+import argparse
+import csv
+import os
+import sys
 from matplotlib.widgets import CheckButtons
 
-# WHO Growth Standards Data
-# Source: https://www.who.int/tools/child-growth-standards/standards/weight-for-age
-# These are weight-for-age values for boys from birth to 60 days in grams
+from growth_core import (MeasurementStore, get_reference, get_interpolator, normalize_sex, parse_measurement_lines,
+                         read_measurement_file, parse_gestational_age, corrected_zscores, TERM_DAYS,
+                         QuarantineReport, TieredHistory, plot_history, RunningStats)
+from growth_core import adaptive_sample_grid
+from growth_core.reference import WHO_PERCENTILES_BOYS as who_data_boys
+from growth_core.reference import WHO_PERCENTILES_GIRLS as who_data_girls
 
-# WHO percentile data for boys 0-60 days (in grams)
-who_data_boys = {
-    'days': [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 35, 40, 45, 50, 55, 60],
-    'p3': [2500, 2400, 2350, 2350, 2350, 2400, 2450, 2500, 2550, 2600, 2650, 2700, 2750, 2800, 2850, 2900, 2950, 3000, 3050, 3100, 3150, 3200, 3250, 3300, 3350, 3400, 3450, 3500, 3550, 3600, 3650, 3900, 4150, 4400, 4650, 4850, 5050],
-    'p15': [2800, 2700, 2650, 2650, 2650, 2700, 2750, 2800, 2850, 2900, 2950, 3000, 3050, 3100, 3150, 3200, 3250, 3300, 3350, 3400, 3450, 3500, 3550, 3600, 3650, 3700, 3750, 3800, 3850, 3900, 3950, 4200, 4450, 4700, 4950, 5150, 5350],
-    'p50': [3300, 3200, 3100, 3100, 3100, 3150, 3200, 3250, 3300, 3350, 3400, 3450, 3500, 3550, 3600, 3650, 3700, 3750, 3800, 3850, 3900, 3950, 4000, 4050, 4100, 4150, 4200, 4250, 4300, 4350, 4400, 4650, 4900, 5150, 5400, 5600, 5800],
-    'p85': [3850, 3700, 3600, 3600, 3600, 3650, 3700, 3750, 3800, 3850, 3900, 3950, 4000, 4050, 4100, 4150, 4200, 4250, 4300, 4350, 4400, 4450, 4500, 4550, 4600, 4650, 4700, 4750, 4800, 4850, 4900, 5150, 5400, 5650, 5900, 6100, 6300],
-    'p97': [4250, 4100, 4000, 4000, 4000, 4050, 4100, 4150, 4200, 4250, 4300, 4350, 4400, 4450, 4500, 4550, 4600, 4650, 4700, 4750, 4800, 4850, 4900, 4950, 5000, 5050, 5100, 5150, 5200, 5250, 5300, 5550, 5800, 6050, 6300, 6500, 6700]
-}
-
-# WHO percentile data for girls 0-60 days (in grams)
-who_data_girls = {
-    'days': [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 35, 40, 45, 50, 55, 60],
-    'p3': [2400, 2300, 2250, 2250, 2250, 2300, 2350, 2400, 2450, 2500, 2550, 2600, 2650, 2700, 2750, 2800, 2850, 2900, 2950, 3000, 3050, 3100, 3150, 3200, 3250, 3300, 3350, 3400, 3450, 3500, 3550, 3800, 4050, 4300, 4500, 4700, 4900],
-    'p15': [2650, 2550, 2500, 2500, 2500, 2550, 2600, 2650, 2700, 2750, 2800, 2850, 2900, 2950, 3000, 3050, 3100, 3150, 3200, 3250, 3300, 3350, 3400, 3450, 3500, 3550, 3600, 3650, 3700, 3750, 3800, 4050, 4300, 4550, 4750, 4950, 5150],
-    'p50': [3200, 3100, 3000, 3000, 3000, 3050, 3100, 3150, 3200, 3250, 3300, 3350, 3400, 3450, 3500, 3550, 3600, 3650, 3700, 3750, 3800, 3850, 3900, 3950, 4000, 4050, 4100, 4150, 4200, 4250, 4300, 4550, 4800, 5050, 5250, 5450, 5650],
-    'p85': [3750, 3600, 3500, 3500, 3500, 3550, 3600, 3650, 3700, 3750, 3800, 3850, 3900, 3950, 4000, 4050, 4100, 4150, 4200, 4250, 4300, 4350, 4400, 4450, 4500, 4550, 4600, 4650, 4700, 4750, 4800, 5050, 5300, 5550, 5750, 5950, 6150],
-    'p97': [4150, 4000, 3900, 3900, 3900, 3950, 4000, 4050, 4100, 4150, 4200, 4250, 4300, 4350, 4400, 4450, 4500, 4550, 4600, 4650, 4700, 4750, 4800, 4850, 4900, 4950, 5000, 5050, 5100, 5150, 5200, 5450, 5700, 5950, 6150, 6350, 6550]
-}
+# WHO Growth Standards Data (p3-p97 weight-for-age, 0-60 days) is kept in
+# growth_core.reference as the "who_percentiles" reference.
 
 class BabyWeightTracker:
     def __init__(self):
-        self.birth_datetime = None
-        self.weight_data = []
+        self.store = MeasurementStore()
+        # Raw, daily and weekly tiers of the weights for the chart, created with the birth info
+        self.history = None
+        # Running statistics (nadir, regain, velocity, z-score), updated on every measurement
+        self.stats = None
         self.gender = None
         self.percentile_data = None
+        self.reference = None
+        self.quarantine = None  # QuarantineReport of the last loaded file
         self.unit = 'days'  # default unit
         self.use_spline = True  # default to use spline interpolation
         self.show_percentiles = {
@@ -47,24 +37,56 @@ class BabyWeightTracker:
             'p85': True,
             'p97': True
         }
+
+    @property
+    def birth_datetime(self):
+        return self.store.birth_datetime
+
+    @birth_datetime.setter
+    def birth_datetime(self, value):
+        self.store.birth_datetime = value
+
+    @property
+    def weight_data(self):
+        """Weight measurements as a list of {'datetime', 'weight'} dicts, sorted by time."""
+        return self.store.records()
         
-    def set_birth_info(self, birth_datetime, gender):
-        """Set the birth date/time and gender of the baby."""
+    def set_birth_info(self, birth_datetime, gender, gestational_age=None):
+        """Set the birth date/time and gender of the baby.
+        
+        gestational_age is the gestational age at birth for preterm babies,
+        either in days or as a '32+4' weeks+days string.
+        """
         self.birth_datetime = birth_datetime
         self.gender = gender.lower()
+        if isinstance(gestational_age, str):
+            gestational_age = parse_gestational_age(gestational_age)
+        self.store.gestational_age_days = gestational_age
+        self.rebuild_history()
+        self.rebuild_stats()
         
         # Set the appropriate percentile data based on gender
-        if self.gender == 'boy' or self.gender == 'male':
-            self.percentile_data = who_data_boys
-        else:
-            self.percentile_data = who_data_girls
+        self.reference = get_reference('who_percentiles', self.gender)
+        self.percentile_data = who_data_boys if normalize_sex(self.gender) == 'boys' else who_data_girls
+    
+    def rebuild_history(self):
+        """Rebuild the tiered history of the weights, counted from the birth."""
+        self.history = TieredHistory.from_measurements(
+            self.birth_datetime, [(r['datetime'], r['weight']) for r in self.store.records()])
+    
+    def rebuild_stats(self):
+        """Recompute the running statistics from the sorted measurements."""
+        self.stats = RunningStats(self.birth_datetime, self.gender)
+        for record in self.store.records():
+            self.stats.add(record['datetime'], record['weight'])
     
     def add_weight_measurement(self, datetime_measured, weight_grams):
         """Add a weight measurement with its date and time."""
-        self.weight_data.append({
-            'datetime': datetime_measured,
-            'weight': weight_grams
-        })
+        self.store.add(datetime_measured, weight_grams)
+        if self.history is not None:
+            self.history.add(datetime_measured, weight_grams)
+        if self.stats is not None:
+            self.stats.add(datetime_measured, weight_grams)
     
     def get_hours_since_birth(self, datetime_obj):
         """Calculate hours elapsed since birth."""
@@ -76,6 +98,11 @@ class BabyWeightTracker:
         delta = datetime_obj - self.birth_datetime
         return delta.total_seconds() / (3600 * 24)
     
+    def corrected_zscores(self, reference='auto'):
+        """Z-scores of every measurement for corrected age (Fenton before term, WHO after)."""
+        ga_days = self.store.gestational_age_days or TERM_DAYS
+        return corrected_zscores(ga_days, self.store.days_since_birth(), self.store.weights, self.gender, reference)
+    
     def toggle_unit(self):
         """Toggle between hours and days display."""
         self.unit = 'hours' if self.unit == 'days' else 'days'
@@ -89,36 +116,43 @@ class BabyWeightTracker:
         if percentile in self.show_percentiles:
             self.show_percentiles[percentile] = not self.show_percentiles[percentile]
 
-    def plot_data(self):
-        """Plot the baby's weight data against WHO growth curves."""
-        if not self.birth_datetime or not self.weight_data:
+    def plot_data(self, output_file=None):
+        """Plot the baby's weight data against WHO growth curves.
+        
+        If output_file is given the chart is saved there without the
+        interactive controls and the figure is closed instead of shown.
+        """
+        if not self.birth_datetime or not len(self.store):
             print("Please set birth information and add weight measurements first.")
             return
         
-        # Sort weight data by datetime
-        self.weight_data.sort(key=lambda x: x['datetime'])
+        if self.history is None or self.history.origin != np.datetime64(self.birth_datetime, 's'):
+            self.rebuild_history()
         
-        # Extract times and weights
-        times = [m['datetime'] for m in self.weight_data]
-        weights = [m['weight'] for m in self.weight_data]
-        
-        # Calculate time since birth in the selected unit
+        # Time since birth in the selected unit
         if self.unit == 'hours':
-            time_since_birth = [self.get_hours_since_birth(t) for t in times]
             x_label = 'Hours since birth'
             # Convert percentile days to hours for comparison
-            percentile_x = [d * 24 for d in self.percentile_data['days']]
+            scale = 24
         else:  # days
-            time_since_birth = [self.get_days_since_birth(t) for t in times]
             x_label = 'Days since birth'
-            percentile_x = self.percentile_data['days']
+            scale = 1
+        percentile_x = self.reference.days * scale
         
         # Create figure and axes
         fig, ax = plt.subplots(figsize=(12, 8))
+        render_dpi = 300 if output_file is not None else None
         
-        # Plot baby's actual weight data
-        ax.plot(time_since_birth, weights, 'o-', color='blue', linewidth=2, markersize=8, 
-                label=f"Baby's weight")
+        # Limit x-axis to reasonable range
+        max_data_time = self.history.last_hours * scale / 24 * 1.1
+        max_percentile_time = max(percentile_x)
+        ax.set_xlim(0, min(max_data_time, max_percentile_time))
+        
+        # Plot baby's actual weight data: every weighing while they fit the x-range,
+        # daily or weekly min-max bands from the history tiers for long records
+        plot_history(ax, self.history, 24 / scale, render_dpi, color='blue', fmt='o-',
+                     raw=(self.store.hours_since_birth(), self.store.weights),
+                     linewidth=2, markersize=8, label=f"Baby's weight")
         
         # Colors for percentile curves
         colors = {
@@ -139,21 +173,19 @@ class BabyWeightTracker:
         }
         
         # Add WHO percentile curves with optional spline interpolation
+        if self.use_spline and len(percentile_x) > 3:
+            # Create a smoother curve with spline interpolation
+            x_smooth = adaptive_sample_grid(min(percentile_x), max(percentile_x), ax, render_dpi)
+            curves = get_interpolator('spline', self.reference).curves(x_smooth / scale)
+        else:
+            # Plot the original data points
+            x_smooth = percentile_x
+            curves = {p: self.reference.column(p) for p in self.reference.columns}
+        
         for percentile in ['p3', 'p15', 'p50', 'p85', 'p97']:
             if self.show_percentiles[percentile]:
-                y_values = self.percentile_data[percentile]
-                
-                if self.use_spline and len(percentile_x) > 3:
-                    # Create a smoother curve with spline interpolation
-                    x_smooth = np.linspace(min(percentile_x), max(percentile_x), 500)
-                    spl = make_interp_spline(percentile_x, y_values, k=3)  # k=3 for cubic spline
-                    y_smooth = spl(x_smooth)
-                    ax.plot(x_smooth, y_smooth, '-', color=colors[percentile], linewidth=1.5, 
-                            label=percentile_labels[percentile])
-                else:
-                    # Plot the original data points
-                    ax.plot(percentile_x, y_values, '-', color=colors[percentile], linewidth=1.5, 
-                            label=percentile_labels[percentile])
+                ax.plot(x_smooth, curves[percentile], '-', color=colors[percentile], linewidth=1.5, 
+                        label=percentile_labels[percentile])
         
         # Add labels and title
         ax.set_xlabel(x_label, fontsize=12)
@@ -164,55 +196,73 @@ class BabyWeightTracker:
         # Add grid
         ax.grid(True, linestyle='--', alpha=0.7)
         
-        # Limit x-axis to reasonable range
-        max_data_time = max(time_since_birth) * 1.1
-        max_percentile_time = max(percentile_x)
-        ax.set_xlim(0, min(max_data_time, max_percentile_time))
-        
         # Add legend
         ax.legend(loc='upper left')
         
-        # Add control buttons for toggling percentiles
-        toggle_ax = plt.axes([0.02, 0.5, 0.12, 0.15])
-        toggle_labels = list(percentile_labels.values())
-        toggle_states = list(self.show_percentiles.values())
-        check = CheckButtons(toggle_ax, toggle_labels, toggle_states)
+        if output_file is None:
+            # Add control buttons for toggling percentiles
+            toggle_ax = plt.axes([0.02, 0.5, 0.12, 0.15])
+            toggle_labels = list(percentile_labels.values())
+            toggle_states = list(self.show_percentiles.values())
+            check = CheckButtons(toggle_ax, toggle_labels, toggle_states)
         
-        def toggle_percentile_callback(label):
-            idx = toggle_labels.index(label)
-            percentile = list(percentile_labels.keys())[idx]
-            self.toggle_percentile(percentile)
-            plt.draw()
+            def toggle_percentile_callback(label):
+                idx = toggle_labels.index(label)
+                percentile = list(percentile_labels.keys())[idx]
+                self.toggle_percentile(percentile)
+                plt.draw()
         
-        check.on_clicked(toggle_percentile_callback)
+            check.on_clicked(toggle_percentile_callback)
         
-        # Add button for toggling units
-        unit_ax = plt.axes([0.02, 0.4, 0.12, 0.05])
-        unit_button = CheckButtons(unit_ax, [f'Show in {self.unit}'], [True])
+            # Add button for toggling units
+            unit_ax = plt.axes([0.02, 0.4, 0.12, 0.05])
+            unit_button = CheckButtons(unit_ax, [f'Show in {self.unit}'], [True])
         
-        def toggle_unit_callback(label):
-            self.toggle_unit()
-            unit_button.labels[0].set_text(f'Show in {self.unit}')
-            self.plot_data()  # Redraw the plot
+            def toggle_unit_callback(label):
+                self.toggle_unit()
+                unit_button.labels[0].set_text(f'Show in {self.unit}')
+                self.plot_data()  # Redraw the plot
         
-        unit_button.on_clicked(toggle_unit_callback)
+            unit_button.on_clicked(toggle_unit_callback)
         
-        # Add button for toggling spline interpolation
-        spline_ax = plt.axes([0.02, 0.3, 0.12, 0.05])
-        spline_button = CheckButtons(spline_ax, ['Use spline smoothing'], [self.use_spline])
+            # Add button for toggling spline interpolation
+            spline_ax = plt.axes([0.02, 0.3, 0.12, 0.05])
+            spline_button = CheckButtons(spline_ax, ['Use spline smoothing'], [self.use_spline])
         
-        def toggle_spline_callback(label):
-            self.toggle_spline()
-            self.plot_data()  # Redraw the plot
+            def toggle_spline_callback(label):
+                self.toggle_spline()
+                self.plot_data()  # Redraw the plot
         
-        spline_button.on_clicked(toggle_spline_callback)
+            spline_button.on_clicked(toggle_spline_callback)
         
         # Add birth information
         birth_str = self.birth_datetime.strftime('%Y-%m-%d %H:%M')
         ax.text(0.02, 0.02, f'Birth date/time: {birth_str}', transform=fig.transFigure)
         
+        if output_file is not None:
+            fig.savefig(output_file, dpi=300, bbox_inches='tight')
+            plt.close(fig)
+            return
+        
         plt.tight_layout()
         plt.show()
+    
+    def current_status(self):
+        """Running statistics of the measurements so far, without going over them again."""
+        if self.stats is None or self.stats.out_of_order or self.stats.birth_datetime != self.birth_datetime:
+            # Earlier measurement added after a later one (or birth changed): recompute once
+            self.rebuild_stats()
+        return self.stats.status()
+    
+    def summary(self):
+        """Return a dict of summary statistics of the loaded measurements."""
+        status = self.current_status()
+        return {
+            'birth_datetime': self.birth_datetime.strftime('%Y-%m-%d %H:%M'),
+            **{field: status[field] for field in ('measurements', 'birth_weight', 'min_weight', 'min_weight_day',
+                                                  'max_loss_percent', 'regain_day', 'last_weight', 'last_day',
+                                                  'percent_from_birth', 'velocity_g_per_day', 'last_z_score')},
+        }
         
     def load_data_from_csv(self, file_path=None, csv_data=None):
         """Load weight measurements from a CSV file or string.
@@ -240,41 +290,28 @@ class BabyWeightTracker:
             else:
                 print("Error: No data source provided")
                 return
-                
-            # Determine if the data has headers
-            first_line = lines[0].strip()
-            has_headers = 'date' in first_line.lower() and 'time' in first_line.lower() and 'weight' in first_line.lower()
-            
-            # Process each line
-            data_lines = lines[1:] if has_headers else lines
-            measurements_count = 0
             
-            for line in data_lines:
-                line = line.strip()
-                if not line:  # Skip empty lines
-                    continue
-                    
-                # Split by comma and remove whitespace
-                parts = [p.strip() for p in line.split(',')]
-                if len(parts) >= 3:
-                    date_str = parts[0]
-                    time_str = parts[1]
-                    try:
-                        weight = float(parts[2])
-                        datetime_str = f"{date_str} {time_str}"
-                        datetime_obj = datetime.strptime(datetime_str, '%Y-%m-%d %H:%M')
-                        self.add_weight_measurement(datetime_obj, weight)
-                        measurements_count += 1
-                    except ValueError as e:
-                        print(f"Skipping invalid line: {line} - Error: {e}")
+            # Quarantine unit mistakes, duplicates and impossible jumps while parsing
+            self.quarantine = QuarantineReport()
+            measurements, skipped = parse_measurement_lines(lines, self.quarantine)
+            for line, e in skipped:
+                print(f"Skipping invalid line: {line} - Error: {e}")
+            if self.quarantine.entries:
+                print(self.quarantine.summary())
+            for datetime_obj, weight in measurements:
+                self.add_weight_measurement(datetime_obj, weight)
             
-            print(f"Successfully loaded {measurements_count} measurements")
+            print(f"Successfully loaded {len(measurements)} measurements")
         except Exception as e:
             print(f"Error loading data: {e}")
             
     def reset_data(self):
         """Clear all weight measurements."""
-        self.weight_data = []
+        self.store.clear()
+        if self.history is not None:
+            self.history = TieredHistory(self.birth_datetime)
+        if self.stats is not None:
+            self.stats = RunningStats(self.birth_datetime, self.gender)
         print("All weight measurements cleared.")
 
     def example_usage(self):
@@ -303,7 +340,86 @@ class BabyWeightTracker:
         print("tracker.load_data_from_csv('baby_weights.csv')")
 
 
-def main():
+def load_tracker(file_path, gender, birth_datetime=None):
+    """Create a tracker from a measurements CSV file, reading the file once.
+    
+    The birth date/time is taken from birth_datetime if given, otherwise from
+    the first measurement in the file.
+    """
+    quarantine = QuarantineReport()
+    measurements, skipped = read_measurement_file(file_path, quarantine)
+    for line, e in skipped:
+        print(f"Skipping invalid line: {line} - Error: {e}")
+    if quarantine.entries:
+        print(f"{file_path}: {quarantine.summary()}")
+    if not measurements:
+        raise ValueError(f"No measurements in '{file_path}'")
+    
+    tracker = BabyWeightTracker()
+    tracker.quarantine = quarantine
+    tracker.set_birth_info(birth_datetime or measurements[0][0], gender)
+    for datetime_obj, weight in measurements:
+        tracker.add_weight_measurement(datetime_obj, weight)
+    return tracker
+
+
+SUMMARY_FIELDS = ['file', 'birth_datetime', 'measurements', 'birth_weight', 'min_weight', 'min_weight_day',
+                  'max_loss_percent', 'regain_day', 'last_weight', 'last_day', 'percent_from_birth',
+                  'velocity_g_per_day', 'last_z_score', 'quarantined']
+
+
+def run_batch(files, gender, birth_datetime=None, output_dir='.', unit='days', chart_format='png'):
+    """Chart and summarize many measurement files without prompts.
+    
+    Writes <name>.<chart_format> for every file and a summary.csv with one row
+    per file to output_dir. Returns the number of files that failed.
+    """
+    plt.switch_backend('Agg')
+    os.makedirs(output_dir, exist_ok=True)
+    failures = 0
+    rows = []
+    for file_path in files:
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        try:
+            tracker = load_tracker(file_path, gender, birth_datetime)
+            tracker.unit = unit
+            tracker.plot_data(output_file=os.path.join(output_dir, f"{name}.{chart_format}"))
+            rows.append({'file': file_path, **tracker.summary(), 'quarantined': len(tracker.quarantine.quarantined)})
+        except Exception as e:
+            print(f"Error processing '{file_path}': {e}")
+            failures += 1
+    
+    summary_path = os.path.join(output_dir, 'summary.csv')
+    with open(summary_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Processed {len(rows)} of {len(files)} files, summary saved to {summary_path}")
+    return failures
+
+
+def main(argv=None):
+    """Run in batch mode when files are given, otherwise show the interactive menu."""
+    parser = argparse.ArgumentParser(description="Baby weight tracker with WHO growth standards")
+    parser.add_argument("files", nargs="*", help="Measurement CSV files to process without prompts")
+    parser.add_argument("--gender", choices=["boy", "girl"], default="girl",
+                        help="Gender for growth curve data (default: girl)")
+    parser.add_argument("--birth", help="Birth date/time 'YYYY-MM-DD HH:MM' (default: first row of each file)")
+    parser.add_argument("--unit", choices=["hours", "days"], default="days",
+                        help="Display x-axis in hours or days (default: days)")
+    parser.add_argument("--output-dir", default=".", help="Directory for charts and summary.csv")
+    args = parser.parse_args(argv)
+    
+    if not args.files:
+        interactive_menu()
+        return
+    
+    birth_datetime = datetime.strptime(args.birth, '%Y-%m-%d %H:%M') if args.birth else None
+    failures = run_batch(args.files, args.gender, birth_datetime, args.output_dir, args.unit)
+    sys.exit(1 if failures else 0)
+
+
+def interactive_menu():
     """Example of using the BabyWeightTracker class."""
     print("Baby Weight Tracker with WHO Growth Standards")
     print("===========================================")
@@ -327,35 +443,11 @@ def main():
         csv_file_path = input("Enter the path to your CSV file: ")
         
         try:
-            # First, read the file to get the birth date from the first entry
-            with open(csv_file_path, 'r') as f:
-                lines = f.readlines()
-                
-            if not lines:
-                print("Error: File is empty")
-                return
-                
-            # Get birth date and time from the first measurement
-            first_line = lines[0].strip()
-            parts = [p.strip() for p in first_line.split(',')]
-            if len(parts) >= 2:
-                birth_date_str = parts[0]
-                birth_time_str = parts[1]
-                birth_datetime_str = f"{birth_date_str} {birth_time_str}"
-                try:
-                    birth_datetime = datetime.strptime(birth_datetime_str, '%Y-%m-%d %H:%M')
-                    tracker.set_birth_info(birth_datetime, gender)
-                    
-                    # Now load all the data
-                    tracker.load_data_from_csv(file_path=csv_file_path)
-                    
-                    # Plot the data
-                    tracker.plot_data()
-                except ValueError as e:
-                    print(f"Error parsing birth date: {e}")
-            else:
-                print("Error: First line doesn't contain date and time")
-                
+            # Read the file once; the first measurement is the birth
+            tracker = load_tracker(csv_file_path, gender)
+            
+            # Plot the data
+            tracker.plot_data()
         except FileNotFoundError:
             print(f"Error: File '{csv_file_path}' not found")
         except Exception as e:
@@ -0,0 +1,43 @@
+import argparse
+import time
+
+from growth_core.synthetic import DATE_STYLES, LAYOUTS, MAX_SPAN_DAYS, generate_dataset
+
+# python generate_dataset.py --infants 1000 --measurements 30 --layout all --output-dir synthetic
+# python generate_dataset.py --measurements 50000000 --layout header   (one multi-GB file)
+#
+# Synthetic, seeded weight series for load tests, never real patient data.
+# The same --seed always produces the same files.
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate reproducible synthetic newborn weight CSV files")
+    parser.add_argument("--infants", type=int, default=1, help="Number of infants (default: 1)")
+    parser.add_argument("--measurements", type=int, default=30,
+                        help="Rows per infant, birth included (default: 30)")
+    parser.add_argument("--days", type=float, default=60,
+                        help=f"Days covered by each series, at most {MAX_SPAN_DAYS} (default: 60)")
+    parser.add_argument("--layout", choices=LAYOUTS + ("all",), default="birth_row",
+                        help="CSV layout: simple, header, birth_row or all (default: birth_row)")
+    parser.add_argument("--date-style", choices=DATE_STYLES + ("all",), default="iso",
+                        help="Dates as YYYY-MM-DD (iso), DD/MM/YYYY (dmy) or both (default: iso)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--output-dir", default="synthetic", help="Output directory (default: synthetic)")
+    args = parser.parse_args()
+    if not 0 < args.days <= MAX_SPAN_DAYS:
+        parser.error(f"--days must be more than 0 and at most {MAX_SPAN_DAYS} (the range of the WHO reference)")
+
+    layouts = LAYOUTS if args.layout == "all" else (args.layout,)
+    date_styles = DATE_STYLES if args.date_style == "all" else (args.date_style,)
+
+    start = time.perf_counter()
+    written = generate_dataset(args.output_dir, args.infants, args.measurements, args.seed,
+                               layouts, date_styles, args.days)
+    elapsed = time.perf_counter() - start
+    total = sum(size for _, _, size in written)
+    print(f"Wrote {len(written)} files, {total / 1e6:.1f} MB in {elapsed:.2f} s "
+          f"({total / 1e6 / max(elapsed, 1e-9):.0f} MB/s) to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
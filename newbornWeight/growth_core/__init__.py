@@ -0,0 +1,47 @@
+"""
+Core library shared by the newborn weight tracker scripts
+
+- reference: WHO reference tables compiled into NumPy arrays
+- parsing: date/time parsing and CSV readers
+- store: per-infant measurement store (weight, length and head circumference columns)
+- interpolation: linear, cubic spline and LMS interpolators
+- sampling: adaptive curve sampling and series decimation
+- plotting: the weight chart used by the newborn_weight_tracker scripts
+- pipeline: pipelined batch rendering of many charts
+- export: JSON series and shared reference payloads for web viewers
+- gestational: corrected age and the combined Fenton/WHO reference grid
+- validation: streaming detection of bad weighings with a quarantine report
+- forecast: batched log-growth trajectory forecasts with prediction bands
+- cohort: many infants on one chart, as lines or a density heatmap
+- parallel: multi-process z-scores over shared-memory arrays
+- synthetic: seeded synthetic weight series written in every CSV layout
+- columnar: Parquet/Arrow import and export with predicate pushdown (needs pyarrow)
+- feeding: feeding and diaper log, as-of joined to the weighings
+- live: live scale feed appended to the weight chart by blitting
+- running: running nadir, regain, velocity and z-score updated per weighing
+- history: raw, daily and weekly tiers of long device records, queried per x-range
+- metrics: z-scores of weight, length, head circumference and weight-for-length in one pass
+"""
+from .reference import ReferenceTable, REFERENCE_NAMES, get_reference, normalize_sex
+from .parsing import (parse_datetime, calculate_hours_since_birth, parse_measurement_lines,
+                      read_measurement_file, read_birth_row_csv)
+from .store import METRICS, MeasurementStore
+from .interpolation import (Interpolator, LinearInterpolator, CubicSplineInterpolator,
+                            LMSInterpolator, INTERPOLATORS, get_interpolator)
+from .sampling import adaptive_sample_grid, decimate_series, lttb_indices, table_rows
+from .plotting import build_weight_figure, plot_history, plot_weight_chart, save_compact_svg
+from .pipeline import render_batch
+from .export import export_json_batch, reference_payload, series_payload
+from .gestational import (TERM_DAYS, parse_gestational_age, postmenstrual_age_days, corrected_age_days,
+                          corrected_zscores, get_reference_grid)
+from .validation import MeasurementValidator, QuarantineReport, validate_measurements
+from .forecast import GrowthForecast, fit_growth, fit_growth_batch
+from .cohort import build_cohort_figure, plot_cohort_chart
+from .parallel import parallel_zscores
+from .synthetic import SyntheticInfant, generate_dataset, write_infant_csv
+from .columnar import export_parquet_batch, read_parquet, read_store, store_table, write_parquet
+from .metrics import METRIC_NAMES, MetricGrid, metric_percentiles, metric_zscores
+from .feeding import FeedingLog, intake_summary, join_feedings, read_feeding_csv
+from .live import ArraySeries, LiveWeightChart, run_live
+from .history import TieredHistory
+from .running import RunningStats, reference_lms_grid
@@ -0,0 +1,151 @@
+"""
+Cohort overlay: many infants' weight trajectories against one set of curves
+
+The reference curves are evaluated once for the whole chart. Small groups
+(twins, a few siblings) get one labelled line each; larger cohorts are drawn
+as a single LineCollection, and from DENSITY_THRESHOLD infants on the chart
+switches to a density heatmap of the trajectories, where individual lines
+would only be an opaque blob.
+"""
+import os
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.colors import LogNorm
+
+from .interpolation import get_interpolator
+from .parsing import read_birth_row_csv
+from .reference import get_reference
+from .sampling import adaptive_sample_grid
+from .store import MeasurementStore
+
+# Up to this many infants each line gets its own color and legend entry
+MAX_LABELLED = 10
+# From this many infants mode "auto" draws a density heatmap
+DENSITY_THRESHOLD = 2000
+# Heatmap resolution (x bins, weight bins)
+DENSITY_BINS = (240, 160)
+
+COHORT_TEXTS = {
+    "cohort_title": "Weight Chart of {count} Infants ({gender})",
+    "cohort_series": "Infants",
+    "cohort_density": "Trajectories per cell",
+}
+
+
+def _cohort_text(texts, key):
+    return texts.get(key, COHORT_TEXTS[key])
+
+
+def _draw_density(ax, trajectories, x_max, texts):
+    """Histogram of the trajectories resampled on a common x grid"""
+    x_edges = np.linspace(0, x_max, DENSITY_BINS[0] + 1)
+    x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+    resampled = []
+    for x, weights in trajectories:
+        # Visits without a weight (length or head only) are left out
+        measured = np.isfinite(x) & np.isfinite(weights)
+        x, weights = x[measured], weights[measured]
+        if not len(x):
+            continue
+        # Only inside each infant's own measured range, no extrapolation
+        inside = (x_centers >= x[0]) & (x_centers <= x[-1])
+        resampled.append((x_centers[inside], np.interp(x_centers[inside], x, weights)))
+    if not resampled:
+        raise ValueError("No weights to plot")
+    all_x = np.concatenate([x for x, _ in resampled])
+    all_w = np.concatenate([w for _, w in resampled])
+    w_edges = np.linspace(all_w.min(), all_w.max(), DENSITY_BINS[1] + 1)
+    counts, _, _ = np.histogram2d(all_x, all_w, bins=(x_edges, w_edges))
+    mesh = ax.pcolormesh(x_edges, w_edges, np.ma.masked_equal(counts.T, 0),
+                         cmap='viridis', norm=LogNorm(), shading='flat')
+    ax.figure.colorbar(mesh, ax=ax, label=_cohort_text(texts, "cohort_density"))
+
+
+def build_cohort_figure(fig, stores, unit="hours", gender="boys", style=None, labels=None, mode="auto",
+                        render_dpi=None):
+    """
+    Draw many infants' weight trajectories over one set of reference curves
+
+    Parameters:
+    - fig: Figure to draw into
+    - stores: MeasurementStores of the infants, first measurement at birth
+    - unit: "hours" or "days" for x-axis
+    - gender: "boys" or "girls" for the growth curves
+    - style: chart style dict (see CHART_STYLE in the tracker scripts)
+    - labels: optional legend label per infant (used up to MAX_LABELLED)
+    - mode: "lines", "density" or "auto" (density from DENSITY_THRESHOLD infants)
+    - render_dpi: dpi the figure will be saved at (default: figure dpi)
+    """
+    days_unit = unit.lower() == "days"
+    texts = style["texts"]
+    if mode == "auto":
+        mode = "density" if len(stores) >= DENSITY_THRESHOLD else "lines"
+
+    scale = 24 if days_unit else 1
+    trajectories = [(store.hours_since_birth() / scale, store.weights) for store in stores if len(store)]
+    if not trajectories:
+        raise ValueError("No measurements to plot")
+
+    ax = fig.add_subplot(1, 1, 1)
+
+    # Reference curves, evaluated once for the whole cohort
+    table = get_reference(style["reference"], gender)
+    max_hours = max(x[-1] for x, _ in trajectories) * scale * 1.1
+    if style.get("clip_to_reference"):
+        max_hours = min(max_hours, table.max_day * 24)
+    hours_range = adaptive_sample_grid(0, max_hours, ax, render_dpi)
+    curves = get_interpolator(style["interpolator"], table).evaluate(hours_range / 24)
+    for column, values in zip(table.columns, curves):
+        ax.plot(hours_range / scale, values, '-', color=style["colors"][column],
+                alpha=0.7, linewidth=1.5, label=style["labels"][column])
+
+    if mode == "density":
+        _draw_density(ax, trajectories, max_hours / scale, texts)
+    elif len(trajectories) <= MAX_LABELLED:
+        colors = plt.get_cmap('tab10').colors
+        labels = labels or [f"{_cohort_text(texts, 'cohort_series')} {i + 1}" for i in range(len(trajectories))]
+        for i, (x, weights) in enumerate(trajectories):
+            ax.plot(x, weights, 'o-', color=colors[i % len(colors)], markersize=4,
+                    linewidth=1.5, label=labels[i])
+    else:
+        # One artist for the whole cohort; more infants means fainter lines
+        alpha = float(np.clip(20 / len(trajectories), 0.05, 0.6))
+        segments = [np.column_stack([x, weights]) for x, weights in trajectories]
+        ax.add_collection(LineCollection(segments, colors='red', linewidths=0.8, alpha=alpha,
+                                         label=_cohort_text(texts, "cohort_series")))
+        ax.autoscale_view()
+
+    ax.set_xlim(0, max_hours / scale)
+    ax.set_xlabel(texts["x_label_days"] if days_unit else texts["x_label_hours"], fontsize=12)
+    ax.set_ylabel(texts["y_label"], fontsize=12)
+    ax.set_title(_cohort_text(texts, "cohort_title").format(count=len(trajectories), gender=gender.capitalize()),
+                 fontsize=14)
+    ax.grid(True, linestyle='--', alpha=0.7)
+    ax.legend(loc='upper left', fontsize=8)
+    fig.tight_layout()
+    return ax
+
+
+def plot_cohort_chart(paths, unit="hours", gender="boys", output_file=None, style=None, mode="auto"):
+    """
+    Plot the birth-row CSV files of several infants on one chart
+
+    Files that cannot be read are reported and left out. Legend labels are the
+    file names.
+    """
+    stores, labels = [], []
+    for path in paths:
+        try:
+            stores.append(MeasurementStore.from_birth_info(*read_birth_row_csv(path)))
+            labels.append(os.path.splitext(os.path.basename(path))[0])
+        except Exception as e:
+            print(f"Error reading {path}: {e}")
+
+    fig = plt.figure(figsize=(12, 8))
+    build_cohort_figure(fig, stores, unit, gender, style, labels, mode, 300 if output_file else None)
+    if output_file:
+        fig.savefig(output_file, dpi=300, bbox_inches='tight')
+        print(f"Chart saved to {output_file}")
+    plt.show()
@@ -0,0 +1,194 @@
+"""
+Parquet/Arrow import and export of measurement series and z-scores
+
+One row per visit:
+
+    infant_id (string), sex (dictionary string), datetime (timestamp[s]),
+    days_since_birth (float64), weight_g (float64), zscore (float64),
+    percentile (float64), length_cm (float64), length_zscore (float64),
+    head_cm (float64), head_zscore (float64)
+
+zscore and percentile are those of the weight; a metric not measured at a
+visit, or a z-score the reference does not cover, is null.
+
+Rows are written sorted by (infant_id, datetime) in row groups of
+ROW_GROUP_SIZE rows, so the min/max statistics of every row group are tight.
+Readers pass infant_id and date predicates to pyarrow, which skips every row
+group whose statistics rule it out instead of scanning the file. Numeric
+columns are handed to NumPy without copying where Arrow allows it (a single
+chunk without nulls).
+
+pyarrow is only needed for this module; the rest of growth_core works
+without it.
+"""
+import os
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+from .interpolation import get_interpolator
+from .metrics import metric_zscores
+from .parsing import read_birth_row_csv
+from .reference import get_reference, normalize_sex
+from .store import MeasurementStore
+
+ROW_GROUP_SIZE = 64 * 1024
+NUMERIC_COLUMNS = ("days_since_birth", "weight_g", "zscore", "percentile", "length_cm", "length_zscore",
+                   "head_cm", "head_zscore")
+# Store metric -> Parquet column of its values, besides weight_g
+METRIC_COLUMNS = {"length": "length_cm", "head": "head_cm"}
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet support needs pyarrow: pip install pyarrow")
+
+
+def measurement_schema():
+    """Arrow schema of the measurement table"""
+    _require_pyarrow()
+    return pa.schema([
+        ("infant_id", pa.string()),
+        ("sex", pa.dictionary(pa.int8(), pa.string())),
+        ("datetime", pa.timestamp("s")),
+        ("days_since_birth", pa.float64()),
+        ("weight_g", pa.float64()),
+        ("zscore", pa.float64()),
+        ("percentile", pa.float64()),
+        ("length_cm", pa.float64()),
+        ("length_zscore", pa.float64()),
+        ("head_cm", pa.float64()),
+        ("head_zscore", pa.float64()),
+    ])
+
+
+def store_table(store, infant_id, gender, reference="who_zscores"):
+    """Arrow table of one infant's measurements with LMS z-scores (and weight percentiles)"""
+    _require_pyarrow()
+    sex = normalize_sex(gender)
+    table = get_reference(reference, sex)
+    days = store.days_since_birth()
+    weights = store.weights
+    z = np.full(len(days), np.nan)
+    in_range = (days >= 0) & (days <= table.max_day)
+    lms = get_interpolator("lms", table)
+    z[in_range] = lms.zscores(days[in_range], weights[in_range])
+    percentile = np.full(len(days), np.nan)
+    percentile[in_range] = lms.percentiles(days[in_range], weights[in_range])
+    metric_z = metric_zscores([store], sex, tuple(METRIC_COLUMNS))[0]
+    columns = {
+        "infant_id": pa.array([str(infant_id)] * len(days), pa.string()),
+        "sex": pa.DictionaryArray.from_arrays(pa.array(np.zeros(len(days), np.int8)), [sex]),
+        "datetime": pa.array(np.array(store.datetimes, dtype="datetime64[s]")),
+        "days_since_birth": pa.array(days),
+        # NaN where not measured or the reference does not cover the age, stored as null
+        "weight_g": pa.array(weights, from_pandas=True),
+        "zscore": pa.array(z, from_pandas=True),
+        "percentile": pa.array(percentile, from_pandas=True),
+    }
+    for metric, column in METRIC_COLUMNS.items():
+        columns[column] = pa.array(store.values(metric), from_pandas=True)
+        columns[f"{metric}_zscore"] = pa.array(metric_z[metric], from_pandas=True)
+    return pa.table(columns, schema=measurement_schema())
+
+
+def write_parquet(tables, output_file, row_group_size=ROW_GROUP_SIZE):
+    """
+    Write measurement tables (e.g. from store_table) to one Parquet file
+
+    Rows are sorted by infant and time so row-group statistics allow
+    predicate pushdown on infant_id and datetime.
+    """
+    _require_pyarrow()
+    combined = pa.concat_tables(tables).unify_dictionaries()
+    combined = combined.sort_by([("infant_id", "ascending"), ("datetime", "ascending")])
+    pq.write_table(combined, output_file, row_group_size=row_group_size, compression="zstd",
+                   write_statistics=True)
+    return combined.num_rows
+
+
+def _filters(infant_id=None, start=None, end=None):
+    """pyarrow filter expression for an infant and a datetime range"""
+    filters = []
+    if infant_id is not None:
+        ids = [infant_id] if isinstance(infant_id, str) else list(infant_id)
+        filters.append(("infant_id", "in", ids))
+    if start is not None:
+        filters.append(("datetime", ">=", np.datetime64(start, "s").astype(object)))
+    if end is not None:
+        filters.append(("datetime", "<=", np.datetime64(end, "s").astype(object)))
+    return filters or None
+
+
+def read_parquet(path, infant_id=None, start=None, end=None, columns=None):
+    """
+    Read measurements from a Parquet file, pushing the predicates down
+
+    Parameters:
+    - infant_id: one id or a list of ids (default: all infants)
+    - start, end: optional datetime bounds, inclusive
+    - columns: columns to read (default: all)
+    """
+    _require_pyarrow()
+    return pq.read_table(path, columns=columns, filters=_filters(infant_id, start, end))
+
+
+def column_arrays(table, names=NUMERIC_COLUMNS):
+    """
+    NumPy arrays of numeric columns, without copying where possible
+
+    A column is only shared with NumPy when it is a single chunk without
+    nulls; other columns are combined and nulls become NaN.
+    """
+    arrays = {}
+    for name in names:
+        column = table.column(name)
+        if column.num_chunks == 1 and column.null_count == 0:
+            arrays[name] = column.chunk(0).to_numpy(zero_copy_only=True)
+        else:
+            arrays[name] = column.to_numpy()
+    return arrays
+
+
+def read_store(path, infant_id):
+    """
+    MeasurementStore of one infant read from a Parquet file (birth = first row)
+
+    Length and head circumference are read too when the file has them; files
+    written before those columns existed give a weight-only store.
+    """
+    _require_pyarrow()
+    present = set(pq.read_schema(path).names)
+    metric_columns = {"weight": "weight_g"}
+    metric_columns.update((metric, column) for metric, column in METRIC_COLUMNS.items() if column in present)
+    table = read_parquet(path, infant_id, columns=["datetime", *metric_columns.values()])
+    if table.num_rows == 0:
+        raise ValueError(f"No measurements for infant '{infant_id}' in {path}")
+    times = table.column("datetime").to_numpy()
+    arrays = column_arrays(table, metric_columns.values())
+    return MeasurementStore.from_arrays(times[0].item(), times,
+                                        {metric: arrays[column] for metric, column in metric_columns.items()})
+
+
+def export_parquet_batch(paths, output_file, gender="boys", reference="who_zscores"):
+    """
+    Convert birth-row CSV files into one Parquet file, infant_id = file name
+
+    Returns a tuple (written, errors) like render_batch.
+    """
+    tables, errors = [], []
+    for path in paths:
+        try:
+            store = MeasurementStore.from_birth_info(*read_birth_row_csv(path))
+            tables.append(store_table(store, os.path.splitext(os.path.basename(path))[0], gender, reference))
+        except Exception as e:
+            errors.append((path, e))
+    if not tables:
+        return [], errors
+    write_parquet(tables, output_file)
+    return [output_file], errors
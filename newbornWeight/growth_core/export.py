@@ -0,0 +1,105 @@
+"""
+JSON export of weight series for a lightweight web viewer
+
+Reference curves are identical for every infant of the same sex, so they are
+sampled once and written to a shared reference file. Each infant's file only
+holds its own measurements plus the name of the reference file to draw
+behind them. Length and head circumference, where measured, come with their
+WHO z-scores; the viewer has no LMS tables to compute them from.
+"""
+import json
+import os
+
+import numpy as np
+
+from .interpolation import get_interpolator
+from .metrics import metric_zscores
+from .parsing import read_birth_row_csv
+from .reference import get_reference
+from .store import MeasurementStore
+
+# Hours between reference curve samples in the JSON payload
+REFERENCE_STEP_HOURS = 6
+
+
+def reference_file_name(style, gender):
+    """File name of the shared reference payload for a chart style and gender"""
+    table = get_reference(style["reference"], gender)
+    return f"reference_{table.name}_{style['interpolator']}_{table.sex}.json"
+
+
+def reference_payload(style, gender, step_hours=REFERENCE_STEP_HOURS):
+    """Reference curves over the whole table range, sampled every step_hours"""
+    table = get_reference(style["reference"], gender)
+    hours = np.arange(0, table.max_day * 24 + step_hours, step_hours, dtype=float)
+    curves = get_interpolator(style["interpolator"], table).evaluate(hours / 24)
+    return {
+        "reference": table.name,
+        "sex": table.sex,
+        "interpolator": style["interpolator"],
+        "hours": hours.tolist(),
+        "curves": {column: np.round(values, 1).tolist() for column, values in zip(table.columns, curves)},
+        "labels": {column: style["labels"][column] for column in table.columns},
+        "colors": {column: style["colors"][column] for column in table.columns},
+    }
+
+
+def series_payload(store, style, gender, name=None):
+    """
+    One infant's weighings, pointing at the shared reference payload
+
+    Lengths and head circumferences get their own hours, values in cm and
+    z-scores (null where the reference does not cover the age); the lists are
+    empty when the metric was never measured.
+    """
+    weights = store.weights
+    weighed = ~np.isnan(weights)
+    hours = store.hours_since_birth()
+    payload = {
+        "name": name,
+        "birth": store.birth_datetime.strftime("%Y-%m-%d %H:%M"),
+        "birth_weight": float(weights[0]),
+        "hours": np.round(hours[weighed], 3).tolist(),
+        "weights": np.round(weights[weighed], 1).tolist(),
+    }
+    zscores = metric_zscores([store], gender, ("length", "head"))[0]
+    for metric, values_key in (("length", "lengths"), ("head", "heads")):
+        values = store.values(metric)
+        measured = ~np.isnan(values)
+        z = np.round(zscores[metric][measured], 3)
+        payload[f"{metric}_hours"] = np.round(hours[measured], 3).tolist()
+        payload[values_key] = np.round(values[measured], 1).tolist()
+        # NaN is not valid JSON
+        payload[f"{metric}_zscores"] = [None if np.isnan(value) else value for value in z.tolist()]
+    payload["reference_file"] = reference_file_name(style, gender)
+    return payload
+
+
+def write_json(payload, output_file):
+    """Write a payload as compact JSON"""
+    with open(output_file, 'w') as f:
+        json.dump(payload, f, separators=(',', ':'))
+
+
+def export_json_batch(paths, style, output_dir, gender="boys"):
+    """
+    Export birth-row CSV files as JSON series plus one shared reference file
+
+    Returns a tuple (written, errors) like render_batch.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    reference_file = os.path.join(output_dir, reference_file_name(style, gender))
+    write_json(reference_payload(style, gender), reference_file)
+    written = [reference_file]
+    errors = []
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        try:
+            birth_info, measurements = read_birth_row_csv(path)
+            store = MeasurementStore.from_birth_info(birth_info, measurements)
+            output_file = os.path.join(output_dir, f"{name}.json")
+            write_json(series_payload(store, style, gender, name), output_file)
+            written.append(output_file)
+        except Exception as e:
+            errors.append((path, e))
+    return written, errors
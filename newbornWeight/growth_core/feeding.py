@@ -0,0 +1,143 @@
+"""
+Feeding and diaper log, joined to the weighings
+
+Log files are CSV rows "date,time,event[,amount_ml]" with an optional
+header; event is one of EVENT_KINDS:
+- breast, bottle: a feed; amount_ml may be left empty for a breast feed
+- wet, dirty: a diaper
+
+Events are kept sorted in NumPy arrays with running totals per kind. The
+as-of join places every weighing among the events with np.searchsorted, so
+the feeds and diapers between two weighings are a difference of two running
+totals, whatever the length of the log.
+"""
+import numpy as np
+
+from .parsing import DATETIME_FORMATS, _strptime_any
+
+EVENT_KINDS = ("breast", "bottle", "wet", "dirty")
+FEED_KINDS = ("breast", "bottle")
+
+
+class FeedingLog:
+    """Feeding and diaper events of one infant, exposed as sorted arrays"""
+
+    def __init__(self):
+        self._times = []
+        self._kinds = []
+        self._amounts = []
+        self._arrays = None
+
+    def add(self, datetime_event, event, amount_ml=None):
+        """Add one event (a name from EVENT_KINDS) with its date and time"""
+        event = event.strip().lower()
+        if event not in EVENT_KINDS:
+            raise ValueError(f"Unknown event '{event}'. Choose from: {', '.join(EVENT_KINDS)}")
+        self._times.append(datetime_event)
+        self._kinds.append(EVENT_KINDS.index(event))
+        self._amounts.append(np.nan if amount_ml is None else float(amount_ml))
+        self._arrays = None
+
+    def __len__(self):
+        return len(self._times)
+
+    def arrays(self):
+        """(times as datetime64[s], kind index, amount in ml or NaN), sorted by time"""
+        if self._arrays is None:
+            times = np.array(self._times, dtype="datetime64[s]")
+            order = np.argsort(times, kind="stable")
+            self._arrays = (times[order], np.array(self._kinds, dtype=np.int8)[order],
+                            np.array(self._amounts, dtype=float)[order])
+        return self._arrays
+
+    def running_totals(self):
+        """
+        Running totals after each event, with a leading zero row
+
+        Returns {name: array of len(self) + 1}: ml per feed kind and in total
+        ("intake"), and counts of feeds and of every diaper kind.
+        """
+        _, kinds, amounts = self.arrays()
+        volume = np.nan_to_num(amounts)
+        totals = {}
+        for kind in FEED_KINDS:
+            totals[f"{kind}_ml"] = np.cumsum(np.where(kinds == EVENT_KINDS.index(kind), volume, 0))
+        totals["intake_ml"] = totals["breast_ml"] + totals["bottle_ml"]
+        totals["feeds"] = np.cumsum(np.isin(kinds, [EVENT_KINDS.index(kind) for kind in FEED_KINDS]))
+        for kind in ("wet", "dirty"):
+            totals[kind] = np.cumsum(kinds == EVENT_KINDS.index(kind))
+        return {name: np.concatenate([[0], values]) for name, values in totals.items()}
+
+
+def parse_feeding_lines(lines):
+    """
+    Parse feeding log lines into a FeedingLog
+
+    Returns a tuple (log, skipped) where skipped is a list of (line, error)
+    for invalid rows, like parse_measurement_lines.
+    """
+    log = FeedingLog()
+    skipped = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        parts = [p.strip() for p in line.split(',')]
+        if len(parts) < 3 or parts[2].lower() == 'event':
+            continue
+        try:
+            amount = float(parts[3]) if len(parts) > 3 and parts[3] else None
+            log.add(_strptime_any(f"{parts[0]} {parts[1]}", DATETIME_FORMATS), parts[2], amount)
+        except ValueError as e:
+            skipped.append((line, e))
+    return log, skipped
+
+
+def read_feeding_csv(file_path):
+    """Read a feeding log CSV file, see parse_feeding_lines"""
+    with open(file_path, 'r') as f:
+        return parse_feeding_lines(f)
+
+
+def join_feedings(store, log):
+    """
+    As-of join of the feeding log onto the weighings of a MeasurementStore
+
+    Every weighing gets the feeds and diapers since the previous weighing
+    (since the start of the log for the first one). Returns a dict of arrays,
+    one entry per weighing:
+    - hours: hours since birth of the weighing; weight: weight in grams
+    - interval_hours, gain_g: time and weight change since the previous weighing
+    - intake_ml, breast_ml, bottle_ml, feeds, wet, dirty: events in the interval
+    - ml_per_gram: intake per gram gained (NaN unless weight was gained)
+    - ml_per_kg_day: intake per kg of the previous weight per day
+    """
+    weights = store.weights
+    weighed = ~np.isnan(weights)
+    weights = weights[weighed]
+    hours = store.hours_since_birth()[weighed]
+    weigh_times = np.array(store.datetimes, dtype="datetime64[s]")[weighed]
+
+    times, _, _ = log.arrays()
+    # Events at or before each weighing
+    counts = np.searchsorted(times, weigh_times, side="right")
+    joined = {"hours": hours, "weight": weights,
+              "interval_hours": np.diff(hours, prepend=np.nan),
+              "gain_g": np.diff(weights, prepend=np.nan)}
+    for name, totals in log.running_totals().items():
+        joined[name] = np.diff(totals[counts], prepend=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        joined["ml_per_gram"] = np.where(joined["gain_g"] > 0, joined["intake_ml"] / joined["gain_g"], np.nan)
+        previous_kg = np.concatenate([[np.nan], weights[:-1]]) / 1000
+        joined["ml_per_kg_day"] = joined["intake_ml"] / previous_kg / (joined["interval_hours"] / 24)
+    return joined
+
+
+def intake_summary(joined):
+    """Total intake, weight gained from the lowest weight on, and ml per gram over that stretch"""
+    nadir = int(np.argmin(joined["weight"]))
+    intake = float(joined["intake_ml"][nadir + 1:].sum())
+    gain = float(joined["weight"][-1] - joined["weight"][nadir])
+    return {"intake_ml": intake, "gain_g": gain, "ml_per_gram": intake / gain if gain > 0 else np.nan,
+            "nadir_hours": float(joined["hours"][nadir])}
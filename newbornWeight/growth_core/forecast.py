@@ -0,0 +1,109 @@
+"""
+Weight-trajectory forecasting with a batched log-growth model
+
+Each infant's weight is modelled as
+
+    w(t) = a + b*t + c*log(1 + t)        (t in days since birth)
+
+which follows the usual newborn pattern: with c < 0 the weight first drops,
+then the linear term takes over and the baby regains. The model is linear in
+(a, b, c), so thousands of infants are fitted at once by stacking their
+normal equations into (infants x 3 x 3) arrays and solving them together,
+instead of one fit per infant. Prediction bands use the usual OLS
+prediction variance with a Student t quantile.
+"""
+import numpy as np
+from scipy.stats import t as student_t
+
+N_PARAMS = 3
+# Tiny ridge term so infants with fewer than 3 distinct times still solve
+RIDGE = 1e-6
+
+
+def design_matrix(days):
+    """Model basis [1, t, log(1 + t)] for an array of ages in days"""
+    days = np.asarray(days, dtype=float)
+    return np.stack([np.ones_like(days), days, np.log1p(np.clip(days, 0, None))], axis=-1)
+
+
+class GrowthForecast:
+    """Fitted log-growth models of one or more infants"""
+
+    def __init__(self, coef, inverse, sigma2, dof):
+        self.coef = coef            # (infants, 3)
+        self.inverse = inverse      # (infants, 3, 3), inverse of X'X
+        self.sigma2 = sigma2        # (infants,), residual variance (NaN if dof == 0)
+        self.dof = dof              # (infants,), residual degrees of freedom
+
+    def __len__(self):
+        return len(self.coef)
+
+    def predict(self, days, level=0.95):
+        """
+        Predicted weight and prediction band at the given ages
+
+        Returns (mean, lower, upper), each of shape (infants, len(days)).
+        The band is NaN for infants with too few measurements.
+        """
+        x = design_matrix(days)                                   # (points, 3)
+        mean = self.coef @ x.T                                    # (infants, points)
+        leverage = np.einsum('pi,nij,pj->np', x, self.inverse, x)
+        with np.errstate(invalid='ignore'):
+            quantile = student_t.ppf(0.5 + level / 2, np.maximum(self.dof, 1))[:, None]
+            half_width = quantile * np.sqrt(self.sigma2[:, None] * (1 + leverage))
+        return mean, mean - half_width, mean + half_width
+
+    def weight_at(self, day):
+        """Projected weight of every infant at a single age (e.g. day 14)"""
+        return self.predict([day])[0][:, 0]
+
+    def regain_day(self, birth_weights, horizon=60, step=0.1):
+        """
+        First age after the predicted nadir at which each infant is back to birth weight
+
+        NaN if the forecast does not regain within the horizon.
+        """
+        grid = np.arange(0, horizon + step, step)
+        mean = self.predict(grid)[0]
+        nadir = np.argmin(mean, axis=1)
+        after_nadir = np.arange(len(grid))[None, :] > nadir[:, None]
+        regained = after_nadir & (mean >= np.asarray(birth_weights, dtype=float)[:, None])
+        first = np.argmax(regained, axis=1)
+        return np.where(regained.any(axis=1), grid[first], np.nan)
+
+
+def fit_growth_batch(days_list, weights_list):
+    """
+    Fit the log-growth model for many infants at once
+
+    Parameters:
+    - days_list: sequence of arrays, ages in days of each infant's measurements
+    - weights_list: matching sequence of weight arrays in grams
+    """
+    n = len(days_list)
+    lengths = np.array([len(d) for d in days_list])
+    width = max(lengths.max(initial=0), 1)
+
+    # Pad every infant to the same length; padded rows get zero weight
+    days = np.zeros((n, width))
+    weights = np.zeros((n, width))
+    mask = np.arange(width)[None, :] < lengths[:, None]
+    days[mask] = np.concatenate([np.asarray(d, dtype=float) for d in days_list]) if n else []
+    weights[mask] = np.concatenate([np.asarray(w, dtype=float) for w in weights_list]) if n else []
+
+    x = design_matrix(days) * mask[..., None]                      # (n, width, 3)
+    xtx = np.einsum('nki,nkj->nij', x, x) + RIDGE * np.eye(N_PARAMS)
+    xty = np.einsum('nki,nk->ni', x, weights)
+    inverse = np.linalg.inv(xtx)
+    coef = np.einsum('nij,nj->ni', inverse, xty)
+
+    residuals = (weights - np.einsum('nki,ni->nk', x, coef)) * mask
+    dof = lengths - N_PARAMS
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sigma2 = np.where(dof > 0, (residuals ** 2).sum(axis=1) / dof, np.nan)
+    return GrowthForecast(coef, inverse, sigma2, dof)
+
+
+def fit_growth(days, weights):
+    """Fit the log-growth model for a single infant"""
+    return fit_growth_batch([days], [weights])
@@ -0,0 +1,139 @@
+"""
+Gestational-age correction and a combined preterm/term reference grid
+
+Ages are expressed as postmenstrual age (PMA) in days: gestational age at
+birth plus days since birth. Term is 40 weeks (280 days), so the corrected age
+used with the WHO standards is PMA - 280.
+
+The Fenton-style preterm reference and the WHO z-score reference are fitted
+to Box-Cox LMS parameters and resampled onto one daily PMA grid, stored as a
+single contiguous array indexed [reference, sex, day, (L, M, S)]. Looking up
+z-scores for any mix of infants, sexes and references is then plain array
+indexing and arithmetic, without per-point Python.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from .interpolation import fit_lms
+from .reference import get_reference, normalize_sex
+
+TERM_DAYS = 280
+
+# References in the grid, in index order
+GRID_REFERENCES = ["fenton", "who"]
+SEXES = ["boys", "girls"]
+
+# Postmenstrual age covered by the grid: 22 weeks to 50 weeks
+GRID_START_DAY = 22 * 7
+GRID_END_DAY = 50 * 7
+
+# With reference "auto", Fenton is used before this PMA and WHO from it on:
+# term-equivalent age, where the WHO standard starts, so term infants are
+# scored on WHO from birth
+FENTON_UNTIL_DAY = TERM_DAYS
+
+
+def gestational_days(weeks, days=0):
+    """Gestational age in days from completed weeks plus days (e.g. 32+4)"""
+    return np.asarray(weeks) * 7 + np.asarray(days)
+
+
+def parse_gestational_age(text):
+    """Parse '32+4', '32w4d' or '32' into gestational age in days"""
+    text = text.strip().lower().replace("w", "+").replace("d", "")
+    weeks, _, days = text.partition("+")
+    return int(gestational_days(int(weeks), int(days or 0)))
+
+
+def postmenstrual_age_days(ga_days, days_since_birth):
+    """Postmenstrual age in days for measurements taken days_since_birth after birth"""
+    return np.asarray(ga_days, dtype=float) + np.asarray(days_since_birth, dtype=float)
+
+
+def corrected_age_days(ga_days, days_since_birth):
+    """Age corrected for prematurity (negative before term-equivalent age)"""
+    return postmenstrual_age_days(ga_days, days_since_birth) - TERM_DAYS
+
+
+class ReferenceGrid:
+    """LMS parameters of every reference and sex on a shared daily PMA grid"""
+
+    def __init__(self):
+        self.days = np.arange(GRID_START_DAY, GRID_END_DAY + 1, dtype=float)
+        # lms[reference, sex, day, parameter]; NaN outside a reference's range
+        self.lms = np.full((len(GRID_REFERENCES), len(SEXES), len(self.days), 3), np.nan)
+        for s, sex in enumerate(SEXES):
+            self._fill(0, s, get_reference("fenton", sex), offset=0)
+            self._fill(1, s, get_reference("who_zscores", sex), offset=TERM_DAYS)
+        self.lms = np.ascontiguousarray(self.lms)
+
+    def _fill(self, r, s, table, offset):
+        """Resample a table's fitted LMS onto the grid (table days + offset = PMA)"""
+        params = np.column_stack(fit_lms(table))
+        pma = table.days + offset
+        inside = (self.days >= pma[0]) & (self.days <= pma[-1])
+        for p in range(3):
+            self.lms[r, s, inside, p] = np.interp(self.days[inside], pma, params[:, p])
+
+    def lookup(self, pma_days, sex_index, reference_index):
+        """
+        L, M and S at the given PMA (linear between grid days)
+
+        All arguments broadcast against each other, so one call can cover
+        infants of different sexes and references.
+        """
+        position = np.asarray(pma_days, dtype=float) - GRID_START_DAY
+        valid = (position >= 0) & (position <= len(self.days) - 1)
+        position = np.clip(position, 0, len(self.days) - 1)
+        i0 = np.minimum(position.astype(int), len(self.days) - 2)
+        frac = (position - i0)[..., None]
+        before = self.lms[reference_index, sex_index, i0]
+        after = self.lms[reference_index, sex_index, i0 + 1]
+        params = before + (after - before) * frac
+        params[~valid] = np.nan
+        return params[..., 0], params[..., 1], params[..., 2]
+
+    def zscores(self, pma_days, weights, sex_index, reference_index):
+        """Weight-for-PMA z-scores, NaN where the reference does not cover the age"""
+        l, m, s = self.lookup(pma_days, sex_index, reference_index)
+        return ((np.asarray(weights, dtype=float) / m) ** l - 1) / (l * s)
+
+    def weights_for_z(self, pma_days, z, sex_index, reference_index):
+        """Weight at the given PMA for z-score z"""
+        l, m, s = self.lookup(pma_days, sex_index, reference_index)
+        return m * np.clip(1 + l * s * z, 1e-9, None) ** (1 / l)
+
+
+@lru_cache(maxsize=None)
+def get_reference_grid():
+    """Return the process-wide ReferenceGrid, built on first use"""
+    return ReferenceGrid()
+
+
+def reference_index(reference, pma_days):
+    """Grid reference index for each PMA; 'auto' picks Fenton before FENTON_UNTIL_DAY"""
+    pma_days = np.asarray(pma_days, dtype=float)
+    if reference == "auto":
+        return np.where(pma_days < FENTON_UNTIL_DAY, 0, 1)
+    return np.full(pma_days.shape, GRID_REFERENCES.index(reference))
+
+
+def corrected_zscores(ga_days, days_since_birth, weights, gender, reference="auto"):
+    """
+    z-scores of weights for infants born at ga_days of gestation
+
+    Parameters:
+    - ga_days: gestational age at birth in days (scalar or per measurement)
+    - days_since_birth: chronological age of every measurement
+    - weights: weights in grams
+    - gender: "boys"/"girls" (scalar or per measurement)
+    - reference: "fenton", "who" (by corrected age) or "auto"
+    """
+    pma = postmenstrual_age_days(ga_days, days_since_birth)
+    if isinstance(gender, str):
+        sex_index = SEXES.index(normalize_sex(gender))
+    else:
+        sex_index = np.array([SEXES.index(normalize_sex(value, strict=True)) for value in gender])
+    grid = get_reference_grid()
+    return grid.zscores(pma, weights, sex_index, reference_index(reference, pma))
@@ -0,0 +1,280 @@
+"""
+Tiered weight history for long records (years of device readings)
+
+Readings are kept in three tiers, all updated on every append:
+- raw: the readings of the last RAW_DAYS days before the newest one; older
+  readings are dropped from this tier
+- day and week: one row per day or week of life (buckets aligned to the
+  origin, usually the birth) with min, max, mean and last reading, covering
+  the whole record
+
+Tiers are NumPy columns in time order, so a query for an x-range is two
+np.searchsorted calls per tier and a slice. query() returns the finest tier
+with at most as many points as the axes can show, which makes drawing and
+summarizing a range depend on the screen resolution and not on the length of
+the record.
+"""
+import numpy as np
+
+# Days of raw readings kept before the newest one
+RAW_DAYS = 28
+# Aggregate tiers, finest first: (name, bucket width in hours)
+TIERS = (("day", 24), ("week", 7 * 24))
+# Initial capacity of every tier
+INITIAL_CAPACITY = 1024
+
+AGGREGATE_COLUMNS = {"keys": np.int64, "min": float, "max": float, "sum": float, "count": np.int64,
+                     "sum_hours": float, "last": float, "last_hours": float}
+
+
+class _Columns:
+    """Named NumPy columns that grow by doubling; rows can also be dropped from the front"""
+
+    def __init__(self, dtypes, capacity=INITIAL_CAPACITY):
+        self.data = {name: np.empty(capacity, dtype) for name, dtype in dtypes.items()}
+        self.start = 0
+        self.n = 0
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, name):
+        """Writable view of one column"""
+        return self.data[name][self.start:self.start + self.n]
+
+    def _reserve(self, extra):
+        capacity = len(next(iter(self.data.values())))
+        if self.start + self.n + extra <= capacity:
+            return
+        # Move the rows to the front, growing the arrays if they are still too small
+        capacity = max(capacity, 2 * (self.n + extra)) if self.n + extra > capacity // 2 else capacity
+        for name, column in self.data.items():
+            grown = np.empty(capacity, column.dtype)
+            grown[:self.n] = column[self.start:self.start + self.n]
+            self.data[name] = grown
+        self.start = 0
+
+    def extend(self, rows):
+        """Append rows given as {name: array or scalar}"""
+        count = len(rows["keys"] if "keys" in rows else rows["hours"])
+        self._reserve(count)
+        end = self.start + self.n
+        for name, values in rows.items():
+            self.data[name][end:end + count] = values
+        self.n += count
+
+    def insert(self, i, row):
+        """Insert one row at position i (O(n), only for out-of-order readings)"""
+        self._reserve(1)
+        at = self.start + i
+        end = self.start + self.n
+        for name, value in row.items():
+            column = self.data[name]
+            column[at + 1:end + 1] = column[at:end]
+            column[at] = value
+        self.n += 1
+
+    def drop_front(self, count):
+        self.start += count
+        self.n -= count
+
+
+class AggregateTier:
+    """Min, max, sum, count and last reading per bucket of width hours"""
+
+    def __init__(self, name, width):
+        self.name = name
+        self.width = width
+        self.rows = _Columns(AGGREGATE_COLUMNS)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _reduce(self, hours, values):
+        """One row per bucket of sorted readings"""
+        keys = np.floor(hours / self.width).astype(np.int64)
+        starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+        ends = np.concatenate([starts[1:], [len(keys)]])
+        return {"keys": keys[starts], "min": np.minimum.reduceat(values, starts),
+                "max": np.maximum.reduceat(values, starts), "sum": np.add.reduceat(values, starts),
+                "count": ends - starts, "sum_hours": np.add.reduceat(hours, starts),
+                "last": values[ends - 1], "last_hours": hours[ends - 1]}
+
+    def _merge(self, i, row):
+        """Fold one bucket row into existing row i"""
+        columns = self.rows
+        columns["min"][i] = min(columns["min"][i], row["min"])
+        columns["max"][i] = max(columns["max"][i], row["max"])
+        for name in ("sum", "count", "sum_hours"):
+            columns[name][i] += row[name]
+        if row["last_hours"] >= columns["last_hours"][i]:
+            columns["last"][i] = row["last"]
+            columns["last_hours"][i] = row["last_hours"]
+
+    def extend(self, hours, values):
+        """Add sorted readings"""
+        new = self._reduce(hours, values)
+        keys = self.rows["keys"]
+        if len(keys) and new["keys"][0] < keys[-1]:
+            # Readings older than the newest bucket: merge row by row
+            for j in range(len(new["keys"])):
+                row = {name: column[j] for name, column in new.items()}
+                keys = self.rows["keys"]
+                i = int(np.searchsorted(keys, row["keys"]))
+                if i < len(keys) and keys[i] == row["keys"]:
+                    self._merge(i, row)
+                else:
+                    self.rows.insert(i, row)
+            return
+        if len(keys) and new["keys"][0] == keys[-1]:
+            self._merge(len(keys) - 1, {name: column[0] for name, column in new.items()})
+            new = {name: column[1:] for name, column in new.items()}
+        self.rows.extend(new)
+
+    def span(self, x0, x1):
+        """Row slice of the buckets with readings in [x0, x1)"""
+        keys = self.rows["keys"]
+        return (int(np.searchsorted(keys, np.floor(x0 / self.width))),
+                int(np.searchsorted(keys, np.ceil(x1 / self.width))))
+
+    def view(self, i0, i1):
+        rows = {name: self.rows[name][i0:i1] for name in AGGREGATE_COLUMNS}
+        return {"tier": self.name, "hours": rows["sum_hours"] / rows["count"],
+                "mean": rows["sum"] / rows["count"], "min": rows["min"].copy(), "max": rows["max"].copy(),
+                "last": rows["last"].copy(), "last_hours": rows["last_hours"].copy(),
+                "count": rows["count"].copy()}
+
+
+class TieredHistory:
+    """Raw, daily and weekly tiers of one weight series, kept in sync on append"""
+
+    def __init__(self, origin, raw_days=RAW_DAYS, tiers=TIERS):
+        # Hours are counted from origin (the birth), so buckets are days and weeks of life
+        self.origin = np.datetime64(origin, "s")
+        self.raw_hours = raw_days * 24
+        self.raw = _Columns({"hours": float, "value": float})
+        # Raw readings before this hour have been dropped
+        self.raw_from = -np.inf
+        self.n = 0
+        self.first_hours = self.last_hours = None
+        self.tiers = [AggregateTier(name, width) for name, width in tiers]
+
+    @classmethod
+    def from_measurements(cls, origin, measurements, raw_days=RAW_DAYS):
+        """Build a history from (datetime, weight) pairs in any order"""
+        history = cls(origin, raw_days)
+        if measurements:
+            times, values = zip(*measurements)
+            history.extend(history.hours_of(times), np.array(values, dtype=float))
+        return history
+
+    def hours_of(self, datetimes):
+        """Hours since the origin of datetimes"""
+        return (np.array(datetimes, dtype="datetime64[s]") - self.origin).astype(float) / 3600
+
+    def __len__(self):
+        """Number of readings ever added"""
+        return self.n
+
+    def add(self, datetime_measured, weight):
+        """Add one reading"""
+        self.extend(self.hours_of([datetime_measured]), np.array([weight], dtype=float))
+
+    def extend(self, hours, values):
+        """Add readings given as hours since the origin and values; appending in time order is O(1) per reading"""
+        hours = np.asarray(hours, dtype=float)
+        values = np.asarray(values, dtype=float)
+        keep = ~np.isnan(values)
+        hours, values = hours[keep], values[keep]
+        if not len(hours):
+            return
+        order = np.argsort(hours, kind="stable")
+        hours, values = hours[order], values[order]
+        for tier in self.tiers:
+            tier.extend(hours, values)
+        self._extend_raw(hours, values)
+        self.n += len(hours)
+        self.first_hours = hours[0] if self.first_hours is None else min(self.first_hours, hours[0])
+        self.last_hours = hours[-1] if self.last_hours is None else max(self.last_hours, hours[-1])
+
+    def _extend_raw(self, hours, values):
+        raw_hours = self.raw["hours"]
+        newest = max(hours[-1], raw_hours[-1]) if len(raw_hours) else hours[-1]
+        cutoff = newest - self.raw_hours
+        recent = hours >= cutoff
+        if not recent.all():
+            self.raw_from = max(self.raw_from, cutoff)
+        hours, values = hours[recent], values[recent]
+        if len(raw_hours) and len(hours) and hours[0] < raw_hours[-1]:
+            for h, v in zip(hours, values):
+                self.raw.insert(int(np.searchsorted(self.raw["hours"], h, side="right")), {"hours": h, "value": v})
+        else:
+            self.raw.extend({"hours": hours, "value": values})
+        dropped = int(np.searchsorted(self.raw["hours"], cutoff))
+        if dropped:
+            self.raw.drop_front(dropped)
+            self.raw_from = max(self.raw_from, cutoff)
+
+    def _raw_view(self, i0, i1):
+        hours, values = self.raw["hours"][i0:i1].copy(), self.raw["value"][i0:i1].copy()
+        return {"tier": "raw", "hours": hours, "mean": values, "min": values, "max": values, "last": values,
+                "last_hours": hours, "count": np.ones(len(values), dtype=np.int64)}
+
+    def query(self, x0, x1, budget):
+        """
+        Readings between hours x0 and x1 from the finest tier with at most budget points
+
+        The range includes both ends. The tiers are tried finest first (raw
+        only if it still covers x0) and
+        the coarsest is used when none fits. One point past each end is
+        included so lines reach the edges of the axes. Returns a dict with the
+        tier name and arrays hours, mean, min, max, last and count; for the
+        raw tier min, max, mean and last are the readings themselves.
+        """
+        if x0 >= self.raw_from:
+            hours = self.raw["hours"]
+            i0, i1 = int(np.searchsorted(hours, x0)), int(np.searchsorted(hours, x1, side="right"))
+            if i1 - i0 <= budget:
+                return self._raw_view(max(i0 - 1, 0), min(i1 + 1, len(hours)))
+        for tier in self.tiers:
+            i0, i1 = tier.span(x0, np.nextafter(x1, np.inf))
+            if i1 - i0 <= budget or tier is self.tiers[-1]:
+                return tier.view(max(i0 - 1, 0), min(i1 + 1, len(tier)))
+
+    def _cover(self, level, x0, x1):
+        """Views whose readings together are those in [x0, x1), using tiers up to level"""
+        if level < 0:
+            hours = self.raw["hours"]
+            return [self._raw_view(int(np.searchsorted(hours, x0)), int(np.searchsorted(hours, x1)))]
+        tier = self.tiers[level]
+        if level == 0 and x0 < self.raw_from:
+            # Raw readings are gone: the buckets at the edges are counted whole
+            return [tier.view(*tier.span(x0, x1))]
+        # Buckets entirely inside the range; the edges come from the next finer tier
+        k0, k1 = np.ceil(x0 / tier.width), np.floor(x1 / tier.width)
+        if k0 >= k1:
+            return self._cover(level - 1, x0, x1)
+        keys = tier.rows["keys"]
+        inner = tier.view(int(np.searchsorted(keys, k0)), int(np.searchsorted(keys, k1)))
+        return [inner] + self._cover(level - 1, x0, k0 * tier.width) + self._cover(level - 1, k1 * tier.width, x1)
+
+    def stats(self, x0, x1):
+        """
+        min, max, mean, last and count of the readings between hours x0 and x1 (both included)
+
+        Whole weeks come from the week tier, the days at the edges from the
+        day tier and the hours at the edges from the raw tier, so the cost
+        depends on the number of tiers and not on the number of readings.
+        Where raw readings were already dropped, the edge days are counted
+        whole. Returns None when there are no readings in the range.
+        """
+        parts = [part for part in self._cover(len(self.tiers) - 1, x0, np.nextafter(x1, np.inf))
+                 if len(part["count"])]
+        if not parts:
+            return None
+        count = sum(int(part["count"].sum()) for part in parts)
+        latest = max(parts, key=lambda part: part["last_hours"].max())
+        return {"min": min(float(part["min"].min()) for part in parts),
+                "max": max(float(part["max"].max()) for part in parts),
+                "mean": sum(float((part["mean"] * part["count"]).sum()) for part in parts) / count,
+                "last": float(latest["last"][np.argmax(latest["last_hours"])]), "count": count}
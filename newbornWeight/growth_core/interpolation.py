@@ -0,0 +1,136 @@
+"""
+Pluggable interpolators over a ReferenceTable
+
+Every interpolator is built once per table and evaluated on an array of ages
+in days, returning a (columns x points) array of weights in grams:
+- "linear": np.interp between table days (newborn_weight_tracker.py)
+- "spline": interpolating cubic spline (baby_weight_tracker.py and
+  newborn_weight_tracker2.py)
+- "lms": Box-Cox LMS parameters fitted per table day, which also gives
+  z-scores for arbitrary weights
+"""
+import numpy as np
+from scipy.interpolate import make_interp_spline
+from scipy.stats import norm
+
+
+class Interpolator:
+    """Base class: evaluate all reference columns at the given ages"""
+
+    name = None
+
+    def __init__(self, table):
+        self.table = table
+
+    def evaluate(self, days):
+        """Return an array of shape (len(table.columns), len(days))"""
+        raise NotImplementedError
+
+    def curves(self, days):
+        """Return {column: weights} for the given ages"""
+        values = self.evaluate(days)
+        return {column: values[i] for i, column in enumerate(self.table.columns)}
+
+
+class LinearInterpolator(Interpolator):
+    """Piecewise-linear interpolation between table days"""
+
+    name = "linear"
+
+    def evaluate(self, days):
+        days = np.asarray(days, dtype=float)
+        return np.array([np.interp(days, self.table.days, self.table.values[:, j])
+                         for j in range(len(self.table.columns))])
+
+
+class CubicSplineInterpolator(Interpolator):
+    """Interpolating cubic spline through every table point (all columns at once)"""
+
+    name = "spline"
+
+    def __init__(self, table):
+        super().__init__(table)
+        # A single vector-valued spline evaluates every column in one call
+        self._spline = make_interp_spline(table.days, table.values, k=3)
+
+    def evaluate(self, days):
+        return self._spline(np.asarray(days, dtype=float)).T
+
+
+# Candidate Box-Cox powers searched when fitting L
+_L_GRID = np.linspace(-2, 2, 81)
+
+
+def fit_lms(table):
+    """
+    Fit Box-Cox LMS parameters for every day of a table
+
+    For each day the median M is the z=0 curve, and L and S are chosen so that
+    M * (1 + L*S*z) ** (1/L) best reproduces the tabulated columns. The fit is
+    vectorized over days and a grid of L values.
+    """
+    z = table.z
+    y = table.values
+    m = np.array([np.interp(0.0, z, row) for row in y])
+
+    ratio = y / m[:, None]                                    # (days, cols)
+    lam = np.where(np.abs(_L_GRID) < 1e-6, 1e-6, _L_GRID)     # avoid L == 0
+    t = (ratio[:, None, :] ** lam[None, :, None] - 1) / lam[None, :, None]   # (days, L, cols)
+    s = (t * z).sum(axis=2) / (z * z).sum()                   # least squares slope per (day, L)
+
+    base = np.clip(1 + lam[None, :, None] * s[:, :, None] * z, 1e-9, None)
+    fitted = m[:, None, None] * base ** (1 / lam[None, :, None])
+    error = ((fitted - y[:, None, :]) ** 2).sum(axis=2)
+    best = np.argmin(error, axis=1)
+    rows = np.arange(len(m))
+    return lam[best], m, s[rows, best]
+
+
+class LMSInterpolator(Interpolator):
+    """Box-Cox LMS curves, with L, M and S interpolated between table days"""
+
+    name = "lms"
+
+    def __init__(self, table):
+        super().__init__(table)
+        l, m, s = fit_lms(table)
+        self._lms = make_interp_spline(table.days, np.column_stack([l, m, s]), k=3)
+
+    def lms(self, days):
+        """Return L, M and S arrays at the given ages"""
+        params = self._lms(np.asarray(days, dtype=float))
+        return params[..., 0], params[..., 1], params[..., 2]
+
+    def evaluate(self, days):
+        return self.weights_for_z(days, self.table.z[:, None])
+
+    def weights_for_z(self, days, z):
+        """Weight at the given ages for z-score(s) z (broadcast against days)"""
+        l, m, s = self.lms(days)
+        return m * np.clip(1 + l * s * z, 1e-9, None) ** (1 / l)
+
+    def zscores(self, days, weights):
+        """z-scores of weights measured at the given ages"""
+        l, m, s = self.lms(days)
+        return ((np.asarray(weights, dtype=float) / m) ** l - 1) / (l * s)
+
+    def percentiles(self, days, weights):
+        """Percentiles (0-100) of weights measured at the given ages"""
+        return norm.cdf(self.zscores(days, weights)) * 100
+
+
+INTERPOLATORS = {
+    cls.name: cls for cls in (LinearInterpolator, CubicSplineInterpolator, LMSInterpolator)
+}
+
+_cache = {}
+
+
+def get_interpolator(kind, table):
+    """Return a cached interpolator of the given kind for a table"""
+    key = (kind, table.name, table.sex)
+    if key not in _cache:
+        if kind not in INTERPOLATORS:
+            raise ValueError(f"Unknown interpolator '{kind}'. Choose from: {', '.join(INTERPOLATORS)}")
+        _cache[key] = INTERPOLATORS[kind](table)
+    return _cache[key]
@@ -0,0 +1,204 @@
+"""
+Live scale feed: the weight chart updated reading by reading
+
+The chart (reference curves, earlier weighings) is built once with
+build_weight_figure. Readings go into an array-backed buffer that doubles
+when full, and the live line is pointed at it with set_data. Every new
+reading is drawn by blitting: restore the saved background, draw only the
+new segment, save the background again (with that segment now part of it),
+draw the last-reading label and blit. The work per reading does not depend
+on how many readings came before. The whole figure is only redrawn when a
+reading falls outside the axes, and the limits then grow by half their span,
+so that happens a logarithmic number of times.
+
+Readings come from a file (followed as it grows), stdin ('-') or a TCP
+socket ('host:port'), read in a background thread, one per line as
+"weight" (timestamped on arrival), "date,time,weight" or "iso_datetime,weight".
+"""
+import queue
+import socket
+import sys
+import threading
+import time
+from datetime import datetime
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from .parsing import DATETIME_FORMATS, _strptime_any
+from .plotting import build_weight_figure
+
+# Initial capacity of the reading buffer
+INITIAL_CAPACITY = 1024
+# Fraction of the current span added when a reading falls outside the axes
+GROW_LIMITS = 0.5
+
+
+class ArraySeries:
+    """x/y pairs in preallocated arrays that double when full (amortized O(1) append)"""
+
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self._x = np.empty(capacity)
+        self._y = np.empty(capacity)
+        self.n = 0
+
+    def append(self, x, y):
+        if self.n == len(self._x):
+            self._x = np.concatenate([self._x, np.empty(len(self._x))])
+            self._y = np.concatenate([self._y, np.empty(len(self._y))])
+        self._x[self.n] = x
+        self._y[self.n] = y
+        self.n += 1
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def x(self):
+        return self._x[:self.n]
+
+    @property
+    def y(self):
+        return self._y[:self.n]
+
+
+class LiveWeightChart:
+    """Weight chart of a MeasurementStore that appends scale readings by blitting"""
+
+    def __init__(self, fig, store, unit="hours", gender="boys", style=None):
+        self.fig = fig
+        self.canvas = fig.canvas
+        self.scale = 24 if unit.lower() == "days" else 1
+        self.birth = store.birth_datetime
+        texts = style["texts"]
+        self.ax = build_weight_figure(fig, store, store.weights[0], unit, gender, style, compact=True)
+        self.series = ArraySeries()
+        # The full live line takes part in normal draws; the tail and label are only blitted
+        self.line, = self.ax.plot([], [], '.-', color='purple', linewidth=1, markersize=4,
+                                  label=texts.get("live", "Live readings"))
+        self.tail, = self.ax.plot([], [], '.-', color='purple', linewidth=1, markersize=4, animated=True)
+        self.label = self.ax.text(0.98, 0.02, "", transform=self.ax.transAxes, ha='right', va='bottom',
+                                  fontsize=12, color='purple', animated=True)
+        self.ax.legend(loc='upper left')
+        self.background = None
+        self.pending = False
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        """After a full draw: save the background and put the blitted artists back"""
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.ax.draw_artist(self.label)
+
+    def x_of(self, when):
+        return (when - self.birth).total_seconds() / 3600 / self.scale
+
+    def _fits(self, x, y):
+        (x0, x1), (y0, y1) = self.ax.get_xlim(), self.ax.get_ylim()
+        return x0 <= x <= x1 and y0 <= y <= y1
+
+    def _grow_limits(self, x, y):
+        for get, set_, value in ((self.ax.get_xlim, self.ax.set_xlim, x), (self.ax.get_ylim, self.ax.set_ylim, y)):
+            low, high = get()
+            span = (high - low) * GROW_LIMITS
+            set_(min(low, value - span) if value < low else low, max(high, value + span) if value > high else high)
+
+    def add(self, when, weight):
+        """Append one reading; draws its segment into the background, call flush() to show it"""
+        x = self.x_of(when)
+        previous = (self.series.x[-1], self.series.y[-1]) if len(self.series) else None
+        self.series.append(x, weight)
+        self.line.set_data(self.series.x, self.series.y)
+        self.label.set_text(f"{weight:.0f} g  {when:%H:%M:%S}")
+        self.pending = True
+
+        if self.background is None or not self._fits(x, weight):
+            # Full redraw; the background is saved again by _on_draw
+            self._grow_limits(x, weight)
+            self.background = None
+            return
+        self.canvas.restore_region(self.background)
+        self.tail.set_data([previous[0], x] if previous else [x], [previous[1], weight] if previous else [weight])
+        self.ax.draw_artist(self.tail)
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+
+    def flush(self):
+        """Show the readings added since the last flush"""
+        if not self.pending:
+            return
+        self.pending = False
+        if self.background is None:
+            self.canvas.draw()
+            self.canvas.blit(self.fig.bbox)
+            return
+        self.canvas.restore_region(self.background)
+        self.ax.draw_artist(self.label)
+        self.canvas.blit(self.fig.bbox)
+
+
+def parse_scale_line(line):
+    """Parse "weight", "date,time,weight" or "iso_datetime,weight" into (datetime, weight)"""
+    parts = [p.strip() for p in line.strip().split(',')]
+    if len(parts) == 1:
+        return datetime.now(), float(parts[0])
+    if len(parts) == 2:
+        return datetime.fromisoformat(parts[0]), float(parts[1])
+    return _strptime_any(f"{parts[0]} {parts[1]}", DATETIME_FORMATS), float(parts[2])
+
+
+def _source_lines(source, stop, poll_seconds=0.2):
+    """Yield lines from a file (followed as it grows), stdin ('-') or a 'host:port' socket"""
+    host, _, port = source.rpartition(":")
+    if host and port.isdigit():
+        with socket.create_connection((host, int(port))) as connection:
+            yield from connection.makefile('r')
+        return
+    f = sys.stdin if source == "-" else open(source, 'r')
+    try:
+        while not stop.is_set():
+            line = f.readline()
+            if line:
+                yield line
+            elif f is sys.stdin:
+                return
+            else:
+                time.sleep(poll_seconds)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def read_scale(source, readings, stop):
+    """Thread body: parse readings from source into the readings queue"""
+    for line in _source_lines(source, stop):
+        if stop.is_set():
+            break
+        if not line.strip() or 'weight' in line.lower():
+            continue
+        try:
+            readings.put(parse_scale_line(line))
+        except ValueError as e:
+            print(f"Skipping invalid scale reading: {line.strip()} ({e})")
+
+
+def run_live(chart, source, interval_ms=100):
+    """Read source in a thread and feed the chart from a canvas timer until the window closes"""
+    readings = queue.Queue()
+    stop = threading.Event()
+    threading.Thread(target=read_scale, args=(source, readings, stop), daemon=True).start()
+
+    def drain():
+        try:
+            while True:
+                chart.add(*readings.get_nowait())
+        except queue.Empty:
+            pass
+        chart.flush()
+
+    timer = chart.canvas.new_timer(interval=interval_ms)
+    timer.add_callback(drain)
+    timer.start()
+    try:
+        plt.show()
+    finally:
+        stop.set()
+        timer.stop()
@@ -0,0 +1,125 @@
+"""
+Multi-process z-score engine for very large batches of weighings
+
+The WHO z-score table (the SD columns of newborn_weight_tracker2.py) is fitted
+to LMS parameters and resampled onto an hourly grid for both sexes. That grid
+and the input columns (age in days, weight, sex) are copied once into
+multiprocessing.shared_memory blocks, and so are the output columns. Worker
+processes attach to the blocks by name and fill their share of the output in
+place: only block names and (start, stop) ranges are pickled, never the data.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from scipy.special import ndtr
+
+from .interpolation import get_interpolator
+from .reference import get_reference, normalize_sex
+
+# Resolution of the shared LMS grid in days (hourly)
+GRID_STEP_DAYS = 1 / 24
+# Rows per task; each worker also works through its task in blocks of this size
+CHUNK_ROWS = 1 << 18
+SEXES = ("boys", "girls")
+
+# Shared arrays attached in each worker process, by name
+_worker_arrays = {}
+_worker_blocks = []
+
+
+def lms_grid(reference="who_zscores"):
+    """L, M, S for both sexes on the hourly grid, shape (2, points, 3)"""
+    tables = [get_reference(reference, sex) for sex in SEXES]
+    days = np.arange(0, tables[0].max_day + GRID_STEP_DAYS / 2, GRID_STEP_DAYS)
+    return np.stack([np.column_stack(get_interpolator("lms", table).lms(days)) for table in tables])
+
+
+def _share(array):
+    """Copy an array into a new shared memory block; return (block, spec)"""
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def _attach(specs):
+    """Worker initializer: map every shared block as a NumPy array"""
+    for key, (name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=name)
+        _worker_blocks.append(block)
+        _worker_arrays[key] = np.ndarray(shape, dtype, buffer=block.buf)
+
+
+def _zscore_range(start, stop, arrays=None):
+    """Fill z-scores and percentiles of rows [start, stop) in the shared output"""
+    arrays = arrays or _worker_arrays
+    grid = arrays["grid"]
+    last = grid.shape[1] - 1
+    for lo in range(start, stop, CHUNK_ROWS):
+        rows = slice(lo, min(lo + CHUNK_ROWS, stop))
+        position = arrays["days"][rows] / GRID_STEP_DAYS
+        valid = (position >= 0) & (position <= last)
+        position = np.clip(position, 0, last)
+        i0 = np.minimum(position.astype(np.intp), last - 1)
+        frac = (position - i0)[:, None]
+        sex = arrays["sex"][rows]
+        params = grid[sex, i0] + (grid[sex, i0 + 1] - grid[sex, i0]) * frac
+        l, m, s = params[:, 0], params[:, 1], params[:, 2]
+        z = ((arrays["weights"][rows] / m) ** l - 1) / (l * s)
+        z[~valid] = np.nan
+        arrays["z"][rows] = z
+        arrays["percentiles"][rows] = ndtr(z) * 100
+    return stop - start
+
+
+def parallel_zscores(days, weights, sex, workers=None, reference="who_zscores", chunk_rows=None):
+    """
+    z-scores and percentiles of many weighings, computed across processes
+
+    Parameters:
+    - days: age at each weighing in days since birth
+    - weights: weights in grams
+    - sex: 0 for boys, 1 for girls, or any spelling normalize_sex knows
+      ("boy", "girls", "m", ...); ValueError for unknown ones
+    - workers: processes to use (default: CPU count); 1 computes in this
+      process without shared memory
+    - reference: reference table providing the SD columns
+    - chunk_rows: rows per task (default: an even split, at least CHUNK_ROWS)
+
+    Returns (z, percentiles) as float64 arrays; NaN outside the reference range.
+    """
+    days = np.ascontiguousarray(days, dtype=np.float64)
+    weights = np.ascontiguousarray(weights, dtype=np.float64)
+    sex = np.asarray(sex)
+    if sex.dtype.kind in "USO":
+        # Every spelling normalize_sex knows, checked once per distinct value
+        values, inverse = np.unique(sex, return_inverse=True)
+        codes = np.array([0 if normalize_sex(value, strict=True) == "boys" else 1 for value in values])
+        sex = codes[inverse].reshape(sex.shape)
+    sex = np.ascontiguousarray(np.broadcast_to(sex, days.shape), dtype=np.int8)
+    n = len(days)
+    workers = workers or os.cpu_count() or 1
+    inputs = {"grid": lms_grid(reference), "days": days, "weights": weights, "sex": sex}
+
+    if workers == 1:
+        arrays = dict(inputs, z=np.empty(n), percentiles=np.empty(n))
+        _zscore_range(0, n, arrays)
+        return arrays["z"], arrays["percentiles"]
+
+    blocks, specs = [], {}
+    try:
+        for key, array in list(inputs.items()) + [("z", np.empty(n)), ("percentiles", np.empty(n))]:
+            block, specs[key] = _share(array)
+            blocks.append(block)
+        chunk_rows = chunk_rows or max(CHUNK_ROWS, -(-n // (4 * workers)))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(specs,)) as pool:
+            starts = range(0, n, chunk_rows)
+            list(pool.map(_zscore_range, starts, [min(s + chunk_rows, n) for s in starts]))
+        # Copy the results out so the blocks can be released
+        z, percentiles = (np.array(np.ndarray((n,), np.float64, buffer=blocks[i].buf)) for i in (-2, -1))
+        return z, percentiles
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
@@ -0,0 +1,186 @@
+"""
+Date/time parsing and CSV readers for the weight tracker input formats
+
+Supported files:
+- simple format, optional "date,time,weight" header (baby_weight_tracker.py):
+      YYYY-MM-DD, HH:MM, weight_in_grams
+- birth-row format (newborn_weight_tracker*.py): the first row holds the birth
+  date, time and weight, the remaining rows are measurements. Every row may
+  carry two more columns, length and head circumference in cm; an empty cell
+  means not measured.
+"""
+import csv
+from datetime import datetime
+
+from .validation import MeasurementValidator, QuarantineReport
+
+DATETIME_FORMATS = [
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y %H:%M:%S",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y %H:%M:%S",
+]
+
+DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%d/%m/%Y",
+    "%m/%d/%Y",
+]
+
+def _strptime_any(text, formats):
+    """Parse text with the first matching format, in the order given, raising ValueError if none does"""
+    for fmt in formats:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Could not parse {'datetime' if formats is DATETIME_FORMATS else 'date'}: {text}")
+
+
+def parse_datetime(date_str, time_str=None):
+    """Parse date and optional time strings into datetime object"""
+    if time_str:
+        try:
+            return _strptime_any(f"{date_str.strip()} {time_str.strip()}", DATETIME_FORMATS)
+        except ValueError:
+            print(f"Error parsing date/time: {date_str} {time_str}")
+            raise
+    else:
+        try:
+            return _strptime_any(date_str.strip(), DATE_FORMATS)
+        except ValueError:
+            print(f"Error parsing date: {date_str}")
+            raise
+
+
+def calculate_hours_since_birth(birth_datetime, measurement_datetime):
+    """Calculate hours elapsed between birth and measurement"""
+    time_diff = measurement_datetime - birth_datetime
+    return time_diff.total_seconds() / 3600  # Convert seconds to hours
+
+
+def has_header(first_line):
+    """True if the line is a "date,time,weight" header"""
+    first_line = first_line.lower()
+    return 'date' in first_line and 'time' in first_line and 'weight' in first_line
+
+
+def _measurement_rows(lines, skipped):
+    """Yield (line number, datetime, weight) of simple-format lines one by one, adding invalid rows to skipped"""
+    first = True
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if first:
+            first = False
+            if has_header(line):
+                continue
+        parts = [p.strip() for p in line.split(',')]
+        if len(parts) < 3:
+            continue
+        try:
+            weight = float(parts[2])
+            yield line_number, _strptime_any(f"{parts[0]} {parts[1]}", DATETIME_FORMATS), weight
+        except ValueError as e:
+            skipped.append((line, e))
+
+
+def parse_measurement_lines(lines, report=None):
+    """
+    Parse simple-format lines into measurements
+
+    Returns a tuple (measurements, skipped) where measurements is a list of
+    (datetime, weight) and skipped a list of (line, error) for invalid rows.
+    With a QuarantineReport, every row goes through a MeasurementValidator as
+    it is parsed and the rejected ones are left out and recorded in report,
+    with their line numbers.
+    """
+    skipped = []
+    validator = MeasurementValidator(report) if report is not None else None
+    measurements = []
+    for line_number, datetime_measured, weight in _measurement_rows(lines, skipped):
+        if validator is None or validator.check(datetime_measured, weight, line_number) is None:
+            measurements.append((datetime_measured, weight))
+    return measurements, skipped
+
+
+def read_measurement_file(file_path, report=None):
+    """Read a simple-format CSV file, see parse_measurement_lines"""
+    with open(file_path, 'r') as f:
+        return parse_measurement_lines(f, report)
+
+
+def _optional_float(text):
+    """float of a CSV cell, None for an empty one"""
+    text = text.strip()
+    return float(text) if text else None
+
+
+def _birth_row_measurements(reader):
+    """Yield (line number, row) for the measurement rows of a birth-row CSV reader, skipping invalid ones"""
+    for row in reader:
+        if len(row) == 3:
+            date, time, weight = row
+            yield reader.line_num, (date, time, float(weight))
+        elif 4 <= len(row) <= 5:
+            date, time, *values = row + [""] * (5 - len(row))
+            yield reader.line_num, (date, time, *(_optional_float(value) for value in values))
+        # Other rows are invalid and skipped
+
+
+def _validated_birth_rows(birth_info, rows, report):
+    """Yield the rows a MeasurementValidator accepts, checked against the birth weight first"""
+    validator = MeasurementValidator(report)
+    # The birth row is checked (and reported) like any weighing but always kept
+    validator.check(_strptime_any(f"{birth_info[0].strip()} {birth_info[1].strip()}", DATETIME_FORMATS),
+                    birth_info[2], 1)
+    for line_number, row in rows:
+        date, time, weight = row[:3]
+        # Rows with only length or head circumference have no weight to check
+        if weight is None or validator.check(_strptime_any(f"{date.strip()} {time.strip()}", DATETIME_FORMATS),
+                                             weight, line_number) is None:
+            yield row
+
+
+def read_birth_row_csv(file_path, report=None):
+    """
+    Read birth info and measurements from a birth-row CSV file
+
+    Returns ((birth_date, birth_time, birth_weight), [(date, time, weight), ...]).
+    Rows with length and head circumference columns give 5-tuples
+    (..., weight, length_cm, head_cm) instead, with None for empty cells.
+    The weighings stream through a MeasurementValidator as they are read;
+    rejected ones are left out and recorded in report; without a report the
+    counts of its entries are printed. Raises ValueError if the birth row is malformed.
+    """
+    print_report = report is None
+    if print_report:
+        report = QuarantineReport()
+    with open(file_path, 'r', newline='') as csvfile:
+        reader = csv.reader(csvfile)
+
+        # First row should be: birth_date, birth_time, birth_weight[, length, head]
+        birth_info = next(reader)
+
+        # Validate birth info
+        if not 3 <= len(birth_info) <= 5:
+            raise ValueError("Birth info row must contain date, time, and weight (and optionally length, head)")
+
+        birth_date, birth_time, birth_weight, *birth_extra = birth_info
+        birth_weight = float(birth_weight)
+        birth_info = (birth_date, birth_time, birth_weight)
+        if birth_extra:
+            birth_extra += [""] * (2 - len(birth_extra))
+            birth_info += tuple(_optional_float(value) for value in birth_extra)
+
+        # Remaining rows are measurements: date, time, weight[, length, head]
+        measurements = list(_validated_birth_rows(birth_info, _birth_row_measurements(reader), report))
+
+    if print_report and report.entries:
+        # Counts only: a long file can have many rejected rows
+        counts = ", ".join(f"{count} {reason}" for reason, count in report.counts().items())
+        print(f"{file_path}: accepted {report.accepted} weighings, quarantined {len(report.quarantined)} ({counts})")
+    return birth_info, measurements
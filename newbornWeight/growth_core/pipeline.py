@@ -0,0 +1,113 @@
+"""
+Pipelined batch rendering of weight charts
+
+Three stages run concurrently so parsing, drawing and encoding overlap:
+1. a reader thread parses each birth-row CSV file into a MeasurementStore
+2. the calling thread builds one matplotlib Figure per infant
+3. a bounded thread pool encodes the figures (PNG/PDF/...) and writes them
+
+Both hand-offs are bounded (a queue between 1 and 2, a semaphore in front of
+the pool) so a fast stage blocks instead of piling up figures in memory.
+"""
+import contextlib
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from matplotlib.figure import Figure
+
+from .parsing import read_birth_row_csv
+from .plotting import build_weight_figure, compact_svg_rc, save_compact_svg
+from .store import MeasurementStore
+
+_DONE = object()
+
+
+def _parse_stage(paths, parsed, errors):
+    """Stage 1: read and parse every file, then signal the end of the stream"""
+    for path in paths:
+        try:
+            birth_info, measurements = read_birth_row_csv(path)
+            store = MeasurementStore.from_birth_info(birth_info, measurements)
+            parsed.put((path, birth_info, store))
+        except Exception as e:
+            errors.append((path, e))
+    parsed.put(_DONE)
+
+
+def _encode_stage(fig, outputs, dpi, compact):
+    """Stage 3: encode a finished figure to every requested output file"""
+    for output_file in outputs:
+        if compact and output_file.endswith(".svg"):
+            save_compact_svg(fig, output_file)
+        elif compact:
+            fig.savefig(output_file, dpi=dpi)
+        else:
+            fig.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    return outputs
+
+
+def render_batch(paths, style, output_dir, unit="hours", gender="boys", formats=("png",), dpi=300,
+                 encode_workers=None, queue_size=8, compact=False):
+    """
+    Render the weight chart of many birth-row CSV files
+
+    Parameters:
+    - paths: CSV files in the read_birth_row_csv format
+    - style: chart style dict (see CHART_STYLE in the tracker scripts)
+    - output_dir: directory for the charts, named after each input file
+    - unit, gender: as in plot_weight_chart
+    - formats: file extensions to write for every chart (e.g. ("png", "pdf"))
+    - dpi: resolution for raster formats
+    - encode_workers: encoder threads (default: number of CPUs)
+    - queue_size: parsed files waiting to be drawn before the reader blocks
+    - compact: draw without the data table and skip the tight bounding box
+      pass (small SVG output, see save_compact_svg)
+
+    Returns a tuple (written, errors): the list of files written and a list
+    of (path, exception) for inputs that failed.
+    """
+    encode_workers = encode_workers or os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+
+    parsed = queue.Queue(maxsize=queue_size)
+    errors = []
+    reader = threading.Thread(target=_parse_stage, args=(paths, parsed, errors), daemon=True)
+    reader.start()
+
+    # At most two figures per encoder may be waiting or in flight
+    slots = threading.BoundedSemaphore(2 * encode_workers)
+    pending = []
+    # The SVG options are global rcParams: set them here, not from the encoder threads,
+    # and restore them once the pool has finished
+    svg_options = compact_svg_rc() if compact and "svg" in formats else contextlib.nullcontext()
+    with svg_options, ThreadPoolExecutor(max_workers=encode_workers) as pool:
+        while True:
+            item = parsed.get()
+            if item is _DONE:
+                break
+            path, birth_info, store = item
+            name = os.path.splitext(os.path.basename(path))[0]
+            outputs = [os.path.join(output_dir, f"{name}.{fmt}") for fmt in formats]
+            try:
+                # Stage 2: build the figure outside pyplot so it can be handed to another thread
+                fig = Figure(figsize=(12, 8))
+                build_weight_figure(fig, store, birth_info[2], unit, gender, style, dpi, compact)
+            except Exception as e:
+                errors.append((path, e))
+                continue
+
+            slots.acquire()
+            future = pool.submit(_encode_stage, fig, outputs, dpi, compact)
+            future.add_done_callback(lambda _: slots.release())
+            pending.append((path, future))
+
+    reader.join()
+    written = []
+    for path, future in pending:
+        try:
+            written.extend(future.result())
+        except Exception as e:
+            errors.append((path, e))
+    return written, errors
@@ -0,0 +1,277 @@
+"""
+Weight chart shared by newborn_weight_tracker.py and newborn_weight_tracker2.py
+
+The scripts only differ in reference data, interpolation and wording, which
+they pass in as a style dict (see CHART_STYLE in each script).
+"""
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+
+from .feeding import join_feedings
+from .forecast import fit_growth
+from .interpolation import get_interpolator
+from .reference import get_reference
+from .sampling import adaptive_sample_grid, decimate_series, series_point_budget, table_rows
+from .store import MeasurementStore
+
+# rcParams of the compact SVG output (text as text, stable ids)
+COMPACT_SVG_RC = {'svg.fonttype': 'none', 'svg.hashsalt': 'growth_core'}
+
+
+def build_weight_figure(fig, store, birth_weight, unit="hours", gender="boys", style=None, render_dpi=None,
+                        compact=False, forecast_days=None, feeding=None, history=None):
+    """
+    Draw the weight chart of a MeasurementStore into a matplotlib Figure
+
+    Only the object-oriented matplotlib API is used, so figures can be built
+    outside pyplot (e.g. by the batch pipeline) and encoded in other threads.
+
+    Parameters:
+    - fig: Figure to draw into
+    - store: MeasurementStore whose first measurement is the birth weight
+    - birth_weight: birth weight shown in the birth info text
+    - unit: "hours" or "days" for x-axis
+    - gender: "boys" or "girls" for appropriate growth curves
+    - style: chart style dict with the reference, interpolator and texts
+    - render_dpi: dpi the figure will be saved at (default: figure dpi)
+    - compact: leave out the data table and use a fixed layout instead of
+      tight_layout, for small vector output (see save_compact_svg)
+    - forecast_days: if given, draw the log-growth forecast and its 95%
+      prediction band this many days past the last measurement
+    - feeding: optional FeedingLog; the intake between weighings (ml/day)
+      is drawn on a secondary y axis
+    - history: optional TieredHistory of device readings (hours since the
+      same birth), drawn from the tier that fits the x-range, see plot_history
+    """
+    days_unit = unit.lower() == "days"
+    texts = style["texts"]
+
+    birth_datetime = store.birth_datetime
+    measurement_times = store.hours_since_birth()
+    weights = store.weights
+    # Visits where only length or head circumference was measured are left out
+    weighed = ~np.isnan(weights)
+    measurement_times, weights = measurement_times[weighed], weights[weighed]
+
+    # Adjust x-axis to days if requested
+    x_values = measurement_times / 24 if days_unit else measurement_times
+    x_label = texts["x_label_days"] if days_unit else texts["x_label_hours"]
+
+    ax = fig.add_subplot(1, 1, 1)
+
+    # Get max hours to determine how far to extend percentile curves
+    table = get_reference(style["reference"], gender)
+    last_hour = max(measurement_times)
+    if history is not None and len(history):
+        last_hour = max(last_hour, history.last_hours)
+    max_hours = last_hour * 1.1  # Add 10% for margin
+    if forecast_days:
+        max_hours = max(max_hours, last_hour + forecast_days * 24)
+    if style.get("clip_to_reference"):
+        max_hours = min(max_hours, table.max_day * 24)
+    # Sample curves and points for the resolution the chart is rendered at
+    hours_range = adaptive_sample_grid(0, max_hours, ax, render_dpi)
+
+    # Get percentile curves
+    interpolator = get_interpolator(style["interpolator"], table)
+    curves = interpolator.evaluate(hours_range / 24)
+
+    # Plot percentile lines
+    x = hours_range / 24 if days_unit else hours_range
+    for column, values in zip(table.columns, curves):
+        ax.plot(x, values, '-', color=style["colors"][column],
+                alpha=0.7, linewidth=1.5, label=style["labels"][column])
+
+    # Plot the forecast as a shaded prediction band
+    if forecast_days:
+        last_hour = max(measurement_times)
+        forecast_hours = np.linspace(last_hour, last_hour + forecast_days * 24, 100)
+        forecast = fit_growth(measurement_times / 24, weights)
+        mean, lower, upper = (values[0] for values in forecast.predict(forecast_hours / 24))
+        forecast_x = forecast_hours / 24 if days_unit else forecast_hours
+        ax.fill_between(forecast_x, lower, upper, color='red', alpha=0.15, linewidth=0)
+        ax.plot(forecast_x, mean, '--', color='red', linewidth=1.5,
+                label=texts.get("forecast", "Forecast (95% band)"))
+
+    # Plot the baby's measurements with larger markers, decimating long series
+    shown = decimate_series(x_values, weights, ax, render_dpi)
+    ax.plot(x_values[shown], weights[shown], 'o-', color='red', markersize=8,
+            linewidth=2, label=texts["series"])
+
+    # Device readings from the tier that fits the axes; the x-range is fixed first so it can be followed
+    if history is not None and len(history):
+        ax.set_xlim(0, max_hours / 24 if days_unit else max_hours)
+        plot_history(ax, history, 24 if days_unit else 1, render_dpi,
+                     label=texts.get("device", "Device readings"))
+
+    # Intake between weighings on a secondary axis, from the as-of join with the feeding log
+    if feeding is not None and len(feeding):
+        joined = join_feedings(store, feeding)
+        intake_per_day = joined["intake_ml"][1:] / (joined["interval_hours"][1:] / 24)
+        ax_intake = ax.twinx()
+        ax_intake.step(x_values[1:], intake_per_day, where='pre', color='green', alpha=0.6, linewidth=1.5,
+                       label=texts.get("intake", "Intake between weighings"))
+        ax_intake.set_ylabel(texts.get("y_label_intake", "Intake (ml/day)"), fontsize=12, color='green')
+        ax_intake.set_ylim(bottom=0)
+        ax_intake.legend(loc='lower right')
+
+    # Add labels and title
+    ax.set_xlabel(x_label, fontsize=12)
+    ax.set_ylabel(texts["y_label"], fontsize=12)
+    ax.set_title(texts["title"].format(gender=gender.capitalize()), fontsize=14)
+
+    # Add grid
+    ax.grid(True, linestyle='--', alpha=0.7)
+
+    # Add legend
+    ax.legend(loc='upper left')
+
+    # Add birth info text
+    birth_date_display = birth_datetime.strftime("%Y-%m-%d %H:%M")
+    birth_info_text = texts["birth"].format(date=birth_date_display, weight=birth_weight)
+    fig.text(0.02, texts.get("birth_y", 0.02), birth_info_text, fontsize=10)
+
+    # Add reference text
+    if texts.get("reference"):
+        fig.text(0.02, 0.06, texts["reference"], fontsize=8, style='italic')
+
+    if compact:
+        fig.subplots_adjust(left=0.08, right=0.97, bottom=0.15, top=0.9)
+        return ax
+
+    # Add data table to the figure
+    table_data = [texts["table_header"]]
+    for i in table_rows(len(weights)):
+        time_val, weight_val = measurement_times[i], weights[i]
+        if i == 0:
+            time_str = texts["table_birth"]
+        elif days_unit:
+            time_str = f"{time_val/24:.1f} {texts['days']}"
+        else:
+            time_str = f"{time_val:.1f} {texts['hours']}"
+        table_data.append([time_str, f"{weight_val:.0f}"])
+
+    data_table = ax.table(cellText=table_data,
+                          loc='upper right',
+                          cellLoc='center',
+                          colWidths=[0.1, 0.1])
+    data_table.auto_set_font_size(False)
+    data_table.set_fontsize(9)
+    data_table.scale(1, 1.5)
+
+    # Adjust plot layout to make room for the table
+    fig.subplots_adjust(right=0.8)
+
+    fig.tight_layout()
+    return ax
+
+
+def plot_history(ax, history, scale=1, render_dpi=None, color='purple', label=None, fmt='.-', raw=None,
+                 **line_kwargs):
+    """
+    Draw a TieredHistory on axes whose x values are hours / scale
+
+    The readings between the x limits are read from the finest tier that fits
+    the axes width (see TieredHistory.query): raw readings as a line, daily or
+    weekly buckets as their mean with a shaded min-max band. The line follows
+    zoom and pan, so the number of points drawn never depends on the length
+    of the record. raw is an optional (hours, values) pair of every reading in
+    time order (e.g. from the MeasurementStore); its readings are drawn as
+    they are whenever the ones in the x-range fit the axes, however old they
+    are. Set the x limits before calling. Returns the line.
+    """
+    line, = ax.plot([], [], fmt, color=color, label=label, **line_kwargs)
+    band = []
+    if raw is not None:
+        raw_hours, raw_values = (np.asarray(column, dtype=float) for column in raw)
+        measured = ~np.isnan(raw_values)
+        raw_hours, raw_values = raw_hours[measured], raw_values[measured]
+
+    def update(ax):
+        x0, x1 = ax.get_xlim()
+        budget = series_point_budget(ax, render_dpi)
+        while band:
+            band.pop().remove()
+        if raw is not None:
+            i0 = int(np.searchsorted(raw_hours, x0 * scale))
+            i1 = int(np.searchsorted(raw_hours, x1 * scale, side="right"))
+            if i1 - i0 <= budget:
+                # One point past each end so the line reaches the edges of the axes
+                shown = slice(max(i0 - 1, 0), min(i1 + 1, len(raw_hours)))
+                line.set_data(raw_hours[shown] / scale, raw_values[shown])
+                return
+        view = history.query(x0 * scale, x1 * scale, budget)
+        x = view["hours"] / scale
+        line.set_data(x, view["mean"])
+        if view["tier"] != "raw":
+            band.append(ax.fill_between(x, view["min"], view["max"], color=color, alpha=0.2, linewidth=0))
+
+    update(ax)
+    ax.callbacks.connect('xlim_changed', update)
+    return line
+
+
+def plot_weight_chart(birth_info, measurements, unit="hours", gender="boys", output_file=None,
+                      style=None, forecast_days=None, feeding=None, history=None):
+    """
+    Plot the baby's weight measurements against standard growth curves
+
+    Parameters:
+    - birth_info: tuple of (birth_date, birth_time, birth_weight)
+    - measurements: list of tuples (date, time, weight_in_grams)
+    - unit: "hours" or "days" for x-axis
+    - gender: "boys" or "girls" for appropriate growth curves
+    - output_file: optional path to save the plot
+    - style: chart style dict with the reference, interpolator and texts
+    - forecast_days: optional forecast horizon in days past the last measurement
+    - feeding: optional FeedingLog drawn as intake on a secondary axis
+    - history: optional TieredHistory of device readings
+    """
+    try:
+        store = MeasurementStore.from_birth_info(birth_info, measurements)
+
+        # Create the figure
+        fig = plt.figure(figsize=(12, 8))
+        render_dpi = 300 if output_file else None
+        build_weight_figure(fig, store, birth_info[2], unit, gender, style, render_dpi,
+                            forecast_days=forecast_days, feeding=feeding, history=history)
+
+        # Save the figure if output file is specified
+        if output_file:
+            fig.savefig(output_file, dpi=300, bbox_inches='tight')
+            print(f"Chart saved to {output_file}")
+
+        # Show the plot
+        plt.show()
+
+    except Exception as e:
+        print(f"Error plotting chart: {str(e)}")
+        raise
+
+
+def compact_svg_rc():
+    """
+    Context with the rcParams save_compact_svg needs, restored on exit
+
+    The SVG backend only reads these options from the process-wide rcParams,
+    so batches that encode in worker threads enter it once in the main thread
+    around the whole pool.
+    """
+    return matplotlib.rc_context(COMPACT_SVG_RC)
+
+
+def save_compact_svg(fig, output_file):
+    """
+    Save a figure as a small SVG
+
+    Text is written as SVG text instead of glyph paths and the bounding box is
+    not recomputed, which keeps the file small and avoids an extra layout pass.
+    Build the figure with compact=True for best results. Outside a
+    compact_svg_rc context the options are set for this call only.
+    """
+    if all(matplotlib.rcParams[key] == value for key, value in COMPACT_SVG_RC.items()):
+        fig.savefig(output_file, format='svg')
+        return
+    with compact_svg_rc():
+        fig.savefig(output_file, format='svg')
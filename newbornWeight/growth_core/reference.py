@@ -0,0 +1,339 @@
+"""
+Reference growth tables shared by the weight tracker scripts
+
+Three reference sets are kept here, exactly as they were used by each script:
+- "who_percentiles": p3-p97 weight-for-age, 0-60 days (baby_weight_tracker.py)
+- "who_simple": simplified p3-p97 chart, 0-28 days (newborn_weight_tracker.py)
+- "who_zscores": WHO -3SD..+3SD weight-for-age, 0-60 days (newborn_weight_tracker2.py)
+- "fenton": preterm -3SD..+3SD weight-for-postmenstrual-age, 22-50 weeks; its
+  "days" are days of postmenstrual age, not days since birth
+- "who_length", "who_head": WHO length- and head-circumference-for-age, 0-60
+  days, in cm
+- "who_weight_length": WHO weight-for-length, 45-65 cm; its "days" are the
+  length in cm
+
+Every set is compiled once into a ReferenceTable holding a days vector and a
+(days x columns) array of values (grams, or cm for length and head
+circumference), so the interpolators work on plain NumPy arrays.
+"""
+import io
+from functools import lru_cache
+
+import numpy as np
+from scipy.stats import norm
+
+# WHO Growth Standards Data
+# Source: https://www.who.int/tools/child-growth-standards/standards/weight-for-age
+# These are weight-for-age values for boys from birth to 60 days in grams
+
+# WHO percentile data for boys 0-60 days (in grams)
+WHO_PERCENTILES_BOYS = {
+    'days': [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 35, 40, 45, 50, 55, 60],
+    'p3': [2500, 2400, 2350, 2350, 2350, 2400, 2450, 2500, 2550, 2600, 2650, 2700, 2750, 2800, 2850, 2900, 2950, 3000, 3050, 3100, 3150, 3200, 3250, 3300, 3350, 3400, 3450, 3500, 3550, 3600, 3650, 3900, 4150, 4400, 4650, 4850, 5050],
+    'p15': [2800, 2700, 2650, 2650, 2650, 2700, 2750, 2800, 2850, 2900, 2950, 3000, 3050, 3100, 3150, 3200, 3250, 3300, 3350, 3400, 3450, 3500, 3550, 3600, 3650, 3700, 3750, 3800, 3850, 3900, 3950, 4200, 4450, 4700, 4950, 5150, 5350],
+    'p50': [3300, 3200, 3100, 3100, 3100, 3150, 3200, 3250, 3300, 3350, 3400, 3450, 3500, 3550, 3600, 3650, 3700, 3750, 3800, 3850, 3900, 3950, 4000, 4050, 4100, 4150, 4200, 4250, 4300, 4350, 4400, 4650, 4900, 5150, 5400, 5600, 5800],
+    'p85': [3850, 3700, 3600, 3600, 3600, 3650, 3700, 3750, 3800, 3850, 3900, 3950, 4000, 4050, 4100, 4150, 4200, 4250, 4300, 4350, 4400, 4450, 4500, 4550, 4600, 4650, 4700, 4750, 4800, 4850, 4900, 5150, 5400, 5650, 5900, 6100, 6300],
+    'p97': [4250, 4100, 4000, 4000, 4000, 4050, 4100, 4150, 4200, 4250, 4300, 4350, 4400, 4450, 4500, 4550, 4600, 4650, 4700, 4750, 4800, 4850, 4900, 4950, 5000, 5050, 5100, 5150, 5200, 5250, 5300, 5550, 5800, 6050, 6300, 6500, 6700]
+}
+
+# WHO percentile data for girls 0-60 days (in grams)
+WHO_PERCENTILES_GIRLS = {
+    'days': [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 35, 40, 45, 50, 55, 60],
+    'p3': [2400, 2300, 2250, 2250, 2250, 2300, 2350, 2400, 2450, 2500, 2550, 2600, 2650, 2700, 2750, 2800, 2850, 2900, 2950, 3000, 3050, 3100, 3150, 3200, 3250, 3300, 3350, 3400, 3450, 3500, 3550, 3800, 4050, 4300, 4500, 4700, 4900],
+    'p15': [2650, 2550, 2500, 2500, 2500, 2550, 2600, 2650, 2700, 2750, 2800, 2850, 2900, 2950, 3000, 3050, 3100, 3150, 3200, 3250, 3300, 3350, 3400, 3450, 3500, 3550, 3600, 3650, 3700, 3750, 3800, 4050, 4300, 4550, 4750, 4950, 5150],
+    'p50': [3200, 3100, 3000, 3000, 3000, 3050, 3100, 3150, 3200, 3250, 3300, 3350, 3400, 3450, 3500, 3550, 3600, 3650, 3700, 3750, 3800, 3850, 3900, 3950, 4000, 4050, 4100, 4150, 4200, 4250, 4300, 4550, 4800, 5050, 5250, 5450, 5650],
+    'p85': [3750, 3600, 3500, 3500, 3500, 3550, 3600, 3650, 3700, 3750, 3800, 3850, 3900, 3950, 4000, 4050, 4100, 4150, 4200, 4250, 4300, 4350, 4400, 4450, 4500, 4550, 4600, 4650, 4700, 4750, 4800, 5050, 5300, 5550, 5750, 5950, 6150],
+    'p97': [4150, 4000, 3900, 3900, 3900, 3950, 4000, 4050, 4100, 4150, 4200, 4250, 4300, 4350, 4400, 4450, 4500, 4550, 4600, 4650, 4700, 4750, 4800, 4850, 4900, 4950, 5000, 5050, 5100, 5150, 5200, 5450, 5700, 5950, 6150, 6350, 6550]
+}
+
+
+# WHO standard weight-for-age percentiles for newborns (0-28 days)
+# Source data approximated from standard growth charts
+# Format: day, p3, p10, p25, p50, p75, p90, p97 (in grams)
+# Note: This is simplified data and should be replaced with actual WHO data for production use
+WHO_SIMPLE_BOYS = [
+    [0, 2500, 2700, 2900, 3300, 3600, 3900, 4200],  # Birth
+    [1, 2400, 2600, 2800, 3200, 3500, 3800, 4100],  # Day 1 (slight weight loss normal)
+    [2, 2350, 2550, 2750, 3150, 3450, 3750, 4050],  # Day 2
+    [3, 2300, 2500, 2700, 3100, 3400, 3700, 4000],  # Day 3
+    [4, 2320, 2520, 2720, 3120, 3420, 3720, 4020],  # Day 4
+    [5, 2350, 2550, 2750, 3150, 3450, 3750, 4050],  # Day 5
+    [6, 2380, 2580, 2780, 3180, 3480, 3780, 4080],  # Day 6
+    [7, 2410, 2610, 2810, 3210, 3510, 3810, 4110],  # Day 7
+    [10, 2500, 2700, 2900, 3300, 3600, 3900, 4200],  # Day 10
+    [14, 2600, 2800, 3000, 3400, 3700, 4000, 4300],  # Day 14
+    [21, 2800, 3000, 3200, 3600, 3900, 4200, 4500],  # Day 21
+    [28, 3000, 3200, 3400, 3800, 4100, 4400, 4700],  # Day 28
+]
+
+WHO_SIMPLE_GIRLS = [
+    [0, 2400, 2600, 2800, 3200, 3500, 3800, 4100],  # Birth
+    [1, 2300, 2500, 2700, 3100, 3400, 3700, 4000],  # Day 1
+    [2, 2250, 2450, 2650, 3050, 3350, 3650, 3950],  # Day 2
+    [3, 2200, 2400, 2600, 3000, 3300, 3600, 3900],  # Day 3
+    [4, 2220, 2420, 2620, 3020, 3320, 3620, 3920],  # Day 4
+    [5, 2250, 2450, 2650, 3050, 3350, 3650, 3950],  # Day 5
+    [6, 2280, 2480, 2680, 3080, 3380, 3680, 3980],  # Day 6
+    [7, 2310, 2510, 2710, 3110, 3410, 3710, 4010],  # Day 7
+    [10, 2400, 2600, 2800, 3200, 3500, 3800, 4100],  # Day 10
+    [14, 2500, 2700, 2900, 3300, 3600, 3900, 4200],  # Day 14
+    [21, 2700, 2900, 3100, 3500, 3800, 4100, 4400],  # Day 21
+    [28, 2900, 3100, 3300, 3700, 4000, 4300, 4600],  # Day 28
+]
+
+
+# Real WHO weight-for-age z-scores data (0-60 days)
+# Data based on WHO Child Growth Standards
+# Source: https://www.who.int/tools/child-growth-standards
+
+# WHO Boys weight-for-age 0-60 days (z-scores)
+WHO_ZSCORE_BOYS_STR = """
+Day,SD3neg,SD2neg,SD1neg,SD0,SD1,SD2,SD3
+0,2.1,2.5,2.9,3.3,3.9,4.4,5.0
+1,2.0,2.4,2.8,3.2,3.7,4.2,4.8
+2,1.9,2.3,2.7,3.1,3.6,4.0,4.6
+3,1.9,2.3,2.6,3.0,3.5,3.9,4.5
+4,1.9,2.3,2.6,3.0,3.4,3.8,4.4
+5,1.9,2.3,2.6,3.0,3.4,3.8,4.4
+6,1.9,2.3,2.6,3.0,3.4,3.8,4.4
+7,1.9,2.3,2.6,3.0,3.4,3.9,4.4
+8,2.0,2.3,2.7,3.1,3.5,3.9,4.5
+9,2.0,2.4,2.7,3.1,3.6,4.0,4.5
+10,2.1,2.4,2.8,3.2,3.6,4.1,4.6
+11,2.1,2.5,2.8,3.3,3.7,4.2,4.7
+12,2.1,2.5,2.9,3.3,3.8,4.3,4.8
+13,2.2,2.6,3.0,3.4,3.9,4.3,4.9
+14,2.2,2.6,3.0,3.4,3.9,4.4,5.0
+15,2.3,2.7,3.1,3.5,4.0,4.5,5.1
+16,2.3,2.7,3.1,3.6,4.1,4.6,5.1
+17,2.4,2.8,3.2,3.6,4.1,4.6,5.2
+18,2.4,2.8,3.2,3.7,4.2,4.7,5.3
+19,2.4,2.9,3.3,3.7,4.3,4.8,5.4
+20,2.5,2.9,3.3,3.8,4.3,4.9,5.5
+21,2.5,3.0,3.4,3.9,4.4,5.0,5.6
+22,2.6,3.0,3.4,3.9,4.5,5.0,5.7
+23,2.6,3.1,3.5,4.0,4.5,5.1,5.8
+24,2.7,3.1,3.5,4.0,4.6,5.2,5.8
+25,2.7,3.2,3.6,4.1,4.7,5.3,5.9
+26,2.8,3.2,3.7,4.2,4.7,5.3,6.0
+27,2.8,3.3,3.7,4.2,4.8,5.4,6.1
+28,2.9,3.3,3.8,4.3,4.9,5.5,6.2
+29,2.9,3.4,3.8,4.4,4.9,5.6,6.3
+30,3.0,3.4,3.9,4.4,5.0,5.7,6.4
+35,3.3,3.7,4.2,4.8,5.4,6.1,6.9
+40,3.5,4.0,4.5,5.1,5.8,6.5,7.3
+45,3.8,4.3,4.8,5.5,6.2,6.9,7.8
+50,4.0,4.6,5.1,5.8,6.5,7.3,8.2
+55,4.3,4.8,5.4,6.1,6.9,7.7,8.6
+60,4.5,5.1,5.7,6.4,7.2,8.1,9.0
+"""
+
+# WHO Girls weight-for-age 0-60 days (z-scores)
+WHO_ZSCORE_GIRLS_STR = """
+Day,SD3neg,SD2neg,SD1neg,SD0,SD1,SD2,SD3
+0,2.0,2.4,2.8,3.2,3.7,4.2,4.8
+1,1.9,2.3,2.7,3.1,3.6,4.0,4.6
+2,1.9,2.2,2.6,3.0,3.4,3.9,4.5
+3,1.8,2.1,2.5,2.9,3.3,3.8,4.3
+4,1.8,2.1,2.5,2.8,3.3,3.7,4.3
+5,1.8,2.1,2.4,2.8,3.2,3.7,4.2
+6,1.8,2.1,2.4,2.8,3.2,3.7,4.2
+7,1.8,2.1,2.4,2.8,3.2,3.7,4.3
+8,1.8,2.1,2.5,2.9,3.3,3.7,4.3
+9,1.9,2.2,2.5,2.9,3.3,3.8,4.3
+10,1.9,2.2,2.6,3.0,3.4,3.9,4.4
+11,2.0,2.3,2.6,3.0,3.5,3.9,4.5
+12,2.0,2.3,2.7,3.1,3.5,4.0,4.6
+13,2.1,2.4,2.7,3.2,3.6,4.1,4.7
+14,2.1,2.5,2.8,3.2,3.7,4.2,4.8
+15,2.2,2.5,2.9,3.3,3.8,4.3,4.9
+16,2.2,2.6,3.0,3.4,3.9,4.4,5.0
+17,2.3,2.6,3.0,3.5,4.0,4.5,5.1
+18,2.3,2.7,3.1,3.5,4.1,4.6,5.2
+19,2.4,2.8,3.2,3.6,4.1,4.7,5.3
+20,2.4,2.8,3.2,3.7,4.2,4.8,5.4
+21,2.5,2.9,3.3,3.8,4.3,4.9,5.5
+22,2.5,2.9,3.4,3.8,4.4,5.0,5.6
+23,2.6,3.0,3.4,3.9,4.5,5.0,5.7
+24,2.6,3.0,3.5,4.0,4.5,5.1,5.8
+25,2.7,3.1,3.5,4.0,4.6,5.2,5.9
+26,2.7,3.2,3.6,4.1,4.7,5.3,6.0
+27,2.8,3.2,3.7,4.2,4.8,5.4,6.1
+28,2.8,3.3,3.7,4.3,4.9,5.5,6.2
+29,2.9,3.3,3.8,4.3,4.9,5.6,6.3
+30,2.9,3.4,3.9,4.4,5.0,5.7,6.4
+35,3.2,3.7,4.2,4.7,5.4,6.1,6.9
+40,3.4,3.9,4.5,5.1,5.8,6.5,7.3
+45,3.7,4.2,4.8,5.4,6.1,6.9,7.7
+50,3.9,4.5,5.1,5.7,6.5,7.3,8.1
+55,4.1,4.7,5.3,6.0,6.8,7.6,8.5
+60,4.3,4.9,5.6,6.3,7.1,8.0,8.9
+"""
+
+
+# Fenton-style preterm weight-for-postmenstrual-age reference (22-50 weeks)
+# Medians and coefficients of variation approximated from the Fenton 2013
+# preterm growth charts. Note: This is simplified data and should be replaced
+# with the published Fenton LMS tables for clinical use.
+# Format: completed weeks of postmenstrual age, median weight in grams
+FENTON_WEEKS = list(range(22, 51))
+FENTON_BOYS_MEDIAN = [520, 600, 680, 770, 880, 1000, 1140, 1300, 1480, 1680, 1900, 2140, 2400, 2660, 2920,
+                      3180, 3420, 3640, 3850, 4060, 4280, 4500, 4720, 4940, 5150, 5350, 5550, 5740, 5920]
+FENTON_GIRLS_MEDIAN = [490, 560, 640, 730, 830, 950, 1080, 1230, 1400, 1590, 1800, 2030, 2280, 2530, 2780,
+                       3030, 3260, 3470, 3670, 3870, 4070, 4270, 4470, 4670, 4860, 5050, 5230, 5410, 5580]
+# Coefficient of variation, from 18% at 22 weeks down to 13% at 50 weeks
+FENTON_CV = list(np.round(np.linspace(0.18, 0.13, len(FENTON_WEEKS)), 4))
+
+
+# WHO length- and head-circumference-for-age, 0-60 days: median in cm and
+# coefficient of variation (the WHO L is 1 for both, so SD = median * CV).
+# Weekly values approximated from the WHO LMS tables. Note: This is simplified
+# data and should be replaced with the published daily tables for clinical use.
+WHO_GROWTH_DAYS = [0, 7, 14, 21, 28, 35, 42, 49, 56, 60]
+WHO_LENGTH_BOYS_MEDIAN = [49.9, 51.1, 52.3, 53.4, 54.4, 55.3, 56.2, 57.0, 57.8, 58.4]
+WHO_LENGTH_GIRLS_MEDIAN = [49.1, 50.3, 51.5, 52.5, 53.4, 54.3, 55.1, 55.9, 56.6, 57.1]
+WHO_LENGTH_BOYS_CV = list(np.round(np.linspace(0.0380, 0.0342, len(WHO_GROWTH_DAYS)), 4))
+WHO_LENGTH_GIRLS_CV = list(np.round(np.linspace(0.0379, 0.0357, len(WHO_GROWTH_DAYS)), 4))
+WHO_HEAD_BOYS_MEDIAN = [34.5, 35.2, 35.9, 36.5, 37.1, 37.6, 38.1, 38.5, 38.9, 39.1]
+WHO_HEAD_GIRLS_MEDIAN = [33.9, 34.6, 35.2, 35.8, 36.4, 36.9, 37.3, 37.7, 38.1, 38.3]
+WHO_HEAD_BOYS_CV = list(np.round(np.linspace(0.0369, 0.0300, len(WHO_GROWTH_DAYS)), 4))
+WHO_HEAD_GIRLS_CV = list(np.round(np.linspace(0.0350, 0.0317, len(WHO_GROWTH_DAYS)), 4))
+
+# WHO weight-for-length, 45-65 cm: Box-Cox power L, median weight in kg and
+# coefficient of variation, approximated from the WHO LMS tables
+WHO_WFL_LENGTHS = [45, 50, 55, 60, 65]
+WHO_WFL_BOYS = {"L": -0.3521, "M": [2.441, 3.346, 4.530, 5.970, 7.430],
+                "S": [0.0918, 0.0887, 0.0862, 0.0842, 0.0827]}
+WHO_WFL_GIRLS = {"L": -0.3833, "M": [2.461, 3.399, 4.550, 5.950, 7.300],
+                 "S": [0.0903, 0.0897, 0.0892, 0.0887, 0.0882]}
+
+
+class ReferenceTable:
+    """Growth reference curves compiled into contiguous arrays"""
+
+    def __init__(self, name, sex, days, columns, values, z, metric="weight", unit="g"):
+        self.name = name
+        self.sex = sex
+        # Measurement the values describe ("weight", "length", "head") and its unit
+        self.metric = metric
+        self.unit = unit
+        self.days = np.ascontiguousarray(days, dtype=float)
+        self.columns = list(columns)
+        # values[i, j] is the value (e.g. weight in grams) of column j at days[i]
+        self.values = np.ascontiguousarray(values, dtype=float)
+        # z-score represented by every column
+        self.z = np.asarray(z, dtype=float)
+
+    def column(self, name):
+        """Return the values of a single column"""
+        return self.values[:, self.columns.index(name)]
+
+    @property
+    def max_day(self):
+        return self.days[-1]
+
+    def __repr__(self):
+        return f"ReferenceTable({self.name!r}, {self.sex!r}, {len(self.days)} days, columns={self.columns})"
+
+
+SEX_SPELLINGS = {"boys": ("boy", "boys", "male", "m"), "girls": ("girl", "girls", "female", "f")}
+
+
+def normalize_sex(gender, strict=False):
+    """
+    Map the gender spellings used by the scripts to 'boys' or 'girls'
+
+    Unknown spellings are taken as 'girls', or raise ValueError when strict.
+    """
+    gender = str(gender).strip().lower()
+    for sex, spellings in SEX_SPELLINGS.items():
+        if gender in spellings:
+            return sex
+    if strict:
+        raise ValueError(f"Unknown sex '{gender}'. Use one of: "
+                         f"{', '.join(spelling for spellings in SEX_SPELLINGS.values() for spelling in spellings)}")
+    return "girls"
+
+
+def _percentile_z(columns):
+    """z-score of percentile column names such as 'p3' or 'p97'"""
+    return norm.ppf([float(c[1:]) / 100 for c in columns])
+
+
+def _from_percentile_dict(name, sex, data):
+    columns = [key for key in data if key != 'days']
+    values = np.column_stack([data[c] for c in columns])
+    return ReferenceTable(name, sex, data['days'], columns, values, _percentile_z(columns))
+
+
+def _from_rows(name, sex, rows):
+    columns = ['p3', 'p10', 'p25', 'p50', 'p75', 'p90', 'p97']
+    rows = np.asarray(rows, dtype=float)
+    return ReferenceTable(name, sex, rows[:, 0], columns, rows[:, 1:], _percentile_z(columns))
+
+
+def _from_sd_string(name, sex, text):
+    lines = text.strip().splitlines()
+    columns = lines[0].split(',')[1:]
+    data = np.loadtxt(io.StringIO("\n".join(lines[1:])), delimiter=',')
+    # Tables are in kg, convert to grams
+    return ReferenceTable(name, sex, data[:, 0], columns, data[:, 1:] * 1000,
+                          [-3, -2, -1, 0, 1, 2, 3])
+
+
+def _from_lms(name, sex, days, l, m, s, metric="weight", unit="g"):
+    """-3SD..+3SD columns of Box-Cox LMS parameters given at each of days"""
+    z = np.array([-3, -2, -1, 0, 1, 2, 3])
+    l, m, s = (np.broadcast_to(np.asarray(p, dtype=float), (len(days),))[:, None] for p in (l, m, s))
+    values = m * (1 + l * s * z) ** (1 / l)
+    columns = ['SD3neg', 'SD2neg', 'SD1neg', 'SD0', 'SD1', 'SD2', 'SD3']
+    return ReferenceTable(name, sex, days, columns, values, z, metric, unit)
+
+
+def _from_median_cv(name, sex, weeks, median, cv):
+    return _from_lms(name, sex, np.asarray(weeks) * 7, 1, median, cv)
+
+
+_SOURCES = {
+    ("who_percentiles", "boys"): lambda: _from_percentile_dict("who_percentiles", "boys", WHO_PERCENTILES_BOYS),
+    ("who_percentiles", "girls"): lambda: _from_percentile_dict("who_percentiles", "girls", WHO_PERCENTILES_GIRLS),
+    ("who_simple", "boys"): lambda: _from_rows("who_simple", "boys", WHO_SIMPLE_BOYS),
+    ("who_simple", "girls"): lambda: _from_rows("who_simple", "girls", WHO_SIMPLE_GIRLS),
+    ("who_zscores", "boys"): lambda: _from_sd_string("who_zscores", "boys", WHO_ZSCORE_BOYS_STR),
+    ("who_zscores", "girls"): lambda: _from_sd_string("who_zscores", "girls", WHO_ZSCORE_GIRLS_STR),
+    ("fenton", "boys"): lambda: _from_median_cv("fenton", "boys", FENTON_WEEKS, FENTON_BOYS_MEDIAN, FENTON_CV),
+    ("fenton", "girls"): lambda: _from_median_cv("fenton", "girls", FENTON_WEEKS, FENTON_GIRLS_MEDIAN, FENTON_CV),
+    ("who_length", "boys"): lambda: _from_lms("who_length", "boys", WHO_GROWTH_DAYS, 1, WHO_LENGTH_BOYS_MEDIAN,
+                                              WHO_LENGTH_BOYS_CV, "length", "cm"),
+    ("who_length", "girls"): lambda: _from_lms("who_length", "girls", WHO_GROWTH_DAYS, 1, WHO_LENGTH_GIRLS_MEDIAN,
+                                               WHO_LENGTH_GIRLS_CV, "length", "cm"),
+    ("who_head", "boys"): lambda: _from_lms("who_head", "boys", WHO_GROWTH_DAYS, 1, WHO_HEAD_BOYS_MEDIAN,
+                                            WHO_HEAD_BOYS_CV, "head", "cm"),
+    ("who_head", "girls"): lambda: _from_lms("who_head", "girls", WHO_GROWTH_DAYS, 1, WHO_HEAD_GIRLS_MEDIAN,
+                                             WHO_HEAD_GIRLS_CV, "head", "cm"),
+    # Tables are in kg, convert to grams
+    ("who_weight_length", "boys"): lambda: _from_lms("who_weight_length", "boys", WHO_WFL_LENGTHS, WHO_WFL_BOYS["L"],
+                                                     np.multiply(WHO_WFL_BOYS["M"], 1000), WHO_WFL_BOYS["S"]),
+    ("who_weight_length", "girls"): lambda: _from_lms("who_weight_length", "girls", WHO_WFL_LENGTHS,
+                                                      WHO_WFL_GIRLS["L"], np.multiply(WHO_WFL_GIRLS["M"], 1000),
+                                                      WHO_WFL_GIRLS["S"]),
+}
+
+REFERENCE_NAMES = sorted({name for name, _ in _SOURCES})
+
+
+@lru_cache(maxsize=None)
+def _compiled(name, sex):
+    return _SOURCES[(name, sex)]()
+
+
+def get_reference(name, gender):
+    """
+    Return the compiled ReferenceTable for a reference set and gender
+
+    Tables are built on first use and cached for the life of the process.
+    """
+    sex = normalize_sex(gender)
+    if (name, sex) not in _SOURCES:
+        raise ValueError(f"Unknown reference '{name}'. Choose from: {', '.join(REFERENCE_NAMES)}")
+    return _compiled(name, sex)
@@ -0,0 +1,112 @@
+"""
+Running growth statistics of one infant, updated in O(1) per weighing
+
+RunningStats keeps the birth weight, the nadir (lowest weight so far), the
+regain time, the last two weighings and the current z-score, so the status of
+an infant can be read without going over its measurements again. The
+z-score comes from the LMS parameters of the reference resampled onto a
+regular grid once per (reference, sex) and cached, so it is one index
+computation and a linear interpolation per weighing.
+
+Weighings must be added in time order; an earlier one sets out_of_order and
+leaves the statistics untouched, and the owner rebuilds them from its sorted
+measurements (see BabyWeightTracker).
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from .interpolation import get_interpolator
+from .reference import get_reference, normalize_sex
+
+# Points of the cached LMS grid of a reference
+GRID_POINTS = 2048
+
+
+@lru_cache(maxsize=None)
+def reference_lms_grid(reference, sex, points=GRID_POINTS):
+    """(first day, step in days, (points, 3) L/M/S array) of a reference on a regular grid"""
+    table = get_reference(reference, sex)
+    days = np.linspace(table.days[0], table.days[-1], points)
+    return float(days[0]), float(days[1] - days[0]), np.column_stack(get_interpolator("lms", table).lms(days))
+
+
+def grid_zscore(grid, day, weight):
+    """z-score of one weight at one age from a reference_lms_grid, None outside the reference"""
+    start, step, lms = grid
+    position = (day - start) / step
+    last = len(lms) - 1
+    if not 0 <= position <= last:
+        return None
+    i = min(int(position), last - 1)
+    l, m, s = lms[i] + (lms[i + 1] - lms[i]) * (position - i)
+    return float(((weight / m) ** l - 1) / (l * s))
+
+
+class RunningStats:
+    """Birth weight, nadir, regain, velocity and z-score of one infant, updated per weighing"""
+
+    def __init__(self, birth_datetime, gender, reference="who_percentiles"):
+        self.birth_datetime = birth_datetime
+        self.grid = reference_lms_grid(reference, normalize_sex(gender))
+        self.count = 0
+        self.out_of_order = False
+        self.birth_weight = None
+        self.nadir_weight = None
+        self.nadir_day = None
+        self.nadir_index = None
+        self.regain_day = None
+        self.last_weight = None
+        self.last_day = None
+        self.velocity = None
+        self.z_score = None
+
+    def add(self, datetime_measured, weight):
+        """Update the statistics with the next weighing"""
+        day = (datetime_measured - self.birth_datetime).total_seconds() / 86400
+        if self.count and day < self.last_day:
+            self.out_of_order = True
+            return
+        weight = float(weight)
+        if self.count == 0:
+            self.birth_weight = weight
+        elif day > self.last_day:
+            # Grams per day over the last interval
+            self.velocity = (weight - self.last_weight) / (day - self.last_day)
+        if self.nadir_weight is None or weight < self.nadir_weight:
+            self.nadir_weight, self.nadir_day, self.nadir_index = weight, day, self.count
+            # A new low restarts the wait for birth weight to be regained
+            self.regain_day = None
+        elif self.regain_day is None and self.nadir_index > 0 and weight >= self.birth_weight:
+            self.regain_day = day
+        self.last_weight, self.last_day = weight, day
+        self.z_score = grid_zscore(self.grid, day, weight)
+        self.count += 1
+
+    @property
+    def percent_from_birth(self):
+        """Current weight relative to birth weight, in percent (negative while below it)"""
+        return 100 * (self.last_weight - self.birth_weight) / self.birth_weight
+
+    @property
+    def max_loss_percent(self):
+        """Loss from birth weight to the nadir, in percent"""
+        return 100 * (self.birth_weight - self.nadir_weight) / self.birth_weight
+
+    def status(self):
+        """Current statistics as a dict, None values where not known yet"""
+        if not self.count:
+            return {'measurements': 0}
+        return {
+            'measurements': self.count,
+            'birth_weight': self.birth_weight,
+            'min_weight': self.nadir_weight,
+            'min_weight_day': self.nadir_day,
+            'max_loss_percent': self.max_loss_percent,
+            'regain_day': self.regain_day,
+            'last_weight': self.last_weight,
+            'last_day': self.last_day,
+            'percent_from_birth': self.percent_from_birth,
+            'velocity_g_per_day': self.velocity,
+            'last_z_score': self.z_score,
+        }
@@ -0,0 +1,107 @@
+import numpy as np
+
+# Adaptive sampling helpers shared by the weight chart scripts.
+# Reference curves are sampled according to the pixel width of the axes they
+# are drawn on, and long measurement series are decimated with the
+# Largest-Triangle-Three-Buckets (LTTB) algorithm so that render time does not
+# grow with the length of the series.
+
+# Curve samples per horizontal pixel (the line is smooth well below 1)
+CURVE_POINTS_PER_PIXEL = 0.5
+MIN_CURVE_POINTS = 50
+MAX_CURVE_POINTS = 2000
+
+# Measurement points kept per horizontal pixel after decimation
+SERIES_POINTS_PER_PIXEL = 0.25
+MIN_SERIES_POINTS = 100
+
+
+def axes_pixel_width(ax, dpi=None):
+    """Return the width of the axes in pixels at the given dpi (default: figure dpi)"""
+    fig = ax.figure
+    if dpi is None:
+        dpi = fig.dpi
+    return ax.get_position().width * fig.get_figwidth() * dpi
+
+
+def adaptive_sample_count(ax=None, dpi=None, points_per_pixel=CURVE_POINTS_PER_PIXEL,
+                          min_points=MIN_CURVE_POINTS, max_points=MAX_CURVE_POINTS):
+    """Number of samples needed to draw a smooth curve across the axes"""
+    if ax is None:
+        return min_points
+    n = int(axes_pixel_width(ax, dpi) * points_per_pixel)
+    return int(np.clip(n, min_points, max_points))
+
+
+def adaptive_sample_grid(x_min, x_max, ax=None, dpi=None):
+    """Evenly spaced x values between x_min and x_max, sized for the axes width"""
+    return np.linspace(x_min, x_max, adaptive_sample_count(ax, dpi))
+
+
+def series_point_budget(ax=None, dpi=None):
+    """Maximum number of measurement points worth drawing on the axes"""
+    if ax is None:
+        return MIN_SERIES_POINTS
+    return max(MIN_SERIES_POINTS, int(axes_pixel_width(ax, dpi) * SERIES_POINTS_PER_PIXEL))
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Select n_out indices of (x, y) with the Largest-Triangle-Three-Buckets algorithm
+
+    The first and last points are always kept. Inside every bucket the point
+    forming the largest triangle with the previously selected point and the
+    average of the next bucket is chosen, which preserves peaks and dips
+    (e.g. the weight nadir) much better than plain striding.
+
+    Parameters:
+    - x: sorted x values
+    - y: y values
+    - n_out: number of points to keep
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Bucket boundaries for the interior points (first and last are fixed)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point for the final bucket)
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        # Twice the triangle area for every candidate in the bucket
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a])
+                       - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return selected
+
+
+def decimate_series(x, y, ax=None, dpi=None):
+    """Return the indices of (x, y) worth drawing on the given axes"""
+    return lttb_indices(x, y, series_point_budget(ax, dpi))
+
+
+# Rows shown in the data table embedded in the charts
+MAX_TABLE_ROWS = 25
+
+
+def table_rows(n, max_rows=MAX_TABLE_ROWS):
+    """Indices of the measurements listed in the chart table: birth plus the latest ones"""
+    if n <= max_rows:
+        return list(range(n))
+    return [0] + list(range(n - max_rows + 1, n))
@@ -0,0 +1,141 @@
+"""
+Measurement store: one infant's birth datetime and measurements as arrays
+
+Every visit is one row with a column per metric (weight in grams, length and
+head circumference in cm); a metric not measured at a visit is NaN.
+"""
+import numpy as np
+
+from .gestational import corrected_age_days
+from .parsing import parse_datetime
+
+# Metric columns of the store, in order, and their units
+METRICS = ("weight", "length", "head")
+METRIC_UNITS = {"weight": "g", "length": "cm", "head": "cm"}
+
+
+class MeasurementStore:
+    """
+    Measurements of one infant
+
+    Measurements are appended to plain lists, one per metric column, and
+    exposed as NumPy arrays, kept in time order, for the interpolation and
+    plotting code.
+    """
+
+    def __init__(self, birth_datetime=None, gestational_age_days=None):
+        self.birth_datetime = birth_datetime
+        # Gestational age at birth in days, None for a term birth
+        self.gestational_age_days = gestational_age_days
+        self._times = []
+        self._columns = {metric: [] for metric in METRICS}
+        self._sorted = True
+
+    @classmethod
+    def from_birth_info(cls, birth_info, measurements):
+        """
+        Build a store from the tracker scripts' tuples
+
+        - birth_info: (birth_date, birth_time, birth_weight[, length, head]);
+          the birth measurements become the first row
+        - measurements: list of (date, time, weight_in_grams[, length_cm, head_cm]);
+          None, NaN or a missing value means not measured
+        """
+        birth_date, birth_time, *birth_values = birth_info
+        store = cls(parse_datetime(birth_date, birth_time))
+        store.add(store.birth_datetime, *birth_values)
+        for date, time, *values in measurements:
+            store.add(parse_datetime(date, time), *values)
+        return store
+
+    @classmethod
+    def from_arrays(cls, birth_datetime, datetimes, columns, gestational_age_days=None):
+        """
+        Build a store from whole columns at once instead of one add per row
+
+        - datetimes: datetime64 array (or list of datetimes), one per row
+        - columns: dict of metric -> array of values, NaN where not measured;
+          metrics left out were not measured at all
+        """
+        times = np.asarray(datetimes, dtype="datetime64[s]")
+        store = cls(birth_datetime, gestational_age_days)
+        store._times = times.astype(object).tolist()
+        for metric in METRICS:
+            values = columns.get(metric)
+            values = np.full(len(times), np.nan) if values is None else np.asarray(values, dtype=float)
+            if len(values) != len(times):
+                raise ValueError(f"{metric} has {len(values)} values for {len(times)} datetimes")
+            store._columns[metric] = values.tolist()
+        store._sorted = bool(np.all(times[1:] >= times[:-1]))
+        return store
+
+    def add(self, datetime_measured, weight_grams=None, length_cm=None, head_cm=None):
+        """Add the measurements of one visit; metrics left as None were not measured"""
+        if self._times and datetime_measured < self._times[-1]:
+            self._sorted = False
+        self._times.append(datetime_measured)
+        for metric, value in zip(METRICS, (weight_grams, length_cm, head_cm)):
+            self._columns[metric].append(np.nan if value is None else float(value))
+
+    def clear(self):
+        """Remove all measurements"""
+        self._times = []
+        self._columns = {metric: [] for metric in METRICS}
+        self._sorted = True
+
+    def sort(self):
+        """Sort measurements by time (stable, so same-time entries keep their order)"""
+        if not self._sorted:
+            order = sorted(range(len(self._times)), key=self._times.__getitem__)
+            self._times = [self._times[i] for i in order]
+            self._columns = {metric: [column[i] for i in order] for metric, column in self._columns.items()}
+            self._sorted = True
+
+    def __len__(self):
+        return len(self._times)
+
+    @property
+    def datetimes(self):
+        self.sort()
+        return list(self._times)
+
+    @property
+    def weights(self):
+        return self.values("weight")
+
+    def values(self, metric):
+        """Values of one metric column, NaN where it was not measured"""
+        self.sort()
+        return np.array(self._columns[metric], dtype=float)
+
+    def columns(self, metrics=METRICS):
+        """(rows x metrics) array of the given metric columns"""
+        self.sort()
+        return np.column_stack([np.array(self._columns[metric], dtype=float) for metric in metrics]) \
+            if self._times else np.empty((0, len(metrics)))
+
+    @property
+    def metrics(self):
+        """Metrics with at least one measurement"""
+        return [metric for metric in METRICS if any(v == v for v in self._columns[metric])]
+
+    def hours_since_birth(self):
+        """Hours elapsed since birth for every measurement"""
+        self.sort()
+        times = np.array(self._times, dtype='datetime64[s]')
+        return (times - np.datetime64(self.birth_datetime, 's')).astype(float) / 3600
+
+    def days_since_birth(self):
+        """Days elapsed since birth for every measurement"""
+        return self.hours_since_birth() / 24
+
+    def corrected_days_since_birth(self):
+        """Days of age corrected for prematurity (equal to days since birth for term births)"""
+        if self.gestational_age_days is None:
+            return self.days_since_birth()
+        return corrected_age_days(self.gestational_age_days, self.days_since_birth())
+
+    def records(self):
+        """Measurements as the list of {'datetime', 'weight'} dicts used by BabyWeightTracker"""
+        self.sort()
+        return [{'datetime': t, 'weight': w} for t, w in zip(self._times, self._columns["weight"])]
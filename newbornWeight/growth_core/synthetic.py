@@ -0,0 +1,179 @@
+"""
+Reproducible synthetic weight series for load testing
+
+Each infant gets a sex, a birth z-score and a birth date/time, and follows
+its WHO z-score channel (the SD columns of newborn_weight_tracker2.py) with a
+slow random drift and scale noise. The embedded SD bands already dip over the
+first week and regain by about day 13; on top of that every infant loses a
+bit more or less than the reference, peaking around day 2-4 and gone by day
+7-14. Every infant has its own random stream
+derived from (seed, infant index), so the same infant always comes out the
+same whatever the number of infants or formats.
+
+Rows are generated in chunks and formatted straight into fixed-width byte
+buffers with NumPy (no per-row Python), then written to disk, so files of any
+size stream out at disk speed with constant memory.
+
+Layouts (all readable by growth_core.parsing):
+- "simple": date,time,weight rows with no header (baby_weight_tracker.py)
+- "header": the same with a "date,time,weight" header line
+- "birth_row": first row is the birth, then measurements (newborn_weight_tracker*.py)
+The first row of every layout is the birth weighing, so "simple" and
+"birth_row" files have the same bytes. Dates are written as YYYY-MM-DD
+("iso") or DD/MM/YYYY ("dmy").
+"""
+import os
+
+import numpy as np
+
+from .interpolation import get_interpolator
+from .reference import get_reference
+
+LAYOUTS = ("simple", "header", "birth_row")
+DATE_STYLES = ("iso", "dmy")
+HEADER = b"date,time,weight\n"
+
+# Rows generated and formatted per chunk
+CHUNK_ROWS = 1 << 20
+# Weights are written as 4 digits, which covers -3 SD to +3 SD over 0-60 days
+MIN_WEIGHT, MAX_WEIGHT = 1000, 9999
+# Below this mean interval between weighings, times include seconds
+SECONDS_BELOW_MINUTES = 10
+# Longest series, in days: the range of the who_zscores reference (and of the 4-digit weights)
+MAX_SPAN_DAYS = 60
+
+_EPOCH_2024 = np.datetime64("2024-01-01T00:00", "s")
+
+
+def check_span_days(span_days):
+    """Raise ValueError unless 0 < span_days <= MAX_SPAN_DAYS"""
+    if not 0 < span_days <= MAX_SPAN_DAYS:
+        raise ValueError(f"span_days must be more than 0 and at most {MAX_SPAN_DAYS} (the reference range), "
+                         f"got {span_days:g}")
+
+
+class SyntheticInfant:
+    """Random but reproducible growth parameters of one synthetic infant"""
+
+    def __init__(self, index, seed=0):
+        self.index = index
+        self.rng = np.random.default_rng([seed, index])
+        rng = self.rng
+        self.sex = "boys" if rng.random() < 0.5 else "girls"
+        self.birth_z = float(np.clip(rng.normal(), -2.5, 2.5))
+        self.birth_datetime = _EPOCH_2024 + np.timedelta64(int(rng.integers(0, 365 * 24 * 60)) * 60, "s")
+        # Extra fraction of weight lost (negative: less) compared with the
+        # reference's own early dip, and when it peaks and is gone
+        self.loss = float(np.clip(rng.normal(0.0, 0.025), -0.04, 0.05))
+        self.nadir_day = float(rng.uniform(2, 4))
+        self.regain_day = float(rng.uniform(7, 14))
+        # Random walk of the z-score channel, per sqrt(day)
+        self.drift = float(rng.uniform(0.02, 0.08))
+        self.noise_grams = float(rng.uniform(5, 20))
+
+    def loss_fraction(self, days):
+        """Share of the channel weight missing because of this infant's own early weight loss"""
+        days = np.asarray(days, dtype=float)
+        down = np.sin(np.pi / 2 * np.clip(days / self.nadir_day, 0, 1)) ** 2
+        up = np.cos(np.pi / 2 * np.clip((days - self.nadir_day) / (self.regain_day - self.nadir_day), 0, 1)) ** 2
+        return self.loss * np.where(days <= self.nadir_day, down, up)
+
+    def chunks(self, count, span_days=60, chunk_rows=CHUNK_ROWS):
+        """
+        Yield (datetime64[s] times, weights in grams) in chunks, count rows in total
+
+        The first row is the birth weighing. The others are spread over about
+        span_days with jittered intervals. Raises ValueError if span_days is
+        not within the reference range (MAX_SPAN_DAYS).
+        """
+        check_span_days(span_days)
+        rng = self.rng
+        table = get_reference("who_zscores", self.sex)
+        lms = get_interpolator("lms", table)
+        # Jittered steps end close to, but usually not past, span_days
+        mean_step = span_days / max(count, 1)
+        day, z = 0.0, self.birth_z
+        for start in range(0, count, chunk_rows):
+            n = min(chunk_rows, count - start)
+            steps = mean_step * rng.uniform(0.5, 1.5, n)
+            if start == 0:
+                steps[0] = 0.0
+            days = day + np.cumsum(steps)
+            z_path = z + np.cumsum(rng.normal(0, self.drift * np.sqrt(steps)))
+            weights = lms.weights_for_z(days, z_path) * (1 - self.loss_fraction(days))
+            weights += rng.normal(0, self.noise_grams, n) * (days > 0)
+            day, z = days[-1], z_path[-1]
+            times = self.birth_datetime + (days * 86400).astype("timedelta64[s]")
+            yield times, np.clip(np.rint(weights), MIN_WEIGHT, MAX_WEIGHT)
+
+
+def _put_digits(buffer, column, values, width):
+    """Write zero-padded decimal digits of values into buffer[:, column:column + width]"""
+    values = values.astype(np.int64)
+    for i in range(width - 1, -1, -1):
+        buffer[:, column + i] = ord("0") + values % 10
+        values //= 10
+
+
+def format_rows(times, weights, date_style="iso", seconds=False):
+    """Format measurements as "date,time,weight" CSV lines, returned as bytes"""
+    times = np.asarray(times, dtype="datetime64[s]")
+    date = "DD/MM/YYYY" if date_style == "dmy" else "YYYY-MM-DD"
+    time = "HH:MM:SS" if seconds else "HH:MM"
+    template = np.frombuffer(f"{date},{time},0000\n".encode(), dtype=np.uint8)
+    buffer = np.tile(template, (len(times), 1))
+
+    year = times.astype("datetime64[Y]").astype(np.int64) + 1970
+    month = times.astype("datetime64[M]").astype(np.int64) % 12 + 1
+    day = (times.astype("datetime64[D]") - times.astype("datetime64[M]")).astype(np.int64) + 1
+    second_of_day = (times - times.astype("datetime64[D]")).astype(np.int64)
+    for field, values, width in (("YYYY", year, 4), ("MM", month, 2), ("DD", day, 2)):
+        _put_digits(buffer, date.index(field), values, width)
+    clock = len(date) + 1
+    _put_digits(buffer, clock, second_of_day // 3600, 2)
+    _put_digits(buffer, clock + 3, second_of_day // 60 % 60, 2)
+    if seconds:
+        _put_digits(buffer, clock + 6, second_of_day % 60, 2)
+    _put_digits(buffer, len(template) - 5, np.asarray(weights), 4)
+    return buffer.tobytes()
+
+
+def write_infant_csv(path, infant, count, layout="birth_row", date_style="iso", span_days=60,
+                     chunk_rows=CHUNK_ROWS):
+    """Stream count synthetic measurements of one infant to a CSV file; return bytes written"""
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout '{layout}'. Choose from: {', '.join(LAYOUTS)}")
+    if date_style not in DATE_STYLES:
+        raise ValueError(f"Unknown date style '{date_style}'. Choose from: {', '.join(DATE_STYLES)}")
+    check_span_days(span_days)
+    seconds = span_days * 24 * 60 / max(count - 1, 1) < SECONDS_BELOW_MINUTES
+    written = 0
+    with open(path, "wb", buffering=1 << 20) as f:
+        if layout == "header":
+            written += f.write(HEADER)
+        for times, weights in infant.chunks(count, span_days, chunk_rows):
+            written += f.write(format_rows(times, weights, date_style, seconds))
+    return written
+
+
+def generate_dataset(output_dir, infants=1, measurements=30, seed=0, layouts=("birth_row",),
+                     date_styles=("iso",), span_days=60):
+    """
+    Write synthetic CSV files, one per infant, layout and date style
+
+    Files are named infant_<index>_<layout>_<date style>.csv. Returns the list
+    of (path, sex, bytes written). Raises ValueError for a span_days outside
+    the reference range, before anything is written.
+    """
+    check_span_days(span_days)
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    for index in range(infants):
+        for layout in layouts:
+            for date_style in date_styles:
+                # A fresh instance per file so every format holds the same series
+                infant = SyntheticInfant(index, seed)
+                path = os.path.join(output_dir, f"infant_{index:06d}_{layout}_{date_style}.csv")
+                size = write_infant_csv(path, infant, measurements, layout, date_style, span_days)
+                written.append((path, infant.sex, size))
+    return written
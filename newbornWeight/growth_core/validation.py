@@ -0,0 +1,196 @@
+"""
+Streaming validation of weighings between parsing and storage
+
+MeasurementValidator looks at one measurement at a time and only keeps a
+small rolling window of accepted velocities, so validation is O(n) with constant
+memory per infant. Rejected rows go to a QuarantineReport instead of being
+printed line by line.
+
+Checks, in order:
+- "unit": weight looks like kilograms (or 1000x too large) instead of grams
+- "duplicate": same timestamp as the previous measurement
+- "near_duplicate": the previous weight repeated within MIN_GAP_MINUTES (the
+  same weighing entered twice); other readings that close are kept, so
+  minute-level scale data passes
+- "delta": weight change per day physiologically impossible
+- "outlier": velocity (g/day) far from the rolling median velocity, in
+  robust (MAD) units; only from OUTLIER_FROM_DAY on, since the swing from
+  early loss to regain is normal and would otherwise look like one
+Warnings (kept, but listed in the report):
+- "same_day": a second measurement on the same calendar day (once per day)
+- "out_of_order": earlier than the previous measurement
+"""
+from collections import deque
+
+import numpy as np
+
+# Plausible newborn/infant weight range in grams
+MIN_WEIGHT_GRAMS = 300
+MAX_WEIGHT_GRAMS = 30000
+# The same weight repeated closer than this is treated as the same weighing
+MIN_GAP_MINUTES = 30
+# Largest plausible change relative to the previous weight, per day
+MAX_DAILY_CHANGE = 0.10
+# Absolute change always tolerated (scale noise, clothes, feeds)
+DELTA_TOLERANCE_GRAMS = 150
+# Rolling window of accepted velocities (g/day) for the robust statistic
+WINDOW = 7
+# Robust z above which a velocity is an outlier
+MAX_ROBUST_Z = 6.0
+# Floor for the MAD so steady series do not flag every small change
+MIN_MAD_GRAMS_PER_DAY = 25
+# Scale/clothing noise; over short intervals it dominates the velocity
+SCALE_NOISE_GRAMS = 25
+# Velocities over intervals shorter than this are too noisy to judge
+MIN_VELOCITY_HOURS = 6
+# Days after the first measurement before velocities are tracked (past the
+# early weight loss and regain)
+OUTLIER_FROM_DAY = 10
+
+QUARANTINE_REASONS = ("unit", "duplicate", "near_duplicate", "delta", "outlier")
+WARNING_REASONS = ("same_day", "out_of_order")
+
+
+class QuarantineReport:
+    """Rows rejected or flagged by a MeasurementValidator"""
+
+    def __init__(self):
+        self.entries = []
+        self.accepted = 0
+
+    def add(self, row, datetime_measured, weight, reason, detail):
+        """Record one entry; row is the line of the file (or position in the stream when unknown)"""
+        self.entries.append({
+            'row': row,
+            'datetime': datetime_measured,
+            'weight': weight,
+            'reason': reason,
+            'detail': detail,
+        })
+
+    @property
+    def quarantined(self):
+        return [e for e in self.entries if e['reason'] in QUARANTINE_REASONS]
+
+    @property
+    def warnings(self):
+        return [e for e in self.entries if e['reason'] in WARNING_REASONS]
+
+    def counts(self):
+        """Number of entries per reason"""
+        counts = {}
+        for entry in self.entries:
+            counts[entry['reason']] = counts.get(entry['reason'], 0) + 1
+        return counts
+
+    def summary(self):
+        """One-paragraph text summary of the report"""
+        lines = [f"Accepted {self.accepted} measurements, quarantined {len(self.quarantined)}, "
+                 f"{len(self.warnings)} warnings"]
+        for entry in self.entries:
+            when = entry['datetime'].strftime('%Y-%m-%d %H:%M') if entry['datetime'] else '?'
+            lines.append(f"  row {entry['row']}: {when} {entry['weight']:g} g - {entry['reason']}: {entry['detail']}")
+        return "\n".join(lines)
+
+
+class MeasurementValidator:
+    """Validate one infant's measurements as they stream in"""
+
+    def __init__(self, report=None, window=WINDOW, min_gap_minutes=MIN_GAP_MINUTES):
+        self.report = report if report is not None else QuarantineReport()
+        self.window = deque(maxlen=window)
+        self.min_gap_minutes = min_gap_minutes
+        self.first_datetime = None
+        self.last_datetime = None
+        self.last_weight = None
+        self.same_day_warned = None
+        self.checked = 0
+
+    def _robust_z(self, velocity, days):
+        """Distance of a velocity over `days` from the rolling median velocity in MAD units"""
+        values = np.fromiter(self.window, dtype=float, count=len(self.window))
+        median = np.median(values)
+        mad = max(np.median(np.abs(values - median)) * 1.4826, MIN_MAD_GRAMS_PER_DAY,
+                  SCALE_NOISE_GRAMS / days)
+        return (velocity - median) / mad
+
+    def check(self, datetime_measured, weight, row=None):
+        """
+        Check one measurement; return None if accepted, else the reason it was quarantined
+
+        Warnings are recorded in the report but the measurement is accepted.
+        row is the line of the file reported with any entry (default: the
+        position of the measurement in the stream).
+        """
+        self.checked += 1
+        row = self.checked if row is None else row
+        report = self.report
+        velocity = None
+
+        if not MIN_WEIGHT_GRAMS <= weight <= MAX_WEIGHT_GRAMS:
+            if MIN_WEIGHT_GRAMS <= weight * 1000 <= MAX_WEIGHT_GRAMS:
+                detail = f"looks like kg, did you mean {weight * 1000:g} g?"
+            elif MIN_WEIGHT_GRAMS <= weight / 1000 <= MAX_WEIGHT_GRAMS:
+                detail = f"1000x too large, did you mean {weight / 1000:g} g?"
+            else:
+                detail = "outside the plausible weight range"
+            report.add(row, datetime_measured, weight, "unit", detail)
+            return "unit"
+
+        if self.last_datetime is not None:
+            hours = (datetime_measured - self.last_datetime).total_seconds() / 3600
+            if hours == 0:
+                report.add(row, datetime_measured, weight, "duplicate",
+                           f"same time as previous measurement ({self.last_weight:g} g)")
+                return "duplicate"
+            if 0 < hours * 60 < self.min_gap_minutes and weight == self.last_weight:
+                report.add(row, datetime_measured, weight, "near_duplicate",
+                           f"same weight {hours * 60:.0f} min after previous measurement")
+                return "near_duplicate"
+
+            if hours < 0:
+                report.add(row, datetime_measured, weight, "out_of_order",
+                           "earlier than the previous measurement")
+            else:
+                allowed = DELTA_TOLERANCE_GRAMS + self.last_weight * MAX_DAILY_CHANGE * hours / 24
+                if abs(weight - self.last_weight) > allowed:
+                    report.add(row, datetime_measured, weight, "delta",
+                               f"{weight - self.last_weight:+g} g in {hours:.1f} h (max {allowed:.0f} g)")
+                    return "delta"
+
+            age_days = (datetime_measured - self.first_datetime).total_seconds() / 86400
+            if hours >= MIN_VELOCITY_HOURS and age_days >= OUTLIER_FROM_DAY:
+                velocity = (weight - self.last_weight) / (hours / 24)
+                if len(self.window) >= 3:
+                    robust_z = self._robust_z(velocity, hours / 24)
+                    if abs(robust_z) > MAX_ROBUST_Z:
+                        report.add(row, datetime_measured, weight, "outlier",
+                                   f"{velocity:+.0f} g/day is {robust_z:+.1f} MAD from the rolling median")
+                        return "outlier"
+
+            day = datetime_measured.date()
+            if day == self.last_datetime.date() and hours > 0 and day != self.same_day_warned:
+                self.same_day_warned = day
+                report.add(row, datetime_measured, weight, "same_day",
+                           "more than one measurement on the same day")
+
+        if velocity is not None:
+            self.window.append(velocity)
+        if self.first_datetime is None:
+            self.first_datetime = datetime_measured
+        if self.last_datetime is None or datetime_measured > self.last_datetime:
+            self.last_datetime = datetime_measured
+            self.last_weight = weight
+        report.accepted += 1
+        return None
+
+    def filter(self, measurements):
+        """Yield only the accepted (datetime, weight) pairs of a measurement stream"""
+        for datetime_measured, weight in measurements:
+            if self.check(datetime_measured, weight) is None:
+                yield datetime_measured, weight
+
+
+def validate_measurements(measurements, report=None):
+    """Yield the accepted (datetime, weight) pairs of a stream, recording the rejected ones in report"""
+    return MeasurementValidator(report).filter(measurements)
@@ -0,0 +1,244 @@
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.figure import Figure
+from scipy.stats import norm
+
+from growth_core import MeasurementStore, build_weight_figure, get_interpolator, get_reference
+from growth_core import save_compact_svg
+from newborn_weight_tracker2 import CHART_STYLE
+
+# python growth_server.py --port 8080
+#
+# Small HTTP API over the WHO z-score charts of newborn_weight_tracker2.py.
+# All endpoints take a JSON body:
+#   {"birth_info": ["2025-04-25", "15:51", 3638],
+#    "measurements": [["2025-04-26", "17:00", 3500], ...],
+#    "gender": "girls", "unit": "days"}
+#
+#   POST /zscores    -> {"hours": [...], "zscores": [...], "percentiles": [...]}
+#   POST /chart.png  -> PNG chart
+#   POST /chart.svg  -> compact SVG chart
+#   GET  /health     -> {"status": "ok", ...}
+
+CONTENT_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+    "json": "application/json",
+}
+
+MAX_BODY_BYTES = 1 << 20
+CACHE_SIZE = 256
+
+
+def _warm_up():
+    """Worker initializer: compile reference tables and interpolators once per process"""
+    for gender in ("boys", "girls"):
+        get_interpolator(CHART_STYLE["interpolator"], get_reference(CHART_STYLE["reference"], gender))
+
+
+def render_chart(birth_info, measurements, unit, gender, fmt):
+    """Render a chart to PNG or SVG bytes (runs in a worker process)"""
+    store = MeasurementStore.from_birth_info(birth_info, measurements)
+    fig = Figure(figsize=(12, 8))
+    buffer = io.BytesIO()
+    if fmt == "svg":
+        build_weight_figure(fig, store, birth_info[2], unit, gender, CHART_STYLE, compact=True)
+        save_compact_svg(fig, buffer)
+    else:
+        build_weight_figure(fig, store, birth_info[2], unit, gender, CHART_STYLE, render_dpi=100)
+        fig.savefig(buffer, format="png", dpi=100)
+    return buffer.getvalue()
+
+
+def compute_zscores(birth_info, measurements, gender):
+    """z-scores and percentiles of every measurement against the WHO LMS curves"""
+    store = MeasurementStore.from_birth_info(birth_info, measurements)
+    table = get_reference(CHART_STYLE["reference"], gender)
+    lms = get_interpolator("lms", table)
+    days = store.days_since_birth()
+    in_range = (days >= 0) & (days <= table.max_day)
+    z = np.full(len(days), np.nan)
+    z[in_range] = lms.zscores(days[in_range], store.weights[in_range])
+    percentiles = np.round(100 * norm.cdf(z), 2)
+    return {
+        "hours": np.round(days * 24, 3).tolist(),
+        "zscores": [None if np.isnan(v) else round(float(v), 3) for v in z],
+        "percentiles": [None if np.isnan(v) else float(v) for v in percentiles],
+    }
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ChartServer:
+    """asyncio HTTP server with an LRU cache of rendered charts"""
+
+    def __init__(self, workers=None, cache_size=CACHE_SIZE):
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_warm_up)
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        # Renders in progress, so identical concurrent requests share one render
+        self.in_flight = {}
+        self.hits = 0
+        self.misses = 0
+        _warm_up()
+
+    @staticmethod
+    def parse_request(body):
+        """Validate a request body and return (birth_info, measurements, unit, gender)"""
+        try:
+            data = json.loads(body or b"{}")
+            birth_date, birth_time, birth_weight = data["birth_info"]
+            birth_info = (str(birth_date), str(birth_time), float(birth_weight))
+            measurements = [(str(d), str(t), float(w)) for d, t, w in data.get("measurements", [])]
+        except (ValueError, KeyError, TypeError) as e:
+            raise HTTPError(400, f"Invalid request body: {e}")
+        unit = data.get("unit", "hours")
+        gender = data.get("gender", "boys")
+        if unit not in ("hours", "days") or gender not in ("boys", "girls"):
+            raise HTTPError(400, "unit must be hours/days and gender boys/girls")
+        return birth_info, measurements, unit, gender
+
+    @staticmethod
+    def cache_key(birth_info, measurements, unit, gender, fmt):
+        """Content hash of everything that affects the rendered chart"""
+        payload = json.dumps([birth_info, measurements, unit, gender, fmt], separators=(',', ':'))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def chart(self, request, fmt):
+        key = self.cache_key(*request, fmt)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return self.cache[key]
+        if key not in self.in_flight:
+            self.misses += 1
+            loop = asyncio.get_running_loop()
+            self.in_flight[key] = loop.run_in_executor(self.pool, render_chart, *request, fmt)
+        try:
+            image = await asyncio.shield(self.in_flight[key])
+        finally:
+            self.in_flight.pop(key, None)
+        self.cache[key] = image
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return image
+
+    async def dispatch(self, method, path, body):
+        """Return (status, content_type, payload bytes) for a request"""
+        if method == "GET" and path == "/health":
+            stats = {"status": "ok", "cached": len(self.cache), "hits": self.hits, "misses": self.misses}
+            return 200, "json", json.dumps(stats).encode()
+        if method != "POST":
+            raise HTTPError(404, "Not found")
+        if path == "/zscores":
+            birth_info, measurements, _, gender = self.parse_request(body)
+            try:
+                result = compute_zscores(birth_info, measurements, gender)
+            except ValueError as e:
+                raise HTTPError(400, str(e))
+            return 200, "json", json.dumps(result).encode()
+        if path in ("/chart.png", "/chart.svg"):
+            fmt = path.rsplit(".", 1)[1]
+            request = self.parse_request(body)
+            try:
+                return 200, fmt, await self.chart(request, fmt)
+            except ValueError as e:
+                raise HTTPError(400, str(e))
+        raise HTTPError(404, "Not found")
+
+    async def handle(self, reader, writer):
+        """Serve requests on one connection (HTTP/1.1 keep-alive)"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                body = None
+                try:
+                    try:
+                        length = int(headers.get("content-length", 0) or 0)
+                    except ValueError:
+                        length = -1
+                    if length < 0:
+                        raise HTTPError(400, "Invalid Content-Length")
+                    if length > MAX_BODY_BYTES:
+                        raise HTTPError(413, "Request body too large")
+                    body = await reader.readexactly(length) if length else b""
+                    status, kind, payload = await self.dispatch(method, path.split("?")[0], body)
+                except HTTPError as e:
+                    status, kind, payload = e.status, "json", json.dumps({"error": str(e)}).encode()
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    # A bug or a dead render worker: answer instead of dropping the connection
+                    print(f"Error serving {method} {path}: {e!r}")
+                    status, kind, payload = 500, "json", json.dumps({"error": "Internal server error"}).encode()
+                if body is None:
+                    # The body was not read, so the next request cannot be found on this connection
+                    headers["connection"] = "close"
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: {CONTENT_TYPES[kind]}\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP API for newborn weight z-scores and charts")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Render worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    server = ChartServer(workers=args.workers)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
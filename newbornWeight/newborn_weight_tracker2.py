@@ -1,213 +1,89 @@
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from datetime import datetime, timedelta
 import argparse
-import sys
-import csv
 import os
-from scipy.interpolate import splrep, splev
-import io
+import sys
+
+from growth_core import (get_reference, get_interpolator, parse_datetime, read_birth_row_csv, QuarantineReport,
+                         render_batch, export_json_batch, MeasurementStore,
+                         parse_gestational_age, corrected_zscores, plot_cohort_chart, export_parquet_batch,
+                         read_store, metric_zscores, METRIC_NAMES, read_feeding_csv, join_feedings, fit_growth,
+                         intake_summary, LiveWeightChart, run_live, read_measurement_file, TieredHistory)
+from growth_core import plot_weight_chart as plot_growth_chart
 
-# Real WHO weight-for-age z-scores data (0-60 days)
+# Real WHO weight-for-age z-scores data (0-60 days), kept in growth_core.reference
 # Data based on WHO Child Growth Standards
 # Source: https://www.who.int/tools/child-growth-standards
 
-# WHO Boys weight-for-age 0-60 days (z-scores)
-WHO_BOYS_DATA_STR = """
-Day,SD3neg,SD2neg,SD1neg,SD0,SD1,SD2,SD3
-0,2.1,2.5,2.9,3.3,3.9,4.4,5.0
-1,2.0,2.4,2.8,3.2,3.7,4.2,4.8
-2,1.9,2.3,2.7,3.1,3.6,4.0,4.6
-3,1.9,2.3,2.6,3.0,3.5,3.9,4.5
-4,1.9,2.3,2.6,3.0,3.4,3.8,4.4
-5,1.9,2.3,2.6,3.0,3.4,3.8,4.4
-6,1.9,2.3,2.6,3.0,3.4,3.8,4.4
-7,1.9,2.3,2.6,3.0,3.4,3.9,4.4
-8,2.0,2.3,2.7,3.1,3.5,3.9,4.5
-9,2.0,2.4,2.7,3.1,3.6,4.0,4.5
-10,2.1,2.4,2.8,3.2,3.6,4.1,4.6
-11,2.1,2.5,2.8,3.3,3.7,4.2,4.7
-12,2.1,2.5,2.9,3.3,3.8,4.3,4.8
-13,2.2,2.6,3.0,3.4,3.9,4.3,4.9
-14,2.2,2.6,3.0,3.4,3.9,4.4,5.0
-15,2.3,2.7,3.1,3.5,4.0,4.5,5.1
-16,2.3,2.7,3.1,3.6,4.1,4.6,5.1
-17,2.4,2.8,3.2,3.6,4.1,4.6,5.2
-18,2.4,2.8,3.2,3.7,4.2,4.7,5.3
-19,2.4,2.9,3.3,3.7,4.3,4.8,5.4
-20,2.5,2.9,3.3,3.8,4.3,4.9,5.5
-21,2.5,3.0,3.4,3.9,4.4,5.0,5.6
-22,2.6,3.0,3.4,3.9,4.5,5.0,5.7
-23,2.6,3.1,3.5,4.0,4.5,5.1,5.8
-24,2.7,3.1,3.5,4.0,4.6,5.2,5.8
-25,2.7,3.2,3.6,4.1,4.7,5.3,5.9
-26,2.8,3.2,3.7,4.2,4.7,5.3,6.0
-27,2.8,3.3,3.7,4.2,4.8,5.4,6.1
-28,2.9,3.3,3.8,4.3,4.9,5.5,6.2
-29,2.9,3.4,3.8,4.4,4.9,5.6,6.3
-30,3.0,3.4,3.9,4.4,5.0,5.7,6.4
-35,3.3,3.7,4.2,4.8,5.4,6.1,6.9
-40,3.5,4.0,4.5,5.1,5.8,6.5,7.3
-45,3.8,4.3,4.8,5.5,6.2,6.9,7.8
-50,4.0,4.6,5.1,5.8,6.5,7.3,8.2
-55,4.3,4.8,5.4,6.1,6.9,7.7,8.6
-60,4.5,5.1,5.7,6.4,7.2,8.1,9.0
-"""
+# Map z-scores to percentiles
+Z_TO_PERCENTILE = {
+    'SD3neg': 'p0.1',  # -3 SD ≈ 0.1st percentile
+    'SD2neg': 'p2.3',  # -2 SD ≈ 2.3rd percentile
+    'SD1neg': 'p16',   # -1 SD ≈ 16th percentile
+    'SD0': 'p50',      # 0 SD = 50th percentile (median)
+    'SD1': 'p84',      # +1 SD ≈ 84th percentile
+    'SD2': 'p97.7',    # +2 SD ≈ 97.7th percentile
+    'SD3': 'p99.9'     # +3 SD ≈ 99.9th percentile
+}
 
-# WHO Girls weight-for-age 0-60 days (z-scores)
-WHO_GIRLS_DATA_STR = """
-Day,SD3neg,SD2neg,SD1neg,SD0,SD1,SD2,SD3
-0,2.0,2.4,2.8,3.2,3.7,4.2,4.8
-1,1.9,2.3,2.7,3.1,3.6,4.0,4.6
-2,1.9,2.2,2.6,3.0,3.4,3.9,4.5
-3,1.8,2.1,2.5,2.9,3.3,3.8,4.3
-4,1.8,2.1,2.5,2.8,3.3,3.7,4.3
-5,1.8,2.1,2.4,2.8,3.2,3.7,4.2
-6,1.8,2.1,2.4,2.8,3.2,3.7,4.2
-7,1.8,2.1,2.4,2.8,3.2,3.7,4.3
-8,1.8,2.1,2.5,2.9,3.3,3.7,4.3
-9,1.9,2.2,2.5,2.9,3.3,3.8,4.3
-10,1.9,2.2,2.6,3.0,3.4,3.9,4.4
-11,2.0,2.3,2.6,3.0,3.5,3.9,4.5
-12,2.0,2.3,2.7,3.1,3.5,4.0,4.6
-13,2.1,2.4,2.7,3.2,3.6,4.1,4.7
-14,2.1,2.5,2.8,3.2,3.7,4.2,4.8
-15,2.2,2.5,2.9,3.3,3.8,4.3,4.9
-16,2.2,2.6,3.0,3.4,3.9,4.4,5.0
-17,2.3,2.6,3.0,3.5,4.0,4.5,5.1
-18,2.3,2.7,3.1,3.5,4.1,4.6,5.2
-19,2.4,2.8,3.2,3.6,4.1,4.7,5.3
-20,2.4,2.8,3.2,3.7,4.2,4.8,5.4
-21,2.5,2.9,3.3,3.8,4.3,4.9,5.5
-22,2.5,2.9,3.4,3.8,4.4,5.0,5.6
-23,2.6,3.0,3.4,3.9,4.5,5.0,5.7
-24,2.6,3.0,3.5,4.0,4.5,5.1,5.8
-25,2.7,3.1,3.5,4.0,4.6,5.2,5.9
-26,2.7,3.2,3.6,4.1,4.7,5.3,6.0
-27,2.8,3.2,3.7,4.2,4.8,5.4,6.1
-28,2.8,3.3,3.7,4.3,4.9,5.5,6.2
-29,2.9,3.3,3.8,4.3,4.9,5.6,6.3
-30,2.9,3.4,3.9,4.4,5.0,5.7,6.4
-35,3.2,3.7,4.2,4.7,5.4,6.1,6.9
-40,3.4,3.9,4.5,5.1,5.8,6.5,7.3
-45,3.7,4.2,4.8,5.4,6.1,6.9,7.7
-50,3.9,4.5,5.1,5.7,6.5,7.3,8.1
-55,4.1,4.7,5.3,6.0,6.8,7.6,8.5
-60,4.3,4.9,5.6,6.3,7.1,8.0,8.9
-"""
+CHART_STYLE = {
+    "reference": "who_zscores",
+    "interpolator": "spline",
+    # Limit to maximum 60 days (1440 hours) as that's our data range
+    "clip_to_reference": True,
+    # Plot percentile curves with WHO standard colors
+    "colors": {
+        'SD3neg': '#ff9999',  # Light red for -3SD
+        'SD2neg': '#ffcc99',  # Light orange for -2SD
+        'SD1neg': '#99cc99',  # Light green for -1SD
+        'SD0': '#3366cc',     # Blue for median
+        'SD1': '#99cc99',     # Light green for +1SD
+        'SD2': '#ffcc99',     # Light orange for +2SD
+        'SD3': '#ff9999'      # Light red for +3SD
+    },
+    "labels": {
+        'SD3neg': '0.1st (-3SD)',
+        'SD2neg': '2.3rd (-2SD)',
+        'SD1neg': '16th (-1SD)',
+        'SD0': '50th (median)',
+        'SD1': '84th (+1SD)',
+        'SD2': '97.7th (+2SD)',
+        'SD3': '99.9th (+3SD)'
+    },
+    "texts": {
+        "x_label_hours": "Hours since birth",
+        "x_label_days": "Days since birth",
+        "y_label": "Weight (grams)",
+        "title": "Newborn Weight Chart ({gender})\nWHO Child Growth Standards",
+        "series": "Baby's weight",
+        "birth": "Birth: {date}\nBirth weight: {weight}g",
+        "reference": "WHO Child Growth Standards\nWeight-for-age reference data",
+        "forecast": "Forecast (95% band)",
+        "live": "Live readings",
+        "device": "Device readings",
+        "intake": "Intake between weighings",
+        "y_label_intake": "Intake (ml/day)",
+        "table_header": ["Time", "Weight (g)"],
+        "table_birth": "Birth",
+        "hours": "hours",
+        "days": "days",
+    },
+}
 
 def load_who_data():
     """Load WHO weight-for-age data for boys and girls in kg, convert to grams"""
-    # Parse CSV data
-    boys_df = pd.read_csv(io.StringIO(WHO_BOYS_DATA_STR.strip()))
-    girls_df = pd.read_csv(io.StringIO(WHO_GIRLS_DATA_STR.strip()))
-    
-    # Convert kg to grams (multiply by 1000)
-    for col in boys_df.columns:
-        if col != 'Day':
-            boys_df[col] = boys_df[col] * 1000
-            girls_df[col] = girls_df[col] * 1000
-    
-    # Convert to numpy arrays for easier processing
-    boys_data = boys_df.values
-    girls_data = girls_df.values
-    
-    return boys_data, girls_data
+    boys = get_reference("who_zscores", "boys")
+    girls = get_reference("who_zscores", "girls")
+    return np.column_stack([boys.days, boys.values]), np.column_stack([girls.days, girls.values])
 
 def interpolate_percentiles(hours, gender="boys"):
-    """Convert WHO chart data from days to hours and interpolate using splines for smooth curves"""
-    boys_data, girls_data = load_who_data()
-    data = boys_data if gender.lower() == "boys" else girls_data
-    
-    # Extract days from the data
-    days = data[:, 0]
-    
-    # Convert days to hours
-    hours_in_data = days * 24
-    
-    # Create interpolation function for each percentile using splines
-    percentiles = {}
-    
-    # Map z-scores to percentiles
-    z_to_percentile = {
-        'SD3neg': 'p0.1',  # -3 SD ≈ 0.1st percentile
-        'SD2neg': 'p2.3',  # -2 SD ≈ 2.3rd percentile
-        'SD1neg': 'p16',   # -1 SD ≈ 16th percentile
-        'SD0': 'p50',      # 0 SD = 50th percentile (median)
-        'SD1': 'p84',      # +1 SD ≈ 84th percentile
-        'SD2': 'p97.7',    # +2 SD ≈ 97.7th percentile
-        'SD3': 'p99.9'     # +3 SD ≈ 99.9th percentile
-    }
-    
-    # Create a spline for each percentile
-    for i, (z_score, percentile) in enumerate(z_to_percentile.items()):
-        # Column index is i+1 because column 0 is the day
-        weights = data[:, i+1]
-        
-        # Create a spline representation
-        spline = splrep(hours_in_data, weights, s=0)
-        
-        # Evaluate the spline at the requested hours
-        percentiles[percentile] = splev(hours, spline)
-    
-    return percentiles
+    """Interpolate the WHO z-score curves at the given hours using splines for smooth curves"""
+    table = get_reference("who_zscores", gender)
+    curves = get_interpolator("spline", table).curves(np.asarray(hours) / 24)
+    return {Z_TO_PERCENTILE[column]: values for column, values in curves.items()}
 
-def parse_datetime(date_str, time_str=None):
-    """Parse date and optional time strings into datetime object"""
-    if time_str:
-        try:
-            # Try different datetime formats
-            formats = [
-                f"%Y-%m-%d %H:%M",
-                f"%Y-%m-%d %H:%M:%S",
-                f"%d/%m/%Y %H:%M",
-                f"%d/%m/%Y %H:%M:%S",
-                f"%m/%d/%Y %H:%M",
-                f"%m/%d/%Y %H:%M:%S"
-            ]
-            
-            datetime_str = f"{date_str} {time_str}"
-            
-            for fmt in formats:
-                try:
-                    return datetime.strptime(datetime_str, fmt)
-                except ValueError:
-                    continue
-                    
-            raise ValueError(f"Could not parse datetime: {datetime_str}")
-            
-        except ValueError:
-            print(f"Error parsing date/time: {date_str} {time_str}")
-            raise
-    else:
-        # Just date without time
-        try:
-            formats = [
-                "%Y-%m-%d",
-                "%d/%m/%Y",
-                "%m/%d/%Y"
-            ]
-            
-            for fmt in formats:
-                try:
-                    return datetime.strptime(date_str, fmt)
-                except ValueError:
-                    continue
-                    
-            raise ValueError(f"Could not parse date: {date_str}")
-            
-        except ValueError:
-            print(f"Error parsing date: {date_str}")
-            raise
-
-def calculate_hours_since_birth(birth_datetime, measurement_datetime):
-    """Calculate hours elapsed between birth and measurement"""
-    time_diff = measurement_datetime - birth_datetime
-    return time_diff.total_seconds() / 3600  # Convert seconds to hours
-
-def plot_weight_chart(birth_info, measurements, unit="hours", gender="boys", output_file=None):
+def plot_weight_chart(birth_info, measurements, unit="hours", gender="boys", output_file=None, forecast_days=None,
+                      feeding=None, history=None):
     """
     Plot the baby's weight measurements against standard WHO growth curves
     
@@ -217,175 +93,107 @@ def plot_weight_chart(birth_info, measurements, unit="hours", gender="boys", out
     - unit: "hours" or "days" for x-axis
     - gender: "boys" or "girls" for appropriate growth curves
     - output_file: optional path to save the plot
+    - forecast_days: optional forecast horizon in days, drawn as a shaded band
+    - feeding: optional FeedingLog, intake drawn on a secondary axis
+    - history: optional TieredHistory of device readings
     """
-    birth_date, birth_time, birth_weight = birth_info
-    
-    try:
-        # Parse birth datetime
-        birth_datetime = parse_datetime(birth_date, birth_time)
-        
-        # Process all measurements
-        measurement_times = []
-        weights = []
-        
-        # Add birth weight as first measurement
-        measurement_times.append(0)  # 0 hours since birth
-        weights.append(birth_weight)
-        
-        # Process subsequent measurements
-        for date, time, weight in measurements:
-            measurement_datetime = parse_datetime(date, time)
-            hours = calculate_hours_since_birth(birth_datetime, measurement_datetime)
-            measurement_times.append(hours)
-            weights.append(weight)
-        
-        # Convert to numpy arrays for easier manipulation
-        measurement_times = np.array(measurement_times)
-        weights = np.array(weights)
-        
-        # Adjust x-axis to days if requested
-        x_values = measurement_times
-        x_label = "Hours since birth"
-        if unit.lower() == "days":
-            x_values = measurement_times / 24
-            x_label = "Days since birth"
-        
-        # Create the figure
-        plt.figure(figsize=(12, 8))
-        
-        # Get max hours to determine how far to extend percentile curves
-        max_hours = max(measurement_times) * 1.1  # Add 10% for margin
-        # Limit to maximum 60 days (1440 hours) as that's our data range
-        max_hours = min(max_hours, 1440)
-        
-        # Create smooth hour intervals for spline interpolation
-        hours_range = np.linspace(0, max_hours, 500)  # 500 points for smooth curves
-        
-        # Get percentile curves using spline interpolation
-        percentiles = interpolate_percentiles(hours_range, gender)
-        
-        # Plot percentile curves with WHO standard colors
-        percentile_colors = {
-            'p0.1': '#ff9999',  # Light red for -3SD
-            'p2.3': '#ffcc99',  # Light orange for -2SD
-            'p16': '#99cc99',   # Light green for -1SD
-            'p50': '#3366cc',   # Blue for median
-            'p84': '#99cc99',   # Light green for +1SD
-            'p97.7': '#ffcc99', # Light orange for +2SD
-            'p99.9': '#ff9999'  # Light red for +3SD
-        }
-        
-        percentile_labels = {
-            'p0.1': '0.1st (-3SD)',
-            'p2.3': '2.3rd (-2SD)', 
-            'p16': '16th (-1SD)',
-            'p50': '50th (median)',
-            'p84': '84th (+1SD)',
-            'p97.7': '97.7th (+2SD)',
-            'p99.9': '99.9th (+3SD)'
-        }
-        
-        # Plot percentile lines with spline interpolation for smoothness
-        for percentile, values in percentiles.items():
-            # Adjust x values based on unit choice
-            x = hours_range / 24 if unit.lower() == "days" else hours_range
-            plt.plot(x, values, '-', color=percentile_colors[percentile], 
-                     alpha=0.7, linewidth=1.5, label=f"{percentile_labels[percentile]}")
-        
-        # Plot the baby's measurements with larger markers
-        plt.plot(x_values, weights, 'o-', color='red', markersize=8, 
-                 linewidth=2, label="Baby's weight")
-        
-        # Add labels and title
-        plt.xlabel(x_label, fontsize=12)
-        plt.ylabel("Weight (grams)", fontsize=12)
-        plt.title(f"Newborn Weight Chart ({gender.capitalize()})\nWHO Child Growth Standards", fontsize=14)
-        
-        # Add grid
-        plt.grid(True, linestyle='--', alpha=0.7)
-        
-        # Add legend
-        plt.legend(loc='upper left')
-        
-        # Format birth date for display
-        birth_date_display = birth_datetime.strftime("%Y-%m-%d %H:%M")
-        
-        # Add birth info text
-        birth_info_text = f"Birth: {birth_date_display}\nBirth weight: {birth_weight}g"
-        plt.figtext(0.02, 0.02, birth_info_text, fontsize=10)
-        
-        # Add WHO reference text
-        who_text = "WHO Child Growth Standards\nWeight-for-age reference data"
-        plt.figtext(0.02, 0.06, who_text, fontsize=8, style='italic')
-        
-        # Add data table to the figure
-        table_data = [["Time", "Weight (g)"]]
-        for i, (time_val, weight_val) in enumerate(zip(measurement_times, weights)):
-            if i == 0:
-                time_str = "Birth"
-            else:
-                if unit.lower() == "days":
-                    time_str = f"{time_val/24:.1f} days"
-                else:
-                    time_str = f"{time_val:.1f} hours"
-            table_data.append([time_str, f"{weight_val:.0f}"])
-        
-        # Calculate table position and size
-        table = plt.table(cellText=table_data, 
-                         loc='upper right', 
-                         cellLoc='center',
-                         colWidths=[0.1, 0.1])
-        table.auto_set_font_size(False)
-        table.set_fontsize(9)
-        table.scale(1, 1.5)
-        
-        # Adjust plot layout to make room for the table
-        plt.subplots_adjust(right=0.8)
-        
-        plt.tight_layout()
-        
-        # Save the figure if output file is specified
-        if output_file:
-            plt.savefig(output_file, dpi=300, bbox_inches='tight')
-            print(f"Chart saved to {output_file}")
-            
-        # Show the plot
-        plt.show()
-        
-    except Exception as e:
-        print(f"Error plotting chart: {str(e)}")
-        raise
+    plot_growth_chart(birth_info, measurements, unit, gender, output_file, style=CHART_STYLE,
+                      forecast_days=forecast_days, feeding=feeding, history=history)
 
 def read_data_from_csv(file_path):
-    """Read birth info and measurements from a CSV file"""
+    """Read birth info and measurements from a CSV file, leaving out and listing bad weighings"""
+    quarantine = QuarantineReport()
     try:
-        with open(file_path, 'r', newline='') as csvfile:
-            reader = csv.reader(csvfile)
-            
-            # First row should be: birth_date, birth_time, birth_weight
-            birth_info = next(reader)
-            
-            # Validate birth info
-            if len(birth_info) != 3:
-                raise ValueError("Birth info row must contain date, time, and weight")
-            
-            birth_date, birth_time, birth_weight = birth_info
-            birth_weight = float(birth_weight)
-            
-            # Remaining rows are measurements: date, time, weight
-            measurements = []
-            for row in reader:
-                if len(row) != 3:
-                    continue  # Skip invalid rows
-                date, time, weight = row
-                weight = float(weight)
-                measurements.append((date, time, weight))
-            
-            return (birth_date, birth_time, birth_weight), measurements
-            
+        data = read_birth_row_csv(file_path, quarantine)
     except Exception as e:
         print(f"Error reading CSV file: {str(e)}")
         sys.exit(1)
+    if quarantine.entries:
+        print(quarantine.summary())
+    return data
+
+def print_corrected_zscores(birth_info, measurements, gender, gestational_age, reference="auto"):
+    """Print corrected age and z-score of every measurement of a preterm baby"""
+    ga_days = parse_gestational_age(gestational_age)
+    store = MeasurementStore.from_birth_info(birth_info, measurements)
+    store.gestational_age_days = ga_days
+    days = store.days_since_birth()
+    corrected = store.corrected_days_since_birth()
+    z_scores = corrected_zscores(ga_days, days, store.weights, gender, reference)
+    
+    print(f"Gestational age at birth: {ga_days // 7}+{ga_days % 7} weeks")
+    print(f"{'Age (days)':>12} {'Corrected (days)':>18} {'Weight (g)':>12} {'z-score':>9}")
+    for day, corrected_day, weight, z in zip(days, corrected, store.weights, z_scores):
+        z_str = "n/a" if np.isnan(z) else f"{z:.2f}"
+        print(f"{day:12.1f} {corrected_day:18.1f} {weight:12.0f} {z_str:>9}")
+
+def print_metric_zscores(birth_info, measurements, gender, gestational_age=None):
+    """Print the z-score of every measured metric (weight, length, head, weight-for-length) per visit"""
+    store = MeasurementStore.from_birth_info(birth_info, measurements)
+    if gestational_age:
+        store.gestational_age_days = parse_gestational_age(gestational_age)
+    z_scores = metric_zscores([store], gender)[0]
+    columns = store.columns()
+
+    print(f"{'Age (days)':>12} {'Weight (g)':>11} {'Length (cm)':>12} {'Head (cm)':>10}"
+          + "".join(f" {'z ' + metric:>21}" for metric in METRIC_NAMES))
+    for i, day in enumerate(store.days_since_birth()):
+        values = "".join("{:>12}".format("-" if np.isnan(v) else f"{v:.1f}") for v in columns[i])
+        z_str = "".join(" {:>21}".format("-" if np.isnan(z_scores[metric][i]) else f"{z_scores[metric][i]:.2f}")
+                        for metric in METRIC_NAMES)
+        print(f"{day:12.1f}{values}{z_str}")
+
+def print_feeding_join(birth_info, measurements, feeding):
+    """Print the feeds and diapers between weighings and the intake per gram gained"""
+    store = MeasurementStore.from_birth_info(birth_info, measurements)
+    joined = join_feedings(store, feeding)
+
+    print(f"{'Age (hours)':>12} {'Weight (g)':>11} {'Gain (g)':>9} {'Intake (ml)':>12} {'Feeds':>6} "
+          f"{'Wet':>4} {'Dirty':>6} {'ml/g':>7} {'ml/kg/day':>10}")
+    for i in range(len(joined["hours"])):
+        gain = "-" if np.isnan(joined["gain_g"][i]) else f"{joined['gain_g'][i]:.0f}"
+        per_gram = "-" if np.isnan(joined["ml_per_gram"][i]) else f"{joined['ml_per_gram'][i]:.1f}"
+        per_kg = "-" if np.isnan(joined["ml_per_kg_day"][i]) else f"{joined['ml_per_kg_day'][i]:.0f}"
+        print(f"{joined['hours'][i]:12.1f} {joined['weight'][i]:11.0f} {gain:>9} {joined['intake_ml'][i]:12.0f} "
+              f"{joined['feeds'][i]:6d} {joined['wet'][i]:4d} {joined['dirty'][i]:6d} {per_gram:>7} {per_kg:>10}")
+    summary = intake_summary(joined)
+    if summary["gain_g"] > 0:
+        print(f"Since the lowest weight ({summary['nadir_hours']:.0f} h): {summary['intake_ml']:.0f} ml for "
+              f"{summary['gain_g']:.0f} g gained, {summary['ml_per_gram']:.1f} ml per gram")
+
+def print_forecast(birth_info, measurements, day=14):
+    """Print the forecast weight on a given day (default 14) and the day the baby is back to birth weight"""
+    store = MeasurementStore.from_birth_info(birth_info, measurements)
+    weights = store.weights
+    weighed = ~np.isnan(weights)
+    forecast = fit_growth(store.days_since_birth()[weighed], weights[weighed])
+    mean, lower, upper = (values[0, 0] for values in forecast.predict([day]))
+    band = "" if np.isnan(lower) else f" (95% band {lower:.0f}-{upper:.0f} g)"
+    print(f"Forecast weight on day {day}: {mean:.0f} g{band}")
+    regain = forecast.regain_day([weights[0]])[0]
+    if np.isnan(regain):
+        print("Forecast back to birth weight: not within 60 days")
+    else:
+        print(f"Forecast back to birth weight: day {regain:.1f}")
+
+def read_device_history(birth_info, file_path):
+    """Read device readings (date,time,weight rows) into a TieredHistory counted from the birth"""
+    readings, skipped = read_measurement_file(file_path)
+    for line, e in skipped:
+        print(f"Skipping invalid device reading: {line} ({e})")
+    return TieredHistory.from_measurements(parse_datetime(birth_info[0], birth_info[1]), readings)
+
+def print_device_summary(history):
+    """Print min, max, mean and last device reading over the last day, week, 4 weeks and the whole record"""
+    print(f"{len(history)} device readings: {len(history.raw)} raw, "
+          + ", ".join(f"{len(tier)} {tier.name}" for tier in history.tiers))
+    print(f"{'Period':>12} {'Readings':>9} {'Min (g)':>8} {'Max (g)':>8} {'Mean (g)':>9} {'Last (g)':>9}")
+    last = history.last_hours
+    for period, hours in (("Last day", 24), ("Last week", 7 * 24), ("Last 4 weeks", 28 * 24),
+                          ("All", last - history.first_hours)):
+        stats = history.stats(last - hours, last)
+        print(f"{period:>12} {stats['count']:9d} {stats['min']:8.0f} {stats['max']:8.0f} {stats['mean']:9.0f} "
+              f"{stats['last']:9.0f}")
 
 def interactive_input():
     """Get birth info and measurements interactively from user"""
@@ -426,20 +234,119 @@ def interactive_input():
 def main():
     parser = argparse.ArgumentParser(description="Plot newborn weight against WHO growth curves")
     parser.add_argument("--csv", help="Path to CSV file with weight measurements")
+    parser.add_argument("--parquet", help="Read the measurements of --infant from a Parquet file instead")
+    parser.add_argument("--infant", help="Infant id to read from --parquet")
     parser.add_argument("--unit", choices=["hours", "days"], default="hours", 
                         help="Display x-axis in hours or days (default: hours)")
     parser.add_argument("--gender", choices=["boys", "girls"], default="boys", 
                         help="Gender for growth curve data (default: boys)")
     parser.add_argument("--output", help="Save chart to specified file (e.g., chart.png)")
+    parser.add_argument("--forecast", type=float, metavar="DAYS",
+                        help="Draw a weight forecast with a 95%% prediction band DAYS past the last measurement")
+    parser.add_argument("--batch", nargs="+", metavar="CSV",
+                        help="Render charts for many CSV files without displaying them")
+    parser.add_argument("--output-dir", default=".", help="Directory for --batch charts (default: .)")
+    parser.add_argument("--formats", default="png",
+                        help="Comma-separated chart formats for --batch, 'json' for web viewer data, "
+                             "'parquet' for one measurements.parquet with z-scores (default: png)")
+    parser.add_argument("--compact", action="store_true",
+                        help="Leave out the data table for small vector (SVG) charts in --batch")
+    parser.add_argument("--workers", type=int, help="Encoder threads for --batch (default: CPU count)")
+    parser.add_argument("--cohort", nargs="+", metavar="CSV",
+                        help="Plot many CSV files (e.g. twins) on one chart against the same curves")
+    parser.add_argument("--cohort-mode", choices=["auto", "lines", "density"], default="auto",
+                        help="Lines per infant or a density heatmap for --cohort (default: auto)")
+    
+    parser.add_argument("--gestational-age", metavar="WEEKS+DAYS",
+                        help="Gestational age at birth (e.g. 32+4) to print corrected-age z-scores")
+    parser.add_argument("--reference", choices=["auto", "fenton", "who"], default="auto",
+                        help="Reference for corrected-age z-scores (default: Fenton before term, then WHO)")
+    parser.add_argument("--feeding", metavar="CSV",
+                        help="Feeding and diaper log (date,time,event,amount_ml) to join with the weighings "
+                             "and draw as intake on a secondary axis")
+    parser.add_argument("--live", metavar="SOURCE",
+                        help="Live scale feed: a file to follow, - for stdin or host:port; readings are "
+                             "'weight', 'date,time,weight' or 'iso_datetime,weight' lines")
+    parser.add_argument("--device", metavar="CSV",
+                        help="Device readings (date,time,weight rows, e.g. minute-by-minute scale exports) kept "
+                             "in raw, daily and weekly tiers and drawn from the tier that fits the chart")
+    parser.add_argument("--metrics", action="store_true",
+                        help="Print weight, length, head circumference and weight-for-length z-scores per visit "
+                             "(CSV rows may add length,head in cm)")
     
     args = parser.parse_args()
     
-    if args.csv:
+    if args.batch:
+        formats = args.formats.split(",")
+        written, errors = [], []
+        if "parquet" in formats:
+            formats.remove("parquet")
+            os.makedirs(args.output_dir, exist_ok=True)
+            parquet_file = os.path.join(args.output_dir, "measurements.parquet")
+            written, errors = export_parquet_batch(args.batch, parquet_file, args.gender)
+        if "json" in formats:
+            formats.remove("json")
+            json_files, json_errors = export_json_batch(args.batch, CHART_STYLE, args.output_dir, args.gender)
+            written += json_files
+            errors += json_errors
+        if formats:
+            charts, chart_errors = render_batch(args.batch, CHART_STYLE, args.output_dir, args.unit, args.gender,
+                                                formats=formats, encode_workers=args.workers,
+                                                compact=args.compact)
+            written += charts
+            errors += chart_errors
+        for path, e in errors:
+            print(f"Error processing {path}: {e}")
+        print(f"Saved {len(written)} files to {args.output_dir}")
+        sys.exit(1 if errors else 0)
+    
+    if args.cohort:
+        plot_cohort_chart(args.cohort, args.unit, args.gender, args.output, CHART_STYLE, args.cohort_mode)
+        return
+    
+    if args.parquet:
+        if not args.infant:
+            parser.error("--parquet needs --infant")
+        store = read_store(args.parquet, args.infant)
+        records = store.records()
+        # Keep the seconds: Parquet timestamps are not rounded to the minute
+        birth_info = (records[0]['datetime'].strftime("%Y-%m-%d"), records[0]['datetime'].strftime("%H:%M:%S"),
+                      records[0]['weight'])
+        measurements = [(r['datetime'].strftime("%Y-%m-%d"), r['datetime'].strftime("%H:%M:%S"), r['weight'])
+                        for r in records[1:]]
+    elif args.csv:
         birth_info, measurements = read_data_from_csv(args.csv)
     else:
         birth_info, measurements = interactive_input()
     
-    plot_weight_chart(birth_info, measurements, args.unit, args.gender, args.output)
+    if args.gestational_age:
+        print_corrected_zscores(birth_info, measurements, args.gender, args.gestational_age, args.reference)
+    if args.metrics:
+        print_metric_zscores(birth_info, measurements, args.gender, args.gestational_age)
+    feeding = None
+    if args.feeding:
+        feeding, skipped = read_feeding_csv(args.feeding)
+        for line, e in skipped:
+            print(f"Skipping invalid feeding row: {line} ({e})")
+        print_feeding_join(birth_info, measurements, feeding)
+    history = None
+    if args.device:
+        history = read_device_history(birth_info, args.device)
+        if len(history):
+            print_device_summary(history)
+    
+    if args.forecast:
+        print_forecast(birth_info, measurements)
+    
+    if args.live:
+        fig = plt.figure(figsize=(12, 8))
+        chart = LiveWeightChart(fig, MeasurementStore.from_birth_info(birth_info, measurements), args.unit,
+                                args.gender, CHART_STYLE)
+        run_live(chart, args.live)
+        return
+    
+    plot_weight_chart(birth_info, measurements, args.unit, args.gender, args.output, args.forecast, feeding,
+                      history)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+from growth_core import MeasurementValidator, QuarantineReport, parse_measurement_lines, read_birth_row_csv
+
+BIRTH = datetime(2025, 4, 25, 15, 51)
+
+
+def test_minute_level_readings_are_kept():
+    validator = MeasurementValidator()
+    readings = [(BIRTH + timedelta(minutes=i), 3600 + (i % 7) - 3) for i in range(600)]
+    assert list(validator.filter(readings)) == readings
+    assert not validator.report.quarantined
+
+
+def test_repeated_weight_within_the_gap_is_a_near_duplicate():
+    validator = MeasurementValidator()
+    assert validator.check(BIRTH, 3600) is None
+    assert validator.check(BIRTH + timedelta(minutes=10), 3600) == "near_duplicate"
+    assert validator.check(BIRTH + timedelta(minutes=12), 3595) is None
+    assert validator.check(BIRTH + timedelta(hours=2), 3595) is None
+
+
+def test_gap_can_be_turned_off():
+    validator = MeasurementValidator(min_gap_minutes=0)
+    assert validator.check(BIRTH, 3600) is None
+    assert validator.check(BIRTH + timedelta(minutes=10), 3600) is None
+
+
+def test_same_day_is_warned_once_per_day():
+    validator = MeasurementValidator()
+    for hour in range(0, 8, 2):
+        assert validator.check(BIRTH + timedelta(hours=hour), 3600 - hour) is None
+    assert validator.report.counts() == {"same_day": 1}
+
+
+def test_unit_mistake_is_quarantined():
+    report = QuarantineReport()
+    lines = ["2025-04-25,15:51,3638", "2025-04-26,17:00,3.5", "2025-04-27,17:00,3500"]
+    measurements, skipped = parse_measurement_lines(lines, report)
+    assert [weight for _, weight in measurements] == [3638, 3500]
+    assert [entry["reason"] for entry in report.quarantined] == ["unit"]
+
+
+def test_report_rows_are_file_lines():
+    report = QuarantineReport()
+    lines = ["date,time,weight", "", "2025-04-25,15:51,3638", "not a row,,x", "2025-04-26,17:00,36380"]
+    measurements, skipped = parse_measurement_lines(lines, report)
+    assert len(measurements) == 1 and len(skipped) == 1
+    assert report.quarantined[0]["row"] == 5
+
+
+def test_birth_row_csv_reports_file_lines(tmp_path):
+    path = tmp_path / "baby.csv"
+    path.write_text("2025-04-25,15:51,3638\n2025-04-26,17:00,3500\n\n2025-04-27,17:00,3.4\n2025-04-28,17:00,3450\n")
+    report = QuarantineReport()
+    birth_info, measurements = read_birth_row_csv(str(path), report)
+    assert birth_info == ("2025-04-25", "15:51", 3638.0)
+    assert [row[2] for row in measurements] == [3500.0, 3450.0]
+    assert [(entry["row"], entry["reason"]) for entry in report.quarantined] == [(4, "unit")]
@@ -0,0 +1,54 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from growth_core.parallel import parallel_zscores
+
+# python zscore_benchmark.py --rows 20000000
+#
+# Times the shared-memory z-score engine on synthetic weighings with 1, 2, 4, ...
+# worker processes up to the CPU count and prints the speedup over one process.
+# Every run is checked against the single-process result.
+
+
+def synthetic_weighings(rows, seed=0):
+    """Random ages (0-60 days), weights and sexes for the benchmark"""
+    rng = np.random.default_rng(seed)
+    days = rng.uniform(0, 60, rows)
+    weights = rng.normal(3300 + 30 * days, 450)
+    sex = rng.integers(0, 2, rows, dtype=np.int8)
+    return days, weights, sex
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the multi-process z-score engine")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Number of weighings (default: 10 million)")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count(),
+                        help="Largest worker count to try (default: CPU count)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per worker count, best is kept (default: 3)")
+    args = parser.parse_args()
+
+    days, weights, sex = synthetic_weighings(args.rows)
+    counts = sorted({1, args.max_workers} | {2 ** i for i in range(1, args.max_workers.bit_length())
+                                             if 2 ** i <= args.max_workers})
+    print(f"{args.rows:,} weighings, {os.cpu_count()} CPUs")
+    print(f"{'Workers':>8} {'Seconds':>9} {'Rows/s':>14} {'Speedup':>8}")
+
+    baseline, expected = None, None
+    for workers in counts:
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            z, _ = parallel_zscores(days, weights, sex, workers=workers)
+            best = min(best, time.perf_counter() - start)
+        if expected is None:
+            baseline, expected = best, z
+        elif not np.array_equal(z, expected, equal_nan=True):
+            print(f"Warning: results with {workers} workers differ from the single-process run")
+        print(f"{workers:>8} {best:>9.3f} {args.rows / best:>14,.0f} {baseline / best:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+import argparse
+import asyncio
+import math
+import sys
+from datetime import datetime
+
+import numpy as np
+
+from make_log import DEFAULT_LOG, MakeLog
+from scaleIngredientes import RECETAS
+
+# Curva de acidificacion: follow the pH of every vat while the culture ripens
+# the milk, and compare it with earlier batches of the same cheese, so a slow
+# or dead culture shows up in minutes instead of at the end of "Dejar madurar
+# por 90min".
+#
+# python acidification.py --tina "A:Castle Blue:ph_a.csv"
+# python acidification.py --tina "A:Castle Blue:ph_a.csv" --objetivo 6.45 --seguir --guardar
+#
+# Each vat reads its own file (a stand-in for the pH meter's serial port), one
+# "timestamp,value" line per reading. timestamp is ISO or epoch seconds; value
+# is the pH, or the word "inicio" when the culture goes in (default: first line).
+#
+# The curve is kept incrementally as the mean pH of every GRID_MINUTES bucket
+# since the start, and the current acidification rate by an exponentially
+# weighted least-squares line, so adding a reading costs O(1). --guardar
+# stores the curve in the make log; the curves of earlier batches of the
+# cheese are loaded from there as one float32 matrix and the nearest ones (RMS
+# distance of the pH drop so far) are found in one vectorized pass, once per
+# grid bucket rather than per reading.
+
+# Curve grid: one point every GRID_MINUTES, up to CURVE_HOURS after the start
+GRID_MINUTES = 2
+CURVE_HOURS = 8
+CURVE_POINTS = CURVE_HOURS * 60 // GRID_MINUTES
+# Time constant of the rate fit, in minutes
+RATE_MINUTES = 15
+# Earlier batches shown as the nearest curves
+NEIGHBOURS = 3
+# Only judge a vat once earlier batches had dropped at least this much pH by the same time
+MIN_EXPECTED_DROP = 0.05
+# Observed drop / median drop of earlier batches below which a culture is slow or dead
+SLOW_RATIO = 0.6
+DEAD_RATIO = 0.2
+# Without earlier batches: dead culture if the pH dropped less than this after DEAD_MINUTES
+DEAD_DROP = 0.03
+DEAD_MINUTES = 60
+# A warning is only given after its condition held this many minutes; warnings never step back
+CONFIRM_MINUTES = 3
+# Minutes between status lines
+STATUS_MINUTES = 10
+
+
+class AcidificationCurve:
+    """pH of one vat since the start of ripening, on the curve grid, plus its current rate"""
+
+    def __init__(self, start):
+        self.start = start
+        self.sums = np.zeros(CURVE_POINTS)
+        self.counts = np.zeros(CURVE_POINTS, dtype=np.int32)
+        self.points = 0
+        self.first_ph = None
+        self.minutes = 0.0
+        self.ph = None
+        # Exponentially weighted sums for the line pH = a + b * minutes
+        self.weights = np.zeros(5)
+
+    def add(self, timestamp, ph):
+        minutes = (timestamp - self.start) / 60
+        if minutes < 0:
+            return
+        if self.first_ph is None:
+            self.first_ph = ph
+        point = int(minutes // GRID_MINUTES)
+        if point < CURVE_POINTS:
+            self.sums[point] += ph
+            self.counts[point] += 1
+            self.points = max(self.points, point + 1)
+        self.weights *= math.exp(-(minutes - self.minutes) / RATE_MINUTES)
+        self.weights += (1, minutes, ph, minutes * minutes, minutes * ph)
+        self.minutes = minutes
+        self.ph = ph
+
+    def curve(self):
+        """Mean pH of every grid bucket so far, float32, NaN where there was no reading"""
+        curve = np.full(self.points, np.nan, dtype=np.float32)
+        seen = self.counts[:self.points] > 0
+        curve[seen] = self.sums[:self.points][seen] / self.counts[:self.points][seen]
+        return curve
+
+    def _line(self):
+        """Slope (pH per minute) and level at the last reading of the weighted line"""
+        n, t, p, tt, tp = self.weights
+        denominator = n * tt - t * t
+        if n < 2 or denominator <= 1e-9 * n * tt:
+            return math.nan, self.ph
+        slope = (n * tp - t * p) / denominator
+        return slope, p / n + slope * (self.minutes - t / n)
+
+    def rate(self):
+        """Current acidification rate in pH per hour (negative while acidifying)"""
+        return self._line()[0] * 60
+
+    def level(self):
+        """Smoothed pH at the last reading"""
+        return self._line()[1]
+
+    def drop(self):
+        """Smoothed pH drop since the start (positive while acidifying)"""
+        first = self.sums[0] / self.counts[0] if self.counts[0] else self.first_ph
+        return first - self.level()
+
+
+def nearest_curves(curve, history, k=NEIGHBOURS):
+    """
+    Compare a partial curve with the earlier curves of the cheese
+
+    Curves are compared by their drop from their own first point, so different
+    milk pH does not count, over the grid points both have. Returns (indices
+    of the k nearest rows of history, their RMS distances, median drop of all
+    earlier curves at the last point of curve).
+    """
+    m = len(curve)
+    if not len(history) or m == 0 or np.isnan(curve[0]):
+        return np.array([], dtype=int), np.array([]), math.nan
+    past = history[:, :m] - history[:, :1]
+    difference = past - (curve - curve[0])
+    valid = ~np.isnan(difference)
+    counts = valid.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        distance = np.sqrt(np.where(valid, difference * difference, 0).sum(axis=1) / counts)
+    order = [i for i in np.argsort(distance) if counts[i] > 0][:k]
+    # Last grid point every earlier curve has, up to the current one
+    expected = -past[:, m - 1]
+    expected = expected[~np.isnan(expected)]
+    return np.array(order, dtype=int), distance[order], float(np.median(expected)) if len(expected) else math.nan
+
+
+def minutes_to_target(curve, history, neighbours, target, rate, minutes, ph):
+    """Estimated minutes from now until the pH reaches target, from the nearest curves or the rate"""
+    if ph <= target:
+        return 0.0
+    m = len(curve)
+    estimates = []
+    for i in neighbours:
+        # Neighbour shifted onto this vat's pH at the current point
+        ahead = history[i, m:] - history[i, m - 1] + ph
+        reached = np.flatnonzero(ahead <= target)
+        if len(reached):
+            estimates.append((m + reached[0]) * GRID_MINUTES - minutes)
+    if estimates:
+        return max(0.0, float(np.median(estimates)))
+    if rate < 0:
+        return (target - ph) / rate * 60
+    return math.nan
+
+
+WARNINGS = (None, "lento", "muerto")
+
+
+class Vat:
+    """One ripening vat: its curve, the earlier curves of its cheese and the warnings given"""
+
+    def __init__(self, name, cheese, labels=(), history=None, target=None):
+        self.name = name
+        self.cheese = cheese
+        self.labels = list(labels)
+        self.history = history if history is not None else np.empty((0, CURVE_POINTS), dtype=np.float32)
+        self.target = target
+        self.curve = None
+        # Comparison with the earlier curves, redone when the curve gets a new grid point
+        self.compared = None
+        self.started_at = None
+        self.warning = None
+        self.pending = None
+        self.next_status = 0
+        self.target_reached = False
+
+    def add(self, timestamp, value):
+        """Add one reading or event; return the messages it triggered"""
+        if value == "inicio" or self.curve is None:
+            self.curve = AcidificationCurve(timestamp)
+            self.compared = None
+            self.started_at = datetime.fromtimestamp(timestamp)
+            self.warning = None
+            self.pending = None
+            self.next_status = 0
+            self.target_reached = False
+            if value == "inicio":
+                return []
+        curve = self.curve
+        curve.add(timestamp, float(value))
+        messages = []
+        stamp = f"{format_time(timestamp)} Tina {self.name} ({self.cheese})"
+
+        if self.compared is None or len(self.compared[0]) != curve.points:
+            partial = curve.curve()
+            self.compared = (partial, *nearest_curves(partial, self.history))
+        partial, neighbours, distances, expected = self.compared
+        warning = self.check(expected)
+        if WARNINGS.index(warning) <= WARNINGS.index(self.warning):
+            self.pending = None
+        elif self.pending is None or WARNINGS.index(warning) < WARNINGS.index(self.pending[0]):
+            self.pending = (warning, curve.minutes)
+        if self.pending and curve.minutes - self.pending[1] >= CONFIRM_MINUTES:
+            self.warning = warning = self.pending[0]
+            self.pending = None
+            messages.append(f"{stamp}: CULTIVO {warning.upper()} - bajo {curve.drop():.2f} pH en "
+                            f"{curve.minutes:.0f} min" + (f", lotes anteriores {expected:.2f}"
+                                                          if not math.isnan(expected) else ""))
+        ph = curve.level()
+        if self.target is not None and not self.target_reached and ph <= self.target:
+            self.target_reached = True
+            messages.append(f"{stamp}: pH {ph:.2f} llego al objetivo {self.target} a los "
+                            f"{curve.minutes:.0f} min")
+        if curve.minutes >= self.next_status:
+            self.next_status = (curve.minutes // STATUS_MINUTES + 1) * STATUS_MINUTES
+            status = f"{stamp}: {curve.minutes:.0f} min, pH {ph:.2f}"
+            if not math.isnan(curve.rate()):
+                status += f", {curve.rate():+.2f} pH/h"
+            if len(neighbours):
+                status += ", parecida a " + ", ".join(f"{self.labels[i]} ({d:.3f})"
+                                                      for i, d in zip(neighbours, distances))
+            if self.target is not None and not self.target_reached:
+                left = minutes_to_target(partial, self.history, neighbours, self.target, curve.rate(),
+                                         curve.minutes, ph)
+                if not math.isnan(left):
+                    status += f", objetivo {self.target} en ~{left:.0f} min"
+            messages.append(status)
+        return messages
+
+    def check(self, expected):
+        """'lento' or 'muerto' when the drop so far is well below earlier batches, else None"""
+        curve = self.curve
+        if not math.isnan(expected) and expected >= MIN_EXPECTED_DROP:
+            ratio = curve.drop() / expected
+            if ratio < DEAD_RATIO:
+                return "muerto"
+            if ratio < SLOW_RATIO:
+                return "lento"
+            return None
+        if math.isnan(expected) and curve.minutes >= DEAD_MINUTES and curve.drop() < DEAD_DROP:
+            return "muerto"
+        return None
+
+
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%H:%M:%S")
+
+
+def parse_line(line):
+    """Parse "timestamp,value" into (epoch seconds, pH or "inicio")"""
+    stamp, value = [part.strip() for part in line.split(",")[:2]]
+    try:
+        timestamp = float(stamp)
+    except ValueError:
+        timestamp = datetime.fromisoformat(stamp).timestamp()
+    value = value.lower()
+    if value != "inicio":
+        float(value)
+    return timestamp, value
+
+
+async def follow_vat(vat, path, follow=False, poll_seconds=0.5):
+    """Read one vat's pH stream until it ends (or forever with follow)"""
+    f = sys.stdin if path == "-" else open(path, "r")
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            # Blocking reads run in a worker thread so a quiet vat does not stop the others
+            line = await loop.run_in_executor(None, f.readline)
+            if not line:
+                if not follow:
+                    return
+                await asyncio.sleep(poll_seconds)
+                continue
+            if not line.strip() or line.lower().startswith("timestamp"):
+                continue
+            try:
+                messages = vat.add(*parse_line(line))
+            except ValueError as e:
+                print(f"Tina {vat.name}: lectura invalida: {line.strip()} - {e}")
+                continue
+            for message in messages:
+                print(message)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+async def run_vats(specs, follow=False):
+    """Follow every (vat, path) concurrently in one event loop"""
+    await asyncio.gather(*(follow_vat(vat, path, follow) for vat, path in specs))
+
+
+def parse_vat(text, log, target=None):
+    """Parse "name:cheese:path" into (Vat with the cheese's earlier curves, path)"""
+    parts = text.split(":", 2)
+    if len(parts) != 3:
+        raise ValueError(f"Tina invalida '{text}', usar nombre:queso:archivo")
+    name, cheese, path = parts
+    if cheese not in RECETAS:
+        raise ValueError(f"Queso desconocido '{cheese}', elegir entre: {', '.join(sorted(RECETAS))}")
+    labels, history = log.ph_curves(cheese, GRID_MINUTES, CURVE_POINTS)
+    return Vat(name, cheese, labels, history, target), path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seguir la acidificacion (pH) de cada tina")
+    parser.add_argument("--tina", action="append", required=True, metavar="NOMBRE:QUESO:ARCHIVO",
+                        help="Tina, receta y archivo de lecturas de pH (- para stdin); repetible")
+    parser.add_argument("--objetivo", type=float, help="pH objetivo de la maduracion (avisa y estima cuando llega)")
+    parser.add_argument("--seguir", action="store_true", help="Seguir leyendo a medida que crecen los archivos")
+    parser.add_argument("--guardar", action="store_true", help="Guardar las curvas en la bitacora al terminar")
+    parser.add_argument("--log", default=DEFAULT_LOG, help="Bitacora de elaboracion con las curvas anteriores")
+    args = parser.parse_args()
+
+    with MakeLog(args.log) as log:
+        try:
+            specs = [parse_vat(text, log, args.objetivo) for text in args.tina]
+        except ValueError as e:
+            parser.error(str(e))
+        for vat, path in specs:
+            print(f"Tina {vat.name} ({vat.cheese}): {len(vat.labels)} curvas anteriores")
+        try:
+            asyncio.run(run_vats(specs, args.seguir))
+        except KeyboardInterrupt:
+            pass
+        if args.guardar:
+            for vat, path in specs:
+                if vat.curve is not None and vat.curve.points:
+                    label = f"{vat.name} {vat.started_at:%Y-%m-%d %H:%M}"
+                    log.record_ph_curve(vat.cheese, vat.started_at, vat.curve.curve(), GRID_MINUTES, label)
+                    print(f"Curva de la tina {vat.name} guardada como '{label}'")
+
+
+if __name__ == "__main__":
+    main()
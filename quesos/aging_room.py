@@ -0,0 +1,317 @@
+import argparse
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from make_log import DEFAULT_LOG, MakeLog
+
+# Camara de maduracion: follow temperature and humidity of the aging room and
+# of every wheel in it.
+#
+# python aging_room.py lecturas.csv
+# python aging_room.py lecturas.csv --seguir        (keep reading as the file grows)
+# sensor_reader | python aging_room.py -             (readings on stdin)
+#
+# Readings are "timestamp,temp_c,humidity_percent" lines; timestamp is ISO
+# (2025-06-01T10:00:00 or "2025-06-01 10:00:00") or epoch seconds. A file that
+# keeps growing, or stdin, stands in for the serial port.
+#
+# Memory stays bounded however long it runs: raw readings live in a fixed
+# ring buffer, and only minute and hourly summaries are kept, each in a fixed
+# ring buffer too. The wheels come from the make log (bitacora) written by
+# scaleIngredientes.py --rueda; readings are checked against the aging profile
+# of each wheel's cheese and excursions are flagged as they happen. The room
+# itself is checked against ROOM_PROFILE too, with or without wheels in it.
+
+# Target ranges (temp in C, humidity in %), days in the room, and reminders by age in days
+AGING_PROFILES = {
+    "Castle Blue": {"temp": (10, 13), "humidity": (85, 95), "days": 60,
+                    "milestones": {7: "Sacar de la caja de maduracion", 10: "Perforar"}},
+    "Camembert": {"temp": (11, 13), "humidity": (90, 95), "days": 35,
+                  "milestones": {1: "Dar vuelta a diario la primera semana", 12: "Envolver"}},
+    "Valencay": {"temp": (10, 12), "humidity": (85, 90), "days": 21, "milestones": {}},
+    "Valencay 2": {"temp": (10, 12), "humidity": (85, 90), "days": 21, "milestones": {}},
+    "Alpine Tomme": {"temp": (10, 14), "humidity": (85, 92), "days": 90, "milestones": {}},
+}
+DEFAULT_PROFILE = {"temp": (8, 14), "humidity": (80, 95), "days": 60, "milestones": {}}
+# Range of the room as a whole, flagged even when it holds no wheels
+ROOM_PROFILE = DEFAULT_PROFILE
+
+# Raw readings kept (1 hour at one reading per second)
+RAW_CAPACITY = 3600
+# Minute summaries kept for the room (2 days)
+MINUTE_CAPACITY = 2 * 24 * 60
+# Hourly summaries kept per wheel (half a year)
+HOUR_CAPACITY = 24 * 183
+# An excursion is only flagged after this many seconds out of range
+GRACE_SECONDS = 300
+
+SUMMARY_FIELDS = ("start", "temp_mean", "temp_min", "temp_max", "humidity_mean", "humidity_min", "humidity_max")
+
+
+class RingBuffer:
+    """Fixed-size buffer of rows; the oldest rows are overwritten when full"""
+
+    def __init__(self, capacity, columns, dtype=np.float64):
+        self.data = np.full((capacity, columns), np.nan, dtype=dtype)
+        self.capacity = capacity
+        self.count = 0
+
+    def append(self, row):
+        self.data[self.count % self.capacity] = row
+        self.count += 1
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def rows(self):
+        """Rows in time order, oldest first (a copy)"""
+        if self.count <= self.capacity:
+            return self.data[:self.count].copy()
+        split = self.count % self.capacity
+        return np.concatenate([self.data[split:], self.data[:split]])
+
+
+class Summary:
+    """Running mean/min/max of the readings in one time bucket"""
+
+    def __init__(self, start):
+        self.start = start
+        self.n = 0
+        self.sums = np.zeros(2)
+        self.mins = np.full(2, np.inf)
+        self.maxs = np.full(2, -np.inf)
+
+    def add(self, values):
+        self.n += 1
+        self.sums += values
+        np.minimum(self.mins, values, out=self.mins)
+        np.maximum(self.maxs, values, out=self.maxs)
+
+    def row(self):
+        mean = self.sums / self.n
+        return [self.start, mean[0], self.mins[0], self.maxs[0], mean[1], self.mins[1], self.maxs[1]]
+
+
+class ExcursionDetector:
+    """Flag temperature or humidity out of a profile's range for longer than GRACE_SECONDS"""
+
+    def __init__(self, profile, grace=GRACE_SECONDS):
+        self.limits = {"temp": profile["temp"], "humidity": profile["humidity"]}
+        self.grace = grace
+        self.out_since = {}     # variable -> time it left the range
+        self.flagged = {}       # variable -> worst value while flagged
+
+    def check(self, timestamp, temp, humidity):
+        """Return a list of (event, variable, value, seconds) started or ended by this reading"""
+        events = []
+        for variable, value in (("temp", temp), ("humidity", humidity)):
+            low, high = self.limits[variable]
+            if low <= value <= high:
+                if variable in self.flagged:
+                    events.append(("fin", variable, self.flagged.pop(variable),
+                                   timestamp - self.out_since[variable]))
+                self.out_since.pop(variable, None)
+                continue
+            since = self.out_since.setdefault(variable, timestamp)
+            if variable in self.flagged:
+                # Keep the value furthest from the middle of the range
+                middle = (low + high) / 2
+                self.flagged[variable] = max(self.flagged[variable], value, key=lambda v: abs(v - middle))
+            elif timestamp - since >= self.grace:
+                self.flagged[variable] = value
+                events.append(("inicio", variable, value, timestamp - since))
+        return events
+
+
+class Wheel:
+    """One wheel in the aging room and its hourly history"""
+
+    def __init__(self, label, cheese, made_at):
+        self.label = label
+        self.cheese = cheese
+        self.made_at = made_at
+        self.profile = AGING_PROFILES.get(cheese, DEFAULT_PROFILE)
+        # Allocated with the first hour the wheel spends in the room
+        self.history = None
+        self.reminded = set()
+
+    def age_days(self, timestamp):
+        return (timestamp - self.made_at) / 86400
+
+    def in_room(self, timestamp):
+        return 0 <= self.age_days(timestamp) <= self.profile["days"]
+
+    def add_hour(self, row):
+        if self.history is None:
+            self.history = RingBuffer(HOUR_CAPACITY, len(SUMMARY_FIELDS))
+        self.history.append(row)
+
+
+class AgingRoom:
+    """Streaming state of the aging room: raw ring buffer, summaries, wheels and excursions"""
+
+    def __init__(self, wheels=()):
+        self.raw = RingBuffer(RAW_CAPACITY, 3)
+        self.minutes = RingBuffer(MINUTE_CAPACITY, len(SUMMARY_FIELDS))
+        self.wheels = list(wheels)
+        self.room_detector = ExcursionDetector(ROOM_PROFILE)
+        # One detector per cheese, shared by its wheels
+        self.detectors = {}
+        self.minute = None
+        self.hour = None
+        self.last_timestamp = None
+
+    def add_wheel(self, wheel):
+        self.wheels.append(wheel)
+
+    def _close_hour(self):
+        row = self.hour.row()
+        for wheel in self.wheels:
+            if wheel.in_room(self.hour.start):
+                wheel.add_hour(row)
+
+    def add_reading(self, timestamp, temp, humidity):
+        """Add one reading; return the list of messages it triggered"""
+        if self.last_timestamp is not None and timestamp < self.last_timestamp:
+            return [f"Lectura fuera de orden ignorada: {format_time(timestamp)}"]
+        self.last_timestamp = timestamp
+        self.raw.append((timestamp, temp, humidity))
+        values = np.array((temp, humidity))
+
+        minute_start = timestamp - timestamp % 60
+        if self.minute is None or minute_start != self.minute.start:
+            if self.minute is not None:
+                self.minutes.append(self.minute.row())
+            self.minute = Summary(minute_start)
+        self.minute.add(values)
+
+        hour_start = timestamp - timestamp % 3600
+        if self.hour is None or hour_start != self.hour.start:
+            if self.hour is not None:
+                self._close_hour()
+            self.hour = Summary(hour_start)
+        self.hour.add(values)
+
+        messages = excursion_messages(self.room_detector, timestamp, temp, humidity, "camara")
+        active = [wheel for wheel in self.wheels if wheel.in_room(timestamp)]
+        for cheese in sorted({wheel.cheese for wheel in active}):
+            if cheese not in self.detectors:
+                self.detectors[cheese] = ExcursionDetector(AGING_PROFILES.get(cheese, DEFAULT_PROFILE))
+            labels = ", ".join(wheel.label for wheel in active if wheel.cheese == cheese)
+            messages += excursion_messages(self.detectors[cheese], timestamp, temp, humidity,
+                                           f"{cheese}: {labels}")
+        for wheel in active:
+            for day, reminder in wheel.profile["milestones"].items():
+                if day not in wheel.reminded and wheel.age_days(timestamp) >= day:
+                    wheel.reminded.add(day)
+                    messages.append(f"{format_time(timestamp)} {wheel.label} ({wheel.cheese}) dia {day}: {reminder}")
+        return messages
+
+    def finish(self):
+        """Close the open minute and hour summaries (end of input)"""
+        if self.minute is not None:
+            self.minutes.append(self.minute.row())
+            self.minute = None
+        if self.hour is not None:
+            self._close_hour()
+            self.hour = None
+
+
+def excursion_messages(detector, timestamp, temp, humidity, where):
+    """Check one reading with a detector; return a message per excursion started or ended"""
+    messages = []
+    for event, variable, value, seconds in detector.check(timestamp, temp, humidity):
+        low, high = detector.limits[variable]
+        if event == "inicio":
+            messages.append(f"{format_time(timestamp)} EXCURSION {variable} {value:.1f} fuera de "
+                            f"{low}-{high} hace {seconds / 60:.0f} min ({where})")
+        else:
+            messages.append(f"{format_time(timestamp)} Fin de excursion {variable} tras "
+                            f"{seconds / 60:.0f} min, peor valor {value:.1f} ({where})")
+    return messages
+
+
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def parse_reading(line):
+    """Parse "timestamp,temp,humidity" into (epoch seconds, temp, humidity)"""
+    stamp, temp, humidity = [part.strip() for part in line.split(",")[:3]]
+    try:
+        timestamp = float(stamp)
+    except ValueError:
+        timestamp = datetime.fromisoformat(stamp).timestamp()
+    return timestamp, float(temp), float(humidity)
+
+
+def read_lines(source, follow=False, poll_seconds=0.5):
+    """Yield lines from a file or stdin ('-'); with follow, wait for new lines like tail -f"""
+    f = sys.stdin if source == "-" else open(source, "r")
+    try:
+        while True:
+            line = f.readline()
+            if line:
+                yield line
+            elif follow:
+                time.sleep(poll_seconds)
+            else:
+                break
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def load_wheels(log_path):
+    """Wheels recorded in the make log"""
+    with MakeLog(log_path) as log:
+        return [Wheel(label, cheese, datetime.fromisoformat(made_at).timestamp())
+                for label, cheese, made_at in log.wheels()]
+
+
+def print_wheel_summary(room):
+    print("-" * 100)
+    print("{:<15} {:<15} {:<8} {:<18} {:<18}".format("Rueda", "Queso", "Horas", "Temp (min-max)", "Humedad (min-max)"))
+    print("-" * 100)
+    for wheel in room.wheels:
+        if wheel.history is None:
+            continue
+        history = wheel.history.rows()
+        print("{:<15} {:<15} {:<8} {:<18} {:<18}".format(
+            wheel.label, wheel.cheese, len(history),
+            f"{np.nanmin(history[:, 2]):.1f}-{np.nanmax(history[:, 3]):.1f}",
+            f"{np.nanmin(history[:, 5]):.1f}-{np.nanmax(history[:, 6]):.1f}"))
+    print("-" * 100)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seguimiento de la camara de maduracion")
+    parser.add_argument("lecturas", help="Archivo CSV de lecturas (timestamp,temp,humedad) o - para stdin")
+    parser.add_argument("--seguir", action="store_true", help="Seguir leyendo a medida que crece el archivo")
+    parser.add_argument("--log", default=DEFAULT_LOG, help="Bitacora de elaboracion con las ruedas")
+    args = parser.parse_args()
+
+    room = AgingRoom(load_wheels(args.log))
+    print(f"{len(room.wheels)} ruedas en la bitacora")
+    try:
+        for line in read_lines(args.lecturas, args.seguir):
+            if not line.strip() or line.lower().startswith("timestamp"):
+                continue
+            try:
+                reading = parse_reading(line)
+            except ValueError as e:
+                print(f"Lectura invalida: {line.strip()} - {e}")
+                continue
+            for message in room.add_reading(*reading):
+                print(message)
+    except KeyboardInterrupt:
+        pass
+    room.finish()
+    print_wheel_summary(room)
+
+
+if __name__ == "__main__":
+    main()
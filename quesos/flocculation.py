@@ -0,0 +1,224 @@
+import argparse
+import asyncio
+import math
+import sys
+import time
+from datetime import datetime
+
+from scaleIngredientes import RECETAS, flat_recipe
+
+# Timer de floculacion: detect the flocculation point of every vat from a
+# stream of readings and announce the cut time = multiplier x flocculation
+# time, with the multiplier stored in each recipe ("floculacion").
+#
+# python flocculation.py --tina "A:Castle Blue:sonda_a.csv" --tina "B:Camembert:toques_b.csv"
+# python flocculation.py --tina "A:Castle Blue:sonda_a.csv" --seguir     (live, as the file grows)
+#
+# Each vat reads its own file (a stand-in for a probe or for manual taps),
+# one "timestamp,value" line per reading. timestamp is ISO or epoch seconds;
+# value is a probe reading (e.g. optical backscatter, or the spin speed of the
+# floating bowl), or a word:
+#   rennet  rennet added, the flocculation clock starts (default: first line)
+#   floc    manual tap: the bowl stopped spinning, flocculation is now
+#
+# Without taps, the flocculation point is found online with a two-sided CUSUM
+# on the smoothed slope of the probe signal, standardized against the slope
+# seen in the first minutes after the rennet. The start of the run that
+# crosses the threshold is the flocculation point. Only a handful of numbers
+# are kept per vat, whatever the length of the stream. All vats run as tasks
+# of one asyncio loop.
+
+# Readings used to learn the baseline slope before looking for a change
+WARMUP_READINGS = 20
+# CUSUM allowance and threshold, in baseline standard deviations
+CUSUM_DRIFT = 1.0
+CUSUM_THRESHOLD = 8.0
+# Smoothing of the slope (exponential moving average weight of a new slope)
+SLOPE_SMOOTHING = 0.3
+# Smallest baseline slope deviation, in signal units per minute
+MIN_SLOPE_SD = 1e-3
+
+
+class FlocculationDetector:
+    """Streaming two-sided CUSUM on the probe slope; constant memory"""
+
+    def __init__(self, warmup=WARMUP_READINGS, drift=CUSUM_DRIFT, threshold=CUSUM_THRESHOLD):
+        self.warmup = warmup
+        self.drift = drift
+        self.threshold = threshold
+        self.previous = None
+        self.slope = None
+        # Welford mean/variance of the baseline slope
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.high = self.low = 0.0
+        self.high_start = self.low_start = None
+        self.detected = None
+
+    def update(self, timestamp, value):
+        """Add a reading; return the flocculation time once, when it is detected"""
+        if self.detected is not None:
+            return None
+        if self.previous is None:
+            self.previous = (timestamp, value)
+            return None
+        last_time, last_value = self.previous
+        self.previous = (timestamp, value)
+        if timestamp <= last_time:
+            return None
+        slope = (value - last_value) / ((timestamp - last_time) / 60)
+        self.slope = slope if self.slope is None else self.slope + SLOPE_SMOOTHING * (slope - self.slope)
+
+        if self.n < self.warmup:
+            self.n += 1
+            delta = self.slope - self.mean
+            self.mean += delta / self.n
+            self.m2 += delta * (self.slope - self.mean)
+            if self.n == self.warmup:
+                # Both runs start at the end of the warmup until their sum first returns to zero
+                self.high_start = self.low_start = timestamp
+            return None
+
+        sd = max(math.sqrt(self.m2 / (self.n - 1)), MIN_SLOPE_SD)
+        z = (self.slope - self.mean) / sd
+        self.high = max(0.0, self.high + z - self.drift)
+        self.low = max(0.0, self.low - z - self.drift)
+        # A run starts at the last reading where its sum was zero
+        if self.high == 0:
+            self.high_start = timestamp
+        if self.low == 0:
+            self.low_start = timestamp
+        if self.high > self.threshold:
+            self.detected = self.high_start
+        elif self.low > self.threshold:
+            self.detected = self.low_start
+        return self.detected
+
+
+class Vat:
+    """One vat on make day: its recipe multiplier, rennet time and detector"""
+
+    def __init__(self, name, cheese):
+        self.name = name
+        self.cheese = cheese
+        recipe = flat_recipe(RECETAS[cheese])
+        if "floculacion" not in recipe:
+            raise ValueError(f"La receta '{cheese}' no tiene multiplicador de floculacion")
+        self.multiplier = recipe["floculacion"]
+        self.rennet_time = None
+        self.flocculation_time = None
+        self.detector = FlocculationDetector()
+
+    def cut_time(self):
+        """Cut time: rennet time + multiplier x time to flocculation"""
+        return self.rennet_time + self.multiplier * (self.flocculation_time - self.rennet_time)
+
+    def add(self, timestamp, value):
+        """Add one reading or event; return a message when flocculation is found"""
+        if value == "rennet" or self.rennet_time is None:
+            self.rennet_time = timestamp
+            self.detector = FlocculationDetector()
+            if value == "rennet":
+                return None
+        if self.flocculation_time is not None:
+            return None
+        if value == "floc":
+            self.flocculation_time = timestamp
+        else:
+            self.flocculation_time = self.detector.update(timestamp, float(value))
+        if self.flocculation_time is None:
+            return None
+        minutes = (self.flocculation_time - self.rennet_time) / 60
+        return (f"Tina {self.name} ({self.cheese}): floculacion a los {minutes:.1f} min "
+                f"({format_time(self.flocculation_time)}), cortar a {self.multiplier} x = "
+                f"{self.multiplier * minutes:.0f} min, a las {format_time(self.cut_time())}")
+
+
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%H:%M:%S")
+
+
+def parse_line(line):
+    """Parse "timestamp,value" into (epoch seconds, value or event word)"""
+    stamp, value = [part.strip() for part in line.split(",")[:2]]
+    try:
+        timestamp = float(stamp)
+    except ValueError:
+        timestamp = datetime.fromisoformat(stamp).timestamp()
+    value = value.lower()
+    if value not in ("rennet", "floc"):
+        float(value)
+    return timestamp, value
+
+
+async def cut_alarm(vat):
+    """Wait until the vat's cut time (if it is still ahead) and announce it"""
+    await asyncio.sleep(max(0.0, vat.cut_time() - time.time()))
+    print(f"*** CORTAR tina {vat.name} ({vat.cheese}) - {format_time(vat.cut_time())} ***")
+
+
+async def follow_vat(vat, path, follow=False, poll_seconds=0.5):
+    """Read one vat's stream, detect flocculation and schedule its cut alarm"""
+    f = sys.stdin if path == "-" else open(path, "r")
+    loop = asyncio.get_running_loop()
+    try:
+        while vat.flocculation_time is None:
+            # Blocking reads run in a worker thread so a quiet vat does not stop the others
+            line = await loop.run_in_executor(None, f.readline)
+            if not line:
+                if not follow:
+                    print(f"Tina {vat.name}: fin de lecturas sin detectar floculacion")
+                    return
+                await asyncio.sleep(poll_seconds)
+                continue
+            if not line.strip() or line.lower().startswith("timestamp"):
+                continue
+            try:
+                message = vat.add(*parse_line(line))
+            except ValueError as e:
+                print(f"Tina {vat.name}: lectura invalida: {line.strip()} - {e}")
+                continue
+            if message:
+                print(message)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    await cut_alarm(vat)
+
+
+async def run_vats(specs, follow=False):
+    """Follow every (vat, path) concurrently in one event loop"""
+    await asyncio.gather(*(follow_vat(vat, path, follow) for vat, path in specs))
+
+
+def parse_vat(text):
+    """Parse "name:cheese:path" into (Vat, path)"""
+    parts = text.split(":", 2)
+    if len(parts) != 3:
+        raise ValueError(f"Tina invalida '{text}', usar nombre:queso:archivo")
+    name, cheese, path = parts
+    if cheese not in RECETAS:
+        raise ValueError(f"Queso desconocido '{cheese}', elegir entre: {', '.join(sorted(RECETAS))}")
+    return Vat(name, cheese), path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detectar la floculacion y calcular la hora de corte")
+    parser.add_argument("--tina", action="append", required=True, metavar="NOMBRE:QUESO:ARCHIVO",
+                        help="Tina, receta y archivo de lecturas (- para stdin); repetible")
+    parser.add_argument("--seguir", action="store_true", help="Seguir leyendo a medida que crecen los archivos")
+    args = parser.parse_args()
+
+    try:
+        specs = [parse_vat(text) for text in args.tina]
+    except ValueError as e:
+        parser.error(str(e))
+    try:
+        asyncio.run(run_vats(specs, args.seguir))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
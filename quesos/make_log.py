@@ -0,0 +1,254 @@
+import argparse
+import os
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+
+# Bitacora de elaboracion: append-only log of every batch made with
+# scaleIngredientes.py, to trace which culture lot, litres and quantities went
+# into which wheel.
+#
+# python make_log.py --lote MM100-2405                 every batch using that lot
+# python make_log.py --lote MM100-2405 --ingrediente mesophilic
+# python make_log.py --queso "Castle Blue" --desde 2025-01-01
+#
+# The log is a SQLite file (~/.quesos/bitacora.sqlite unless --log). Rows are
+# only ever inserted (triggers reject UPDATE and DELETE), several records share
+# one commit (one fsync), and cheese name, date, lot and wheel are indexed, so
+# lot queries stay in the milliseconds after years of batches. The
+# acidification (pH) curve of each vat is kept too, as float32 on a regular
+# time grid (see acidification.py).
+
+# Kept in the user's home, not next to the scripts (SQLite also writes -wal/-shm files beside it)
+DEFAULT_LOG = os.path.join(os.path.expanduser("~"), ".quesos", "bitacora.sqlite")
+
+# Records per commit; close() commits the rest
+COMMIT_EVERY = 32
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    id INTEGER PRIMARY KEY,
+    made_at TEXT NOT NULL,
+    cheese TEXT NOT NULL,
+    milk_liters REAL NOT NULL,
+    recipe_milk_liters REAL NOT NULL,
+    notes TEXT
+);
+CREATE TABLE IF NOT EXISTS batch_ingredients (
+    batch_id INTEGER NOT NULL REFERENCES batches(id),
+    ingredient TEXT NOT NULL,
+    amount_tsp REAL NOT NULL,
+    combination TEXT,
+    remainder_256 REAL,
+    lot TEXT
+);
+CREATE TABLE IF NOT EXISTS batch_wheels (
+    batch_id INTEGER NOT NULL REFERENCES batches(id),
+    wheel TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ph_curves (
+    id INTEGER PRIMARY KEY,
+    batch_id INTEGER REFERENCES batches(id),
+    cheese TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    label TEXT,
+    grid_minutes REAL NOT NULL,
+    curve BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS batches_cheese ON batches (cheese, made_at);
+CREATE INDEX IF NOT EXISTS batches_made_at ON batches (made_at);
+CREATE INDEX IF NOT EXISTS ingredients_lot ON batch_ingredients (lot, ingredient);
+CREATE INDEX IF NOT EXISTS ingredients_batch ON batch_ingredients (batch_id);
+CREATE INDEX IF NOT EXISTS wheels_wheel ON batch_wheels (wheel);
+CREATE INDEX IF NOT EXISTS wheels_batch ON batch_wheels (batch_id);
+CREATE INDEX IF NOT EXISTS ph_curves_cheese ON ph_curves (cheese, grid_minutes);
+"""
+
+APPEND_ONLY = """
+CREATE TRIGGER IF NOT EXISTS {table}_no_update BEFORE UPDATE ON {table}
+BEGIN SELECT RAISE(ABORT, 'make log is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS {table}_no_delete BEFORE DELETE ON {table}
+BEGIN SELECT RAISE(ABORT, 'make log is append-only'); END;
+"""
+
+
+class MakeLog:
+    """Append-only log of cheese batches in a SQLite file"""
+
+    def __init__(self, path=DEFAULT_LOG, commit_every=COMMIT_EVERY):
+        self.path = path
+        self.commit_every = commit_every
+        self.pending = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        # FULL: every commit is fsync'ed, so batching commits batches fsyncs
+        self.db.execute("PRAGMA synchronous=FULL")
+        self.db.executescript(SCHEMA)
+        for table in ("batches", "batch_ingredients", "batch_wheels", "ph_curves"):
+            self.db.executescript(APPEND_ONLY.format(table=table))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, recipe, milk_amount_liters, scaled_ingredients, lots=None, wheels=(), notes=None,
+               made_at=None):
+        """
+        Add one batch to the log and return its id
+
+        :param recipe: recipe dict as used by scale_ingredients (name, milk, ingredients)
+        :param milk_amount_liters: litres of milk actually used
+        :param scaled_ingredients: result of scale_ingredients for this batch
+        :param lots: dict of ingredient -> lot number
+        :param wheels: labels of the wheels made from this batch
+        :param made_at: datetime of the make (default: now)
+        """
+        lots = lots or {}
+        made_at = (made_at or datetime.now()).isoformat(timespec="seconds")
+        cursor = self.db.execute(
+            "INSERT INTO batches (made_at, cheese, milk_liters, recipe_milk_liters, notes) VALUES (?, ?, ?, ?, ?)",
+            (made_at, recipe["name"], milk_amount_liters, recipe["milk"], notes))
+        batch_id = cursor.lastrowid
+        self.db.executemany(
+            "INSERT INTO batch_ingredients (batch_id, ingredient, amount_tsp, combination, remainder_256, lot) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(batch_id, ingredient, recipe[ingredient] * milk_amount_liters / recipe["milk"],
+              data["combination"], data["remainder_256"], lots.get(ingredient))
+             for ingredient, data in scaled_ingredients.items()])
+        self.db.executemany("INSERT INTO batch_wheels (batch_id, wheel) VALUES (?, ?)",
+                            [(batch_id, wheel) for wheel in wheels])
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.commit()
+        return batch_id
+
+    def commit(self):
+        self.db.commit()
+        self.pending = 0
+
+    def close(self):
+        self.commit()
+        self.db.close()
+
+    def _batches(self, where, params):
+        rows = self.db.execute(f"""
+            SELECT b.id, b.made_at, b.cheese, b.milk_liters,
+                   (SELECT group_concat(w.wheel, ', ') FROM batch_wheels w WHERE w.batch_id = b.id)
+            FROM batches b WHERE {where} ORDER BY b.made_at""", params)
+        return [{"id": r[0], "made_at": r[1], "cheese": r[2], "milk_liters": r[3], "wheels": r[4] or ""}
+                for r in rows]
+
+    def batches_with_lot(self, lot, ingredient=None):
+        """Every batch that used the given lot (of the given ingredient)"""
+        where = "b.id IN (SELECT batch_id FROM batch_ingredients WHERE lot = ?"
+        params = [lot]
+        if ingredient:
+            where += " AND ingredient = ?"
+            params.append(ingredient)
+        return self._batches(where + ")", params)
+
+    def batches_of(self, cheese=None, since=None, until=None):
+        """Batches of a cheese and/or within a date range (ISO dates, inclusive)"""
+        conditions, params = ["1"], []
+        if cheese:
+            conditions.append("b.cheese = ?")
+            params.append(cheese)
+        if since:
+            conditions.append("b.made_at >= ?")
+            params.append(since)
+        if until:
+            conditions.append("b.made_at < date(?, '+1 day')")
+            params.append(until)
+        return self._batches(" AND ".join(conditions), params)
+
+    def wheels(self, since=None):
+        """(wheel, cheese, made_at) of every logged wheel, optionally made since an ISO date"""
+        return self.db.execute(
+            "SELECT w.wheel, b.cheese, b.made_at FROM batch_wheels w JOIN batches b ON b.id = w.batch_id "
+            "WHERE b.made_at >= ? ORDER BY b.made_at", (since or "",)).fetchall()
+
+    def record_ph_curve(self, cheese, started_at, curve, grid_minutes, label=None, batch_id=None):
+        """
+        Add the acidification curve of one vat and return its id
+
+        :param curve: pH on a regular grid from the start of ripening (NaN where no reading)
+        :param grid_minutes: minutes between grid points
+        """
+        cursor = self.db.execute(
+            "INSERT INTO ph_curves (batch_id, cheese, started_at, label, grid_minutes, curve) VALUES (?, ?, ?, ?, ?, ?)",
+            (batch_id, cheese, started_at.isoformat(timespec="seconds"), label, grid_minutes,
+             np.asarray(curve, dtype=np.float32).tobytes()))
+        self.commit()
+        return cursor.lastrowid
+
+    def ph_curves(self, cheese, grid_minutes, points):
+        """
+        Logged pH curves of a cheese as one (curves x points) float32 matrix
+
+        Curves are cut or NaN-padded to the given number of points.
+        Returns (labels, matrix).
+        """
+        rows = self.db.execute(
+            "SELECT coalesce(label, started_at), curve FROM ph_curves WHERE cheese = ? AND grid_minutes = ? "
+            "ORDER BY started_at", (cheese, grid_minutes)).fetchall()
+        matrix = np.full((len(rows), points), np.nan, dtype=np.float32)
+        for i, (label, blob) in enumerate(rows):
+            curve = np.frombuffer(blob, dtype=np.float32)[:points]
+            matrix[i, :len(curve)] = curve
+        return [label for label, blob in rows], matrix
+
+    def ingredients(self, batch_id):
+        """Ingredient rows (ingredient, amount_tsp, combination, lot) of one batch"""
+        return self.db.execute(
+            "SELECT ingredient, amount_tsp, combination, lot FROM batch_ingredients WHERE batch_id = ?",
+            (batch_id,)).fetchall()
+
+
+def parse_lots(values):
+    """Turn ["mesophilic=MM100-2405", ...] into {"mesophilic": "MM100-2405", ...}"""
+    lots = {}
+    for value in values or []:
+        ingredient, sep, lot = value.partition("=")
+        if not sep or not ingredient or not lot:
+            raise ValueError(f"Lote invalido '{value}', usar ingrediente=lote")
+        lots[ingredient.strip()] = lot.strip()
+    return lots
+
+
+def print_batches(log, batches):
+    print("-" * 100)
+    print("{:<6} {:<20} {:<20} {:<8} {:<40}".format("Nro", "Fecha", "Queso", "Litros", "Ruedas"))
+    print("-" * 100)
+    for batch in batches:
+        print("{:<6} {:<20} {:<20} {:<8} {:<40}".format(batch["id"], batch["made_at"], batch["cheese"],
+                                                         batch["milk_liters"], batch["wheels"]))
+        for ingredient, amount, combination, lot in log.ingredients(batch["id"]):
+            print("       {:<15} {:<50} lote: {}".format(ingredient, combination, lot or "-"))
+    print("-" * 100)
+    print(f"{len(batches)} elaboraciones")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consultar la bitacora de elaboracion de quesos")
+    parser.add_argument("--log", default=DEFAULT_LOG, help="Archivo de la bitacora (default: ~/.quesos/bitacora.sqlite)")
+    parser.add_argument("--lote", help="Elaboraciones que usaron este lote")
+    parser.add_argument("--ingrediente", help="Limitar --lote a este ingrediente (ej. mesophilic)")
+    parser.add_argument("--queso", help="Elaboraciones de este queso")
+    parser.add_argument("--desde", help="Desde esta fecha (YYYY-MM-DD)")
+    parser.add_argument("--hasta", help="Hasta esta fecha inclusive (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    with MakeLog(args.log) as log:
+        if args.lote:
+            batches = log.batches_with_lot(args.lote, args.ingrediente)
+        else:
+            batches = log.batches_of(args.queso, args.desde, args.hasta)
+        print_batches(log, batches)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import argparse
+import ast
+import difflib
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from make_log import APPEND_ONLY, DEFAULT_LOG, MakeLog
+from scaleIngredientes import NOT_INGREDIENTS, RECETAS, flat_recipe
+
+# Versiones de recetas: every version of every recipe, stored by the hash of
+# its content, so the editor backups (scaleIngredientes.py~) are no longer the
+# only history.
+#
+# python recipe_store.py --guardar                       save the recipes of scaleIngredientes.py
+# python recipe_store.py --importar scaleIngredientes.py~ queso_viejo.py
+# python recipe_store.py --historial "Castle Blue"       every version, with what changed
+# python recipe_store.py --diff 3fa2c1 9b04de            two versions (hash prefixes)
+# python recipe_store.py --elaboracion 12                version used by batch 12
+#
+# A version is the canonical JSON of the recipe: ingredient ratios per litre
+# of milk, other parameters (floculacion, html) and the steps, one per line.
+# Its SHA-256 is the key of the object table, so saving the same recipe twice
+# stores it once. The objects live in the make log next to the batches;
+# scaleIngredientes.py links every batch it records to its recipe version, so
+# "which version made batch N" is one primary-key lookup. Diffs compare the
+# three sections separately (ratios and parameters key by key, steps with
+# difflib) and skip sections that are equal.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipe_objects (
+    hash TEXT PRIMARY KEY,
+    body TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS recipe_versions (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    hash TEXT NOT NULL REFERENCES recipe_objects(hash),
+    saved_at TEXT NOT NULL,
+    note TEXT
+);
+CREATE TABLE IF NOT EXISTS batch_recipes (
+    batch_id INTEGER PRIMARY KEY REFERENCES batches(id),
+    hash TEXT NOT NULL REFERENCES recipe_objects(hash)
+);
+CREATE INDEX IF NOT EXISTS recipe_versions_name ON recipe_versions (name, id);
+"""
+
+# Significant digits kept of every ratio, so 1/4+1/8 always hashes the same
+RATIO_DIGITS = 12
+
+
+def canonical_recipe(recipe):
+    """Recipe as a canonical dict: name, ingredient ratios per litre, parameters and steps"""
+    recipe = flat_recipe(recipe)
+    milk = recipe["milk"]
+    return {
+        "name": recipe["name"],
+        "ratios": {key: float(f"{value / milk:.{RATIO_DIGITS}g}") for key, value in sorted(recipe.items())
+                   if key not in NOT_INGREDIENTS},
+        "params": {key: recipe[key] for key in sorted(recipe)
+                   if key in NOT_INGREDIENTS and key not in ("name", "milk", "receta")},
+        "steps": [line.strip() for line in recipe.get("receta", "").splitlines() if line.strip()],
+    }
+
+
+def encode(canonical):
+    """Canonical JSON text of a canonical recipe and its SHA-256"""
+    body = json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return body, hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def diff_versions(old, new):
+    """
+    Structural diff of two canonical recipes
+
+    Returns a list of (section, key, old value, new value); ingredients and
+    parameters missing on one side show None, changed steps are (first line
+    number, old lines, new lines).
+    """
+    changes = []
+    for section in ("ratios", "params"):
+        if old[section] == new[section]:
+            continue
+        for key in sorted(old[section].keys() | new[section].keys()):
+            before, after = old[section].get(key), new[section].get(key)
+            if before != after:
+                changes.append((section, key, before, after))
+    if old["steps"] != new["steps"]:
+        matcher = difflib.SequenceMatcher(None, old["steps"], new["steps"], autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag != "equal":
+                changes.append(("steps", i1 + 1, old["steps"][i1:i2], new["steps"][j1:j2]))
+    return changes
+
+
+class RecipeStore:
+    """Content-addressed recipe versions kept in the make log"""
+
+    def __init__(self, log):
+        self.log = log
+        self.db = log.db
+        self.db.executescript(SCHEMA)
+        for table in ("recipe_objects", "recipe_versions", "batch_recipes"):
+            self.db.executescript(APPEND_ONLY.format(table=table))
+        self.cache = {}
+
+    def save(self, recipe, note=None, saved_at=None):
+        """
+        Store a recipe and return its hash
+
+        A new version row is only added when the recipe differs from the last
+        saved version of the same name.
+        """
+        canonical = canonical_recipe(recipe)
+        body, digest = encode(canonical)
+        self.db.execute("INSERT OR IGNORE INTO recipe_objects (hash, body) VALUES (?, ?)", (digest, body))
+        last = self.db.execute("SELECT hash FROM recipe_versions WHERE name = ? ORDER BY id DESC LIMIT 1",
+                               (canonical["name"],)).fetchone()
+        if last is None or last[0] != digest:
+            self.db.execute("INSERT INTO recipe_versions (name, hash, saved_at, note) VALUES (?, ?, ?, ?)",
+                            (canonical["name"], digest,
+                             (saved_at or datetime.now()).isoformat(timespec="seconds"), note))
+        self.log.commit()
+        self.cache[digest] = canonical
+        return digest
+
+    def link_batch(self, batch_id, digest):
+        """Record that batch batch_id was made with recipe version digest"""
+        self.db.execute("INSERT INTO batch_recipes (batch_id, hash) VALUES (?, ?)", (batch_id, digest))
+        self.log.commit()
+
+    def batch_version(self, batch_id):
+        """Hash of the recipe version used by a batch, or None"""
+        row = self.db.execute("SELECT hash FROM batch_recipes WHERE batch_id = ?", (batch_id,)).fetchone()
+        return row and row[0]
+
+    def get(self, digest):
+        """Canonical recipe of a version"""
+        if digest not in self.cache:
+            row = self.db.execute("SELECT body FROM recipe_objects WHERE hash = ?", (digest,)).fetchone()
+            if row is None:
+                raise KeyError(f"No hay version {digest}")
+            self.cache[digest] = json.loads(row[0])
+        return self.cache[digest]
+
+    def resolve(self, prefix):
+        """Full hash of a version from a unique prefix"""
+        rows = self.db.execute("SELECT hash FROM recipe_objects WHERE hash >= ? AND hash < ? LIMIT 2",
+                               (prefix, prefix + "g")).fetchall()
+        if len(rows) != 1:
+            raise KeyError(f"Version '{prefix}' " + ("ambigua" if rows else "desconocida"))
+        return rows[0][0]
+
+    def versions(self, name):
+        """(id, hash, saved_at, note) of every saved version of a recipe, oldest first"""
+        return self.db.execute("SELECT id, hash, saved_at, note FROM recipe_versions WHERE name = ? ORDER BY id",
+                               (name,)).fetchall()
+
+    def diff(self, old, new):
+        if old == new:
+            return []
+        return diff_versions(self.get(old), self.get(new))
+
+
+def _literal(node):
+    """Value of a literal expression, allowing arithmetic such as 1/4+1/8"""
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Dict):
+        return {_literal(key): _literal(value) for key, value in zip(node.keys, node.values)}
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        value = _literal(node.operand)
+        return -value if isinstance(node.op, ast.USub) else value
+    operators = {ast.Add: lambda a, b: a + b, ast.Sub: lambda a, b: a - b,
+                 ast.Mult: lambda a, b: a * b, ast.Div: lambda a, b: a / b}
+    if isinstance(node, ast.BinOp) and type(node.op) in operators:
+        return operators[type(node.op)](_literal(node.left), _literal(node.right))
+    raise ValueError(f"no es un literal: {ast.dump(node)[:40]}")
+
+
+def recipes_in_file(path):
+    """Recipe dicts assigned at the top level of a Python file (or backup), without running it"""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    recipes = []
+    for node in tree.body:
+        if not (isinstance(node, ast.Assign) and isinstance(node.value, ast.Dict)):
+            continue
+        try:
+            recipe = flat_recipe(_literal(node.value))
+        except (ValueError, TypeError, ZeroDivisionError):
+            continue
+        if "name" in recipe and "milk" in recipe:
+            recipes.append(recipe)
+    return recipes
+
+
+def format_value(value):
+    if value is None:
+        return "-"
+    return f"{value:.6g}" if isinstance(value, float) else str(value)
+
+
+def print_diff(changes):
+    for section, key, before, after in changes:
+        if section == "ratios":
+            print(f"    {key:<15} {format_value(before)} -> {format_value(after)} tsp/litro")
+        elif section == "params":
+            print(f"    {key:<15} {format_value(before)} -> {format_value(after)}")
+        else:
+            for line in before:
+                print(f"    paso - {line}")
+            for line in after:
+                print(f"    paso + {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Versiones de las recetas de queso")
+    parser.add_argument("--log", default=DEFAULT_LOG, help="Bitacora de elaboracion (default: ~/.quesos/bitacora.sqlite)")
+    parser.add_argument("--guardar", action="store_true", help="Guardar las recetas actuales de scaleIngredientes.py")
+    parser.add_argument("--importar", nargs="+", metavar="ARCHIVO",
+                        help="Guardar las recetas de archivos .py o respaldos .py~ (por fecha del archivo)")
+    parser.add_argument("--historial", metavar="QUESO", help="Versiones de una receta y sus cambios")
+    parser.add_argument("--diff", nargs=2, metavar=("VIEJA", "NUEVA"), help="Diferencias entre dos versiones")
+    parser.add_argument("--elaboracion", type=int, metavar="NRO", help="Version usada en una elaboracion")
+    args = parser.parse_args()
+
+    with MakeLog(args.log) as log:
+        store = RecipeStore(log)
+        if args.importar:
+            for path in sorted(args.importar, key=os.path.getmtime):
+                saved_at = datetime.fromtimestamp(os.path.getmtime(path))
+                recipes = recipes_in_file(path)
+                if not recipes:
+                    print(f"{path}: sin recetas (diccionarios con name y milk)")
+                for recipe in recipes:
+                    digest = store.save(recipe, f"importada de {os.path.basename(path)}", saved_at)
+                    print(f"{recipe['name']:<20} {digest[:10]}  {path}")
+        if args.guardar:
+            for name, recipe in RECETAS.items():
+                print(f"{name:<20} {store.save(recipe)[:10]}")
+        if args.historial:
+            previous = None
+            for version_id, digest, saved_at, note in store.versions(args.historial):
+                print(f"{digest[:10]}  {saved_at}  {note or ''}")
+                if previous:
+                    print_diff(store.diff(previous, digest))
+                previous = digest
+        try:
+            if args.diff:
+                print_diff(store.diff(store.resolve(args.diff[0]), store.resolve(args.diff[1])))
+            if args.elaboracion is not None:
+                digest = store.batch_version(args.elaboracion)
+                if digest is None:
+                    print(f"La elaboracion {args.elaboracion} no tiene version de receta registrada")
+                else:
+                    recipe = store.get(digest)
+                    print(f"Elaboracion {args.elaboracion}: {recipe['name']} version {digest[:10]}")
+                    current = RECETAS.get(recipe["name"])
+                    if current is not None:
+                        changes = diff_versions(recipe, canonical_recipe(current))
+                        print("Cambios desde entonces:" if changes else "Igual a la receta actual")
+                        print_diff(changes)
+        except KeyError as e:
+            parser.error(e.args[0])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+import argparse
+import bisect
+import math
+from datetime import date, timedelta
+
+from scaleIngredientes import RECETAS, flat_recipe
+from stock_planner import STEP_LITERS
+
+# Planificador de sobres: freeze-dried cultures come in sachets that only last
+# a few days once opened, so how the week's milk is split and in which order
+# the cheeses are made decides how many sachets get opened and how much
+# culture is thrown away.
+#
+# python sachet_planner.py --leche 60 --quesos Camembert Camembert Manchego "Castle Blue" "Alpine Tomme" Valencay
+# python sachet_planner.py --leche 60 --quesos ... --sobre mesophilic=2:7 --abierto "Pen. C.=0.3@2025-06-01"
+#
+# One cheese per make day (consecutive days from --desde, or --fechas). The
+# plan chooses the order of the cheeses and the litres of every vat (between
+# --min-olla and --max-olla, in STEP_LITERS steps, adding up to --leche) that
+# open the fewest sachets, then waste the least culture, then keep the vats
+# closest to an even split. Open sachets are used first; a sachet past its
+# shelf life is thrown away, and whatever is still in an open sachet after the
+# last make day counts as waste too, so opening a sachet late is not free.
+#
+# The search is a depth-first branch-and-bound over (cheese, vat) per day, with
+# culture amounts as integers in 1/1024 tsp. A branch is cut when the plan so
+# far plus a lower bound for the rest reaches the best plan found: for every
+# culture, the least it can still need (every vat at its minimum, the spare
+# litres on the cheeses that use least of it) minus what the open sachet holds;
+# with that many sachets, at least what they hold minus the most the rest can
+# use is wasted. Vats are tried at the ends of their range, the even split and
+# the sizes that just finish an open sachet.
+#
+# Memoizing on (day, cheeses left, litres left, open sachets) seldom hits, since
+# the exact remainders rarely repeat, so the bound does the pruning. A week of
+# up to 5 or 6 cheeses is searched to the end and the plan is the best one; longer
+# weeks stop at MAX_NODES and the plan is only the best found, a heuristic, and
+# the output says so.
+
+CULTURES = ("mesophilic", "thermophilic", "Pen. C.", "Geo. C.")
+# Sobres: tsp per sachet and days it lasts once opened (ajustar con --sobre)
+SOBRES = {
+    "mesophilic": (2.0, 7),
+    "thermophilic": (2.0, 7),
+    "Pen. C.": (0.5, 14),
+    "Geo. C.": (0.25, 14),
+}
+# Culture amounts are counted in 1/UNITS_PER_TSP tsp
+UNITS_PER_TSP = 1024
+# Search nodes before settling for the best plan found (a second or two)
+MAX_NODES = 3000
+
+
+def culture_needs(names, recipes=RECETAS, cultures=CULTURES):
+    """Culture use of every recipe, in units per STEP_LITERS of milk"""
+    needs = []
+    for name in names:
+        recipe = flat_recipe(recipes[name])
+        needs.append(tuple(round(recipe.get(culture, 0) / recipe["milk"] * STEP_LITERS * UNITS_PER_TSP)
+                           for culture in cultures))
+    return needs
+
+
+def use_cultures(sachets, needs, steps, day, sizes, shelf):
+    """
+    Take the cultures of one vat from the open sachets, opening new ones as needed
+
+    :param sachets: tuple of (units left, day it expires) per culture
+    :return: (new sachets tuple, sachets opened, units wasted, units taken per culture, opened per culture)
+    """
+    new, opened, wasted, taken, opened_each = [], 0, 0, [], []
+    for (left, expires), need, size, days in zip(sachets, needs, sizes, shelf):
+        if left and day >= expires:
+            wasted += left
+            left = 0
+        amount = need * steps
+        count = 0
+        if amount > left:
+            count = -(-(amount - left) // size)
+            left += count * size
+            expires = day + days
+        new.append((left - amount, expires))
+        opened += count
+        taken.append(amount)
+        opened_each.append(count)
+    return tuple(new), opened, wasted, taken, opened_each
+
+
+class SachetPlanner:
+    """Order and vat sizes of a week of cheeses that open the fewest culture sachets"""
+
+    def __init__(self, batches, milk, days, sachets=SOBRES, opened=None, min_vat=2, max_vat=20,
+                 recipes=RECETAS, max_nodes=None):
+        """
+        :param batches: recipe names to make (repeats allowed), one per make day
+        :param milk: litres of milk to split across them
+        :param days: make days as day numbers (date.toordinal()), at least one per batch
+        :param sachets: dict of culture -> (tsp per sachet, days it lasts once opened)
+        :param opened: dict of culture -> (tsp left, day number it was opened) of sachets already open
+        :param max_nodes: stop the search after this many nodes (default MAX_NODES)
+        """
+        self.names = sorted(set(batches))
+        self.counts = tuple(batches.count(name) for name in self.names)
+        self.days = sorted(days)[:len(batches)]
+        if len(self.days) < len(batches):
+            raise ValueError(f"{len(batches)} quesos y solo {len(self.days)} dias de elaboracion")
+        self.needs = culture_needs(self.names, recipes)
+        # Only the cultures these recipes use take part in the search
+        used = [i for i, culture in enumerate(CULTURES) if any(need[i] for need in self.needs)]
+        self.cultures = [CULTURES[i] for i in used]
+        self.needs = [tuple(need[i] for i in used) for need in self.needs]
+        self.sizes = [round(sachets[culture][0] * UNITS_PER_TSP) for culture in self.cultures]
+        self.shelf = [sachets[culture][1] for culture in self.cultures]
+        opened = opened or {}
+        self.start = tuple((round(opened[culture][0] * UNITS_PER_TSP), opened[culture][1] + sachets[culture][1])
+                           if culture in opened else (0, 0) for culture in self.cultures)
+        self.steps = round(milk / STEP_LITERS)
+        self.min_steps = math.ceil(min_vat / STEP_LITERS - 1e-9)
+        self.max_steps = math.floor(max_vat / STEP_LITERS + 1e-9)
+        n = len(batches)
+        if not n * self.min_steps <= self.steps <= n * self.max_steps:
+            raise ValueError(f"{milk:g} litros no entran en {n} ollas de {min_vat:g} a {max_vat:g} litros")
+        # Most make days one sachet can serve before it expires
+        self.per_sachet_days = [max(bisect.bisect_left(self.days, first + days) - i for i, first in enumerate(self.days))
+                                for days in self.shelf]
+        # Per culture, the recipes from the one that uses least of it to the one that uses most
+        self.by_need = [sorted(range(len(self.names)), key=lambda r: self.needs[r][c])
+                        for c in range(len(self.cultures))]
+        self.even = round(self.steps / n)
+        self.max_nodes = max_nodes or MAX_NODES
+        self.memo = {}
+        self.nodes = 0
+
+    def culture_use(self, c, counts, spare, order):
+        """Units of culture c the counts use with every vat at its minimum and the spare steps given in order"""
+        room = self.max_steps - self.min_steps
+        used = 0
+        for r in order:
+            count = counts[r]
+            if count:
+                filled = min(spare, count * room)
+                used += self.needs[r][c] * (count * self.min_steps + filled)
+                spare -= filled
+        return used
+
+    def lower_bound(self, k, counts, steps, sachets):
+        """
+        Least (sachets opened, units wasted, spread) from batch k on, whatever the plan
+
+        Every unit of an open sachet ends up used, expired or left over at the
+        end of the week, so a plan that opens only the sachets counted here
+        wastes at least what is open plus those sachets minus the most the
+        rest of the cheeses can use.
+        """
+        left = len(self.days) - k
+        if not left:
+            return 0, sum(units for units, _ in sachets), 0
+        day = self.days[k]
+        spare = steps - left * self.min_steps
+        bound, waste = 0, 0
+        for c, (size, (units, expires)) in enumerate(zip(self.sizes, sachets)):
+            # Least culture the rest can use: the spare litres on the cheeses that use least of it
+            need = self.culture_use(c, counts, spare, self.by_need[c])
+            batches = sum(count for r, count in enumerate(counts) if self.needs[r][c])
+            available = units
+            if expires <= day:
+                available = 0
+            elif units:
+                # The open sachet serves the days before it expires
+                batches -= bisect.bisect_left(self.days, expires, k) - k
+            by_amount = -(-(need - available) // size) if need > available else 0
+            # Every new sachet serves at most per_sachet_days make days
+            by_days = -(-batches // self.per_sachet_days[c]) if batches > 0 else 0
+            opened = max(by_amount, by_days)
+            bound += opened
+            # Most it can use: the spare litres on the cheeses that use most of it
+            waste += max(units + opened * size - self.culture_use(c, counts, spare, reversed(self.by_need[c])), 0)
+        # sum |n * vat - milk| >= |n * steps left - batches left * milk|
+        return bound, waste, abs(len(self.days) * steps - left * self.steps)
+
+    def vat_options(self, recipe, left, steps, sachets):
+        """Vat sizes (in steps) worth trying for recipe as the next of left cheeses"""
+        after = left - 1
+        if after == 0:
+            return [steps]
+        low = max(self.min_steps, steps - after * self.max_steps)
+        high = min(self.max_steps, steps - after * self.min_steps)
+        options = {low, high, min(max(self.even, low), high), min(max(round(steps / left), low), high)}
+        for per_step, (units, _), size in zip(self.needs[recipe], sachets, self.sizes):
+            if per_step:
+                # Largest vats the open sachet covers alone and with one new sachet
+                for available in (units, units + size):
+                    fits = available // per_step
+                    if low <= fits <= high:
+                        options.add(fits)
+        return options
+
+    def solve(self, k, counts, steps, sachets, limit):
+        """
+        Lowest (sachets opened, units wasted, spread) from batch k on, if below limit
+
+        spread is the sum of |n * vat - milk| in steps over the n batches, how
+        far the vats are from an even split. Returns (cost, plan) with plan a
+        linked tuple ((recipe, vat steps), rest of the plan); when no plan below
+        limit exists, (a lower bound at least limit, None).
+        """
+        if k == len(self.days):
+            # What is left in the open sachets at the end of the week is wasted too
+            return (0, sum(units for units, _ in sachets), 0), ()
+        key = (k, counts, steps, sachets)
+        known = self.memo.get(key)
+        if known is not None and (known[1] is not None or known[0] >= limit):
+            return known
+        self.nodes += 1
+        bound = self.lower_bound(k, counts, steps, sachets)
+        # Past max_nodes only the first plan is still completed
+        if bound >= limit or (self.nodes > self.max_nodes and limit[0] < math.inf):
+            return max(bound, limit), None
+
+        day = self.days[k]
+        children = []
+        for r, count in enumerate(counts):
+            if not count:
+                continue
+            rest = counts[:r] + (count - 1,) + counts[r + 1:]
+            for vat in self.vat_options(r, len(self.days) - k, steps, sachets):
+                after, opened, wasted, _, _ = use_cultures(sachets, self.needs[r], vat, day, self.sizes, self.shelf)
+                spread = abs(len(self.days) * vat - self.steps)
+                tail = self.lower_bound(k + 1, rest, steps - vat, after)
+                children.append(((opened + tail[0], wasted + tail[1], spread + tail[2]),
+                                 opened, wasted, spread, r, vat, rest, after))
+        # Most promising first, so a good plan bounds the rest early
+        children.sort(key=lambda child: child[0])
+
+        best, best_plan = limit, None
+        for child_bound, opened, wasted, spread, r, vat, rest, after in children:
+            if child_bound >= best:
+                break
+            tail, plan = self.solve(k + 1, rest, steps - vat, after,
+                                    (best[0] - opened, best[1] - wasted, best[2] - spread))
+            cost = (opened + tail[0], wasted + tail[1], spread + tail[2])
+            if plan is not None and cost < best:
+                best, best_plan = cost, ((r, vat), plan)
+        if self.nodes <= self.max_nodes:
+            # Only searches that ran to the end are remembered
+            self.memo[key] = (best, best_plan)
+        return best, best_plan
+
+    def evaluate(self, order, vats):
+        """Batches, totals and open sachets of a given order (recipe names) and vats (litres)"""
+        sachets, rows = self.start, []
+        opened_total = [0] * len(self.cultures)
+        wasted_total = [0] * len(self.cultures)
+        for day, name, litres in zip(self.days, order, vats):
+            r = self.names.index(name)
+            before = sachets
+            sachets, _, _, taken, opened = use_cultures(sachets, self.needs[r], round(litres / STEP_LITERS), day,
+                                                        self.sizes, self.shelf)
+            for c, ((left, expires), count) in enumerate(zip(before, opened)):
+                opened_total[c] += count
+                if left and day >= expires:
+                    wasted_total[c] += left
+            rows.append((day, name, litres, {culture: (amount / UNITS_PER_TSP, count) for culture, amount, count
+                                             in zip(self.cultures, taken, opened) if amount}))
+        totals = {culture: (opened_total[c], wasted_total[c] / UNITS_PER_TSP) for c, culture in enumerate(self.cultures)}
+        still_open = {culture: (left / UNITS_PER_TSP, expires) for culture, (left, expires) in zip(self.cultures, sachets)
+                      if left}
+        return rows, totals, still_open
+
+    def plan(self):
+        """
+        Best order and vats: (list of recipe names, list of litres, proven)
+
+        proven is False when the search stopped at max_nodes; the plan is then
+        the best one found, not necessarily the best there is.
+        """
+        _, plan = self.solve(0, self.counts, self.steps, self.start, (math.inf, math.inf, math.inf))
+        order, vats = [], []
+        while plan:
+            (r, vat), plan = plan
+            order.append(self.names[r])
+            vats.append(vat * STEP_LITERS)
+        return order, vats, self.nodes <= self.max_nodes
+
+
+def even_vats(milk, n):
+    """milk split in n vats of whole STEP_LITERS steps, as even as possible"""
+    steps = round(milk / STEP_LITERS)
+    return [(steps // n + (i < steps % n)) * STEP_LITERS for i in range(n)]
+
+
+def parse_sachets(values):
+    """Turn ["mesophilic=2:7", ...] into {"mesophilic": (2.0, 7), ...}"""
+    sachets = dict(SOBRES)
+    for value in values:
+        name, sep, spec = value.partition("=")
+        size, colon, days = spec.partition(":")
+        try:
+            if not sep or not colon or name.strip() not in CULTURES:
+                raise ValueError
+            sachets[name.strip()] = (float(size), int(days))
+        except ValueError:
+            raise ValueError(f"Sobre invalido '{value}', usar cultivo=tsp:dias ({', '.join(CULTURES)})")
+    return sachets
+
+
+def parse_opened(values):
+    """Turn ["Pen. C.=0.3@2025-06-01", ...] into {"Pen. C.": (0.3, day number), ...}"""
+    opened = {}
+    for value in values:
+        name, sep, spec = value.partition("=")
+        amount, at, when = spec.partition("@")
+        try:
+            if not sep or not at or name.strip() not in CULTURES:
+                raise ValueError
+            opened[name.strip()] = (float(amount), date.fromisoformat(when.strip()).toordinal())
+        except ValueError:
+            raise ValueError(f"Sobre abierto invalido '{value}', usar cultivo=tsp@AAAA-MM-DD")
+    return opened
+
+
+def print_plan(planner, rows, totals, still_open, title):
+    print("-" * 100)
+    print(title)
+    print("-" * 100)
+    print("{:<12} {:<20} {:<8} {}".format("Fecha", "Queso", "Litros", "Cultivos (tsp, * = sobre nuevo)"))
+    for day, name, litres, cultures in rows:
+        used = ", ".join(f"{culture} {amount:.3f}" + "*" * count for culture, (amount, count) in cultures.items())
+        print("{:<12} {:<20} {:<8.1f} {}".format(date.fromordinal(day).isoformat(), name, litres, used))
+    opened = sum(count for count, _ in totals.values())
+    print(f"Sobres abiertos: {opened} (" + ", ".join(f"{culture} {count}" for culture, (count, _) in totals.items())
+          + ")")
+    wasted = [f"{culture} {amount:.3f} tsp" for culture, (_, amount) in totals.items() if amount]
+    print("Vencido sin usar: " + (", ".join(wasted) if wasted else "nada"))
+    for culture, (amount, expires) in still_open.items():
+        print(f"Queda abierto: {culture} {amount:.3f} tsp, vence {date.fromordinal(expires).isoformat()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan de la semana que abre la menor cantidad de sobres de cultivo")
+    parser.add_argument("--quesos", nargs="+", required=True, choices=sorted(RECETAS), metavar="QUESO",
+                        help="Quesos a hacer, uno por dia (repetir para hacer varios)")
+    parser.add_argument("--leche", type=float, required=True, help="Litros de leche a repartir en la semana")
+    parser.add_argument("--desde", default=date.today().isoformat(), help="Primer dia de elaboracion (default: hoy)")
+    parser.add_argument("--fechas", nargs="+", metavar="AAAA-MM-DD",
+                        help="Dias de elaboracion (default: dias seguidos desde --desde)")
+    parser.add_argument("--min-olla", type=float, default=2, help="Minimo de litros por olla (default: 2)")
+    parser.add_argument("--max-olla", type=float, default=20, help="Maximo de litros de la olla (default: 20)")
+    parser.add_argument("--sobre", nargs="+", default=[], metavar="CULTIVO=TSP:DIAS",
+                        help="Tamano del sobre y dias que dura abierto, ej. mesophilic=2:7")
+    parser.add_argument("--abierto", nargs="+", default=[], metavar="CULTIVO=TSP@FECHA",
+                        help="Sobre ya abierto: lo que queda y cuando se abrio, ej. \"Pen. C.=0.3@2025-06-01\"")
+    args = parser.parse_args()
+
+    try:
+        sachets = parse_sachets(args.sobre)
+        opened = parse_opened(args.abierto)
+        if args.fechas:
+            days = sorted(date.fromisoformat(value).toordinal() for value in args.fechas)
+        else:
+            first = date.fromisoformat(args.desde)
+            days = [(first + timedelta(days=i)).toordinal() for i in range(len(args.quesos))]
+        planner = SachetPlanner(args.quesos, args.leche, days, sachets, opened, args.min_olla, args.max_olla)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print_plan(planner, *planner.evaluate(args.quesos, even_vats(args.leche, len(args.quesos))),
+               "SIN PLANIFICAR (orden dado, ollas iguales)")
+    order, vats, proven = planner.plan()
+    print_plan(planner, *planner.evaluate(order, vats), "PLAN")
+    print(f"({planner.nodes} nodos" + (")" if proven else ", busqueda cortada: el mejor plan encontrado)"))
+    print("-" * 100)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,12 @@
+import argparse
+
+from make_log import DEFAULT_LOG, MakeLog, parse_lots
+
+
+# Recipe keys that are not ingredients
+NOT_INGREDIENTS = ('name', 'milk', 'html', 'receta', 'floculacion')
+
+
 def scale_ingredients(milk_amount_liters, original_ingredients):
     """
     Scale the ingredients based on the amount of milk used and express them as combinations
@@ -14,7 +23,7 @@ def scale_ingredients(milk_amount_liters, original_ingredients):
 
     scaled_ingredients = {}
     for ingredient, amount in original_ingredients.items():
-        if ingredient=='name' or ingredient=='milk' or ingredient=='html' or ingredient=='receta':
+        if ingredient in NOT_INGREDIENTS:
             continue
         # Scale the ingredient amount
         scaled_amount = amount * milk_amount_liters / original_ingredients["milk"]
@@ -59,20 +68,22 @@ def scale_ingredients(milk_amount_liters, original_ingredients):
 ####################################################################################
 
 # Example usage
-# original_ingredients = {
-#     "name":"Camembert",  # vaca o cabra
-#     "milk":10, # Litros de leche
-#     "mesophilic": 1/4+1/16,   # 1/2 tsp
-#     "Pen. C.": 1/8+1/32,      # 1/4 tsp
-#     "Geo. C.": 1/16+1/64,     # 1/8 tsp
-#     "Rennet": 1/2,            # 1/16 tsp
-#     "CaCl": 1/4+1/8,          # 1/32 tsp
-# }
+Camembert = {
+    "name":"Camembert",  # vaca o cabra
+    "milk":10, # Litros de leche
+    "floculacion": 6, # Cortar a 6 veces el tiempo de floculacion
+    "mesophilic": 1/4+1/16,   # 1/2 tsp
+    "Pen. C.": 1/8+1/32,      # 1/4 tsp
+    "Geo. C.": 1/16+1/64,     # 1/8 tsp
+    "Rennet": 1/2,            # 1/16 tsp
+    "CaCl": 1/4+1/8,          # 1/32 tsp
+}
 
-original_ingredients = {
+AlpineTomme = {
     "html":"https://cheesemaking.com/products/alpine-tomme-recipe",
     "name":"Alpine Tomme",  # vaca o cabra
     "milk":8, # Litros de leche
+    "floculacion": 3, # Cortar a 3 veces el tiempo de floculacion
 #    "mesophilic": 1/16,        # 1/2 tsp
     "thermophilic": 1/4,        # 1/2 tsp
     "Rennet":  1/4+1/8,            # 1/16 tsp
@@ -84,6 +95,7 @@ BlueCastle = {
     "datos":{
         "html":"https://www.youtube.com/watch?v=a_PeXcz4W8A&t=1064s",
         "name":"Castle Blue",  # vaca
+        "floculacion": 4, # Esperar 4 veces el tiempo de floculacion
         "receta": """
         1- Calentar leche a 32°C
         2- Agregar cultivos, esperar 5m, revolver
@@ -115,6 +127,7 @@ BlueCastle = {
 original_ingredients = {
     "html":"https://www.youtube.com/watch?v=a_PeXcz4W8A&t=1064s",
     "name":"Castle Blue",  # vaca
+    "floculacion": 4, # Esperar 4 veces el tiempo de floculacion
     "receta": """
     1- Calentar leche a 32°C
     2- Agregar cultivos, esperar 5m, revolver
@@ -138,71 +151,126 @@ original_ingredients = {
 }
 
 
-# original_ingredients = {
-#     "name":"Manchego",  # vaca o cabra
-#     "milk":8, # Litros de leche
-#     "mesophilic": 1/16,        # 1/2 tsp
-#     "thermophilic": 1/16,        # 1/2 tsp
+Manchego = {
+    "name":"Manchego",  # vaca o cabra
+    "milk":8, # Litros de leche
+    "floculacion": 3, # Cortar a 3 veces el tiempo de floculacion
+    "mesophilic": 1/16,        # 1/2 tsp
+    "thermophilic": 1/16,        # 1/2 tsp
     
-#     #    "Pen. C.": 1/8+1/32,      # 1/4 tsp
-# #    "Geo. C.": 1/16+1/64,     # 1/8 tsp
-#     "Rennet":  1/2,            # 1/16 tsp
-#     "CaCl":    1,            # 1/32 tsp
-# }
-
-# original_ingredients = {
-#     "name":"DoubleGloucester",  # vaca o cabra
-#     "milk":12, # Litros de leche
-#     "mesophilic": 3/8,        # 1/2 tsp
-# #    "Pen. C.": 1/8+1/32,      # 1/4 tsp
-# #    "Geo. C.": 1/16+1/64,     # 1/8 tsp
-#     "Rennet":  3/4,            # 1/16 tsp
-#     "CaCl":    3/4,            # 1/32 tsp
-# }
-
-# original_ingredients = {
-#     "name":"Valencay", #  cabra
-#     "milk":8, # Litros de leche
-#     "mesophilic": 1/8,   # 1/2 tsp
-#     "Pen. C.": 1/16,      # 1/4 tsp
-#     "Geo. C.": 1/64,     # 1/8 tsp
-#     "Rennet": 1/4+1/8,            # 1/16 tsp
-#     "CaCl": 1/2,          # 1/32 tsp
-# }
-
-# original_ingredients = {
-#     "name":"Valencay 2",  #  cabra
-#     "milk": 4           , # Litros en la receta
-#     "mesophilic": 1/4,    #  tsp
-#     "Pen. C.": 1/8,      #  tsp
-#     "Geo. C.": 1/64,      #  tsp
-#     "Rennet": 1/4,    #  tsp
-#     "CaCl": 1/4,          #  tsp
-# }
+    #    "Pen. C.": 1/8+1/32,      # 1/4 tsp
+#    "Geo. C.": 1/16+1/64,     # 1/8 tsp
+    "Rennet":  1/2,            # 1/16 tsp
+    "CaCl":    1,            # 1/32 tsp
+}
+
+DoubleGloucester = {
+    "name":"DoubleGloucester",  # vaca o cabra
+    "milk":12, # Litros de leche
+    "floculacion": 3, # Cortar a 3 veces el tiempo de floculacion
+    "mesophilic": 3/8,        # 1/2 tsp
+#    "Pen. C.": 1/8+1/32,      # 1/4 tsp
+#    "Geo. C.": 1/16+1/64,     # 1/8 tsp
+    "Rennet":  3/4,            # 1/16 tsp
+    "CaCl":    3/4,            # 1/32 tsp
+}
+
+Valencay = {
+    "name":"Valencay", #  cabra
+    "milk":8, # Litros de leche
+    "floculacion": 6, # Cortar a 6 veces el tiempo de floculacion
+    "mesophilic": 1/8,   # 1/2 tsp
+    "Pen. C.": 1/16,      # 1/4 tsp
+    "Geo. C.": 1/64,     # 1/8 tsp
+    "Rennet": 1/4+1/8,            # 1/16 tsp
+    "CaCl": 1/2,          # 1/32 tsp
+}
+
+Valencay2 = {
+    "name":"Valencay 2",  #  cabra
+    "milk": 4           , # Litros en la receta
+    "floculacion": 6,     # Cortar a 6 veces el tiempo de floculacion
+    "mesophilic": 1/4,    #  tsp
+    "Pen. C.": 1/8,      #  tsp
+    "Geo. C.": 1/64,      #  tsp
+    "Rennet": 1/4,    #  tsp
+    "CaCl": 1/4,          #  tsp
+}
+
+
+def flat_recipe(recipe):
+    """Recipes like BlueCastle keep "datos" and "ingredients" apart; return one flat dict"""
+    if "ingredients" in recipe:
+        return {**recipe.get("datos", {}), **recipe["ingredients"]}
+    return recipe
+
+
+# Catalogo de recetas por nombre
+RECETAS = {recipe["name"]: recipe for recipe in
+           (Camembert, AlpineTomme, original_ingredients, Manchego, DoubleGloucester, Valencay, Valencay2)}
 
 
 queso=BlueCastle
-# Amount of milk you want to use (in liters)
-milk_amount_liters = 8  # Example: 2.5 liters of milk
-
-# Scale the ingredients
-scaled_ingredients = scale_ingredients(milk_amount_liters, original_ingredients)
-
-# Print the scaled ingredients in a well-tabulated format
-print("-" * 100)
-print("Receta para {} litros de leche de queso \"{}\"".format(milk_amount_liters,original_ingredients["name"]))
-print("-" * 100)
-print("{:<15} {:<60} {:<20}".format("Ingredient", "Scaled Amount", "Remainder (1/256 tsp)"))
-print("-" * 100)
-for ingredient, data in scaled_ingredients.items():
-    #if ingredient=='milk':
-    #    continue
-        #print("{:<15} {:<40} {:<20.2f}".format(ingredient, data["combination"], data["remainder_256"]))
-    print("{:<15} {:<60} {:<20.2f}".format(ingredient, data["combination"], data["remainder_256"]))
-
-print("-" * 100)
-print("RECETA")
-print("-" * 100)
-   
-print("{}".format(original_ingredients["receta"]))
-print("-" * 100)
+
+
+def print_batch_sheet(milk_amount_liters, original_ingredients, scaled_ingredients):
+    # Print the scaled ingredients in a well-tabulated format
+    print("-" * 100)
+    print("Receta para {} litros de leche de queso \"{}\"".format(milk_amount_liters,original_ingredients["name"]))
+    print("-" * 100)
+    print("{:<15} {:<60} {:<20}".format("Ingredient", "Scaled Amount", "Remainder (1/256 tsp)"))
+    print("-" * 100)
+    for ingredient, data in scaled_ingredients.items():
+        #if ingredient=='milk':
+        #    continue
+            #print("{:<15} {:<40} {:<20.2f}".format(ingredient, data["combination"], data["remainder_256"]))
+        print("{:<15} {:<60} {:<20.2f}".format(ingredient, data["combination"], data["remainder_256"]))
+
+    print("-" * 100)
+    print("RECETA")
+    print("-" * 100)
+
+    print("{}".format(original_ingredients.get("receta", "")))
+    print("-" * 100)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Escalar una receta de queso y registrar la elaboracion")
+    # Amount of milk you want to use (in liters)
+    parser.add_argument("--queso", choices=sorted(RECETAS), default=original_ingredients["name"],
+                        help="Receta a escalar (default: Castle Blue)")
+    parser.add_argument("--litros", type=float, default=8, help="Litros de leche (default: 8)")
+    parser.add_argument("--lote", action="append", metavar="INGREDIENTE=LOTE",
+                        help="Lote usado de un ingrediente, ej. --lote mesophilic=MM100-2405 (repetible)")
+    parser.add_argument("--rueda", action="append", default=[], help="Etiqueta de una rueda hecha (repetible)")
+    parser.add_argument("--notas", help="Notas de la elaboracion")
+    parser.add_argument("--log", default=DEFAULT_LOG, help="Bitacora de elaboracion (default: ~/.quesos/bitacora.sqlite)")
+    parser.add_argument("--sin-log", action="store_true", help="Solo mostrar la receta, sin registrarla")
+    args = parser.parse_args()
+
+    milk_amount_liters = args.litros
+    recipe = RECETAS[args.queso]
+
+    # Scale the ingredients
+    scaled_ingredients = scale_ingredients(milk_amount_liters, recipe)
+    print_batch_sheet(milk_amount_liters, recipe, scaled_ingredients)
+
+    # Record the batch in the make log
+    if not args.sin_log:
+        try:
+            lots = parse_lots(args.lote)
+        except ValueError as e:
+            parser.error(str(e))
+        # recipe_store imports this module, so it is imported here
+        from recipe_store import RecipeStore
+        with MakeLog(args.log) as log:
+            batch_id = log.record(recipe, milk_amount_liters, scaled_ingredients, lots,
+                                  args.rueda, args.notas)
+            recipes = RecipeStore(log)
+            version = recipes.save(recipe)
+            recipes.link_batch(batch_id, version)
+        print(f"Elaboracion registrada con numero {batch_id} en {args.log}, receta version {version[:10]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import argparse
+
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, linprog, milp
+
+from scaleIngredientes import NOT_INGREDIENTS, RECETAS, flat_recipe
+
+# Planificador de stock: the reverse of scale_ingredients. Given what is left
+# of each culture, rennet and CaCl (in tsp), how many litres of each recipe
+# can be made, and which mix of recipes uses the stock best.
+#
+# python stock_planner.py --stock mesophilic=1.5 Rennet=3 CaCl=4 "Pen. C.=0.25" "Geo. C.=0.1" --leche 40
+#
+# Every recipe in the catalogue becomes a row of tsp-per-litre ratios, so the
+# largest vat of each recipe is one vectorized min over ingredients. The mix
+# is a small integer program (scipy milp): litres in steps of STEP_LITERS, each
+# recipe either not made or made between --min-olla and --max-olla litres,
+# total ingredient use within stock.
+
+# Vat sizes are planned in steps of this many litres
+STEP_LITERS = 0.5
+
+
+def ratio_matrix(recipes=RECETAS):
+    """Recipe names, ingredient names and the (recipes x ingredients) tsp-per-litre matrix"""
+    flat = [flat_recipe(recipe) for recipe in recipes.values()]
+    names = [recipe["name"] for recipe in flat]
+    ingredients = sorted({key for recipe in flat for key in recipe if key not in NOT_INGREDIENTS})
+    ratios = np.array([[recipe.get(ingredient, 0) / recipe["milk"] for ingredient in ingredients]
+                       for recipe in flat])
+    return names, ingredients, ratios
+
+
+def stock_vector(stock, ingredients):
+    """Stock dict (tsp per ingredient) as a vector in ingredient order; missing means none left"""
+    return np.array([float(stock.get(ingredient, 0)) for ingredient in ingredients])
+
+
+def max_batches(stock, recipes=RECETAS, milk=None, max_vat=None):
+    """
+    Largest vat of every recipe the stock allows, on its own
+
+    Returns a list of (name, litres, limiting ingredient).
+    """
+    names, ingredients, ratios = ratio_matrix(recipes)
+    available = stock_vector(stock, ingredients)
+    with np.errstate(divide="ignore"):
+        limits = np.where(ratios > 0, available / np.where(ratios > 0, ratios, 1), np.inf)
+    liters = limits.min(axis=1)
+    limiting = [ingredients[i] for i in limits.argmin(axis=1)]
+    for cap, label in ((milk, "leche"), (max_vat, "olla")):
+        if cap is not None:
+            limiting = [label if cap < value else name for value, name in zip(liters, limiting)]
+            liters = np.minimum(liters, cap)
+    return list(zip(names, liters, limiting))
+
+
+def plan_mix(stock, recipes=RECETAS, milk=None, min_vat=2, max_vat=20, values=None, integer=True):
+    """
+    Mix of recipes that makes the most litres (weighted by values) from the stock
+
+    :param stock: dict of ingredient -> tsp left
+    :param milk: litres of milk available (default: unlimited)
+    :param min_vat, max_vat: smallest and largest vat worth making of a recipe
+    :param values: optional dict of recipe name -> value per litre (default 1)
+    :param integer: whole STEP_LITERS steps and real min/max vat choices (milp);
+                    False solves the plain LP relaxation instead
+    :return: (dict of recipe name -> litres, dict of ingredient -> tsp left over)
+    """
+    names, ingredients, ratios = ratio_matrix(recipes)
+    available = stock_vector(stock, ingredients)
+    values = values or {}
+    weight = np.array([values.get(name, 1.0) for name in names])
+    n = len(names)
+
+    if not integer:
+        a_ub, b_ub = [ratios.T], [available]
+        if milk is not None:
+            a_ub.append(np.ones((1, n)))
+            b_ub.append([milk])
+        result = linprog(-weight, A_ub=np.vstack(a_ub), b_ub=np.concatenate(b_ub), bounds=(0, max_vat))
+        liters = result.x if result.success else np.zeros(n)
+    else:
+        # Variables: steps of STEP_LITERS per recipe, then one "make it" binary per recipe
+        cost = np.concatenate([-weight * STEP_LITERS, np.zeros(n)])
+        rows = [LinearConstraint(np.hstack([ratios.T * STEP_LITERS, np.zeros((len(ingredients), n))]),
+                                 -np.inf, available),
+                # min_vat * made <= litres <= max_vat * made
+                LinearConstraint(np.hstack([np.eye(n) * STEP_LITERS, -np.eye(n) * max_vat]), -np.inf, 0),
+                LinearConstraint(np.hstack([np.eye(n) * STEP_LITERS, -np.eye(n) * min_vat]), 0, np.inf)]
+        if milk is not None:
+            rows.append(LinearConstraint(np.concatenate([np.full(n, STEP_LITERS), np.zeros(n)]), 0, milk))
+        upper = np.concatenate([np.full(n, np.floor(max_vat / STEP_LITERS)), np.ones(n)])
+        result = milp(cost, constraints=rows, integrality=np.ones(2 * n), bounds=Bounds(0, upper))
+        liters = result.x[:n] * STEP_LITERS if result.success else np.zeros(n)
+
+    liters = np.round(liters, 6)
+    leftover = available - ratios.T @ liters
+    plan = {name: float(value) for name, value in zip(names, liters) if value > 0}
+    return plan, {ingredient: float(value) for ingredient, value in zip(ingredients, leftover)}
+
+
+def parse_amounts(values):
+    """Turn ["mesophilic=1.5", ...] into {"mesophilic": 1.5, ...}"""
+    amounts = {}
+    for value in values:
+        name, sep, amount = value.partition("=")
+        try:
+            if not sep or not name.strip():
+                raise ValueError
+            amounts[name.strip()] = float(amount)
+        except ValueError:
+            raise ValueError(f"Valor invalido '{value}', usar nombre=numero")
+    return amounts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cuanto queso se puede hacer con el stock que queda")
+    parser.add_argument("--stock", nargs="+", required=True, metavar="INGREDIENTE=TSP",
+                        help="Stock restante en tsp, ej. mesophilic=1.5 Rennet=3 CaCl=4")
+    parser.add_argument("--leche", type=float, help="Litros de leche disponibles (default: sin limite)")
+    parser.add_argument("--min-olla", type=float, default=2, help="Minimo de litros por receta (default: 2)")
+    parser.add_argument("--max-olla", type=float, default=20, help="Maximo de litros de la olla (default: 20)")
+    parser.add_argument("--valor", nargs="+", default=[], metavar="QUESO=PESO",
+                        help="Peso por litro de cada queso en el plan (default: 1)")
+    parser.add_argument("--lp", action="store_true", help="Resolver la relajacion lineal (litros continuos)")
+    args = parser.parse_args()
+
+    try:
+        stock = parse_amounts(args.stock)
+        values = parse_amounts(args.valor)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print("-" * 100)
+    print("{:<20} {:<15} {:<20}".format("Queso", "Max litros", "Limitado por"))
+    print("-" * 100)
+    for name, liters, limiting in max_batches(stock, milk=args.leche, max_vat=args.max_olla):
+        print("{:<20} {:<15.2f} {:<20}".format(name, liters, limiting))
+
+    plan, leftover = plan_mix(stock, milk=args.leche, min_vat=args.min_olla, max_vat=args.max_olla,
+                              values=values, integer=not args.lp)
+    print("-" * 100)
+    print("PLAN")
+    print("-" * 100)
+    for name, liters in plan.items():
+        print("{:<20} {:.1f} litros".format(name, liters))
+    print("Total: {:.1f} litros".format(sum(plan.values())))
+    print("Sobra: " + ", ".join(f"{ingredient} {value:.3f} tsp" for ingredient, value in leftover.items()))
+    print("-" * 100)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+import random
+
+from flocculation import WARMUP_READINGS, FlocculationDetector
+
+
+def detect(change, readings=200, step=30.0):
+    """Flocculation time found on a signal whose slope goes from 1 to 5 at reading change"""
+    random.seed(1)
+    detector = FlocculationDetector()
+    value = 0.0
+    for i in range(readings):
+        value += (1 if i < change else 5) + random.gauss(0, 0.1)
+        detected = detector.update(i * step, value)
+        if detected is not None:
+            return detected
+    return None
+
+
+def test_late_change_is_detected():
+    assert detect(60) is not None
+
+
+def test_change_right_after_warmup_is_detected():
+    # The CUSUM sum never returns to zero when the change starts on the first reading after warmup
+    for change in (WARMUP_READINGS - 5, WARMUP_READINGS, WARMUP_READINGS + 1):
+        detected = detect(change)
+        assert detected is not None
+        assert detected <= (max(change, WARMUP_READINGS) + 1) * 30.0